@@ -5,13 +5,55 @@ Firebase Functions Python (2nd gen) 用のエントリポイント。
 既存の solver.service.SolverService を呼び出す。
 
 ローカルテスト用の Flask版は solver/main.py に保持。
+入出力は solver.transport 経由（orjson / gzip・br 圧縮 / 圧縮リクエスト対応）。
+入力は solver.request_validation で検証・正規化してからサービスに渡す（不正なら400）。
+求解結果は solver.metrics のレジストリに記録する（インスタンスごとの集計）。
+各リクエストは solver.tracing のルートスパンで囲む（traceparent ヘッダがあればその子）。
+
+コールドスタート対策:
+- ortools と各パイプラインはエンドポイント内で遅延import（OPTIONSは読み込まない）
+- 環境変数 SOLVER_WARMUP=1 のとき、起動時に極小モデルを求解してウォームアップ
 """
 
-import json
+import functools
+import os
 
 from firebase_functions import https_fn, options
 
-from solver.service import SolverService, UnifiedSolverService
+from solver import metrics, tracing, transport
+from solver.request_validation import validate_request, validation_error_response
+from solver.types import (
+    SolverRequest,
+    UnifiedRepairRequest,
+    UnifiedScenarioRequest,
+    UnifiedSolverRequest,
+)
+
+if os.environ.get("SOLVER_WARMUP") == "1":
+    from solver.warmup import warm_up
+
+    warm_up()
+
+
+def _json_response(req: https_fn.Request, payload: dict, status: int) -> https_fn.Response:
+    """Accept-Encodingに応じて圧縮したJSONレスポンスを返す"""
+    body, headers = transport.encode_response(
+        payload, req.headers.get("Accept-Encoding")
+    )
+    return https_fn.Response(body, status=status, headers=headers)
+
+
+def _traced(handler):
+    """リクエスト全体をルートスパンで囲む"""
+    @functools.wraps(handler)
+    def wrapper(req: https_fn.Request) -> https_fn.Response:
+        with tracing.start_trace(
+            handler.__name__, req.headers.get("traceparent"), **{"http.method": req.method}
+        ) as sp:
+            response = handler(req)
+            sp.set_attribute("http.status_code", response.status_code)
+            return response
+    return wrapper
 
 
 @https_fn.on_request(
@@ -19,6 +61,7 @@ from solver.service import SolverService, UnifiedSolverService
     timeout_sec=60,
     region="asia-northeast1",
 )
+@_traced
 def solverGenerateShift(req: https_fn.Request) -> https_fn.Response:
     """CP-SAT Solverによるシフト生成エンドポイント"""
 
@@ -26,42 +69,50 @@ def solverGenerateShift(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response("", status=204, headers={
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "POST",
-            "Access-Control-Allow-Headers": "Content-Type",
+            "Access-Control-Allow-Headers": "Content-Type, Content-Encoding",
         })
 
     if req.method != "POST":
-        return https_fn.Response(
-            json.dumps({"success": False, "error": "Method Not Allowed", "errorType": "METHOD_ERROR", "details": {}}),
-            status=405,
-            headers={"Content-Type": "application/json"},
+        return _json_response(
+            req,
+            {"success": False, "error": "Method Not Allowed", "errorType": "METHOD_ERROR", "details": {}},
+            405,
         )
 
-    data = req.get_json(silent=True)
+    data = transport.read_json(req)
     if data is None:
-        return https_fn.Response(
-            json.dumps({"success": False, "error": "リクエストボディが不正です", "errorType": "VALIDATION_ERROR", "details": {}}),
-            status=400,
-            headers={"Content-Type": "application/json"},
+        return _json_response(
+            req,
+            {"success": False, "error": "リクエストボディが不正です", "errorType": "VALIDATION_ERROR", "details": {}},
+            400,
         )
 
     missing = [f for f in ("staffList", "skeleton", "requirements") if f not in data]
     if missing:
-        return https_fn.Response(
-            json.dumps({
+        return _json_response(
+            req,
+            {
                 "success": False,
                 "error": f"必須フィールドが不足: {', '.join(missing)}",
                 "errorType": "VALIDATION_ERROR",
                 "details": {"missingFields": missing},
-            }),
-            status=400,
-            headers={"Content-Type": "application/json"},
+            },
+            400,
         )
 
+    data, errors = validate_request(data, SolverRequest)
+    if errors:
+        return _json_response(req, validation_error_response(errors), 400)
+
+    from solver.service import SolverService
+
     result = SolverService.solve(
         staff_list=data["staffList"],
         skeleton=data["skeleton"],
         requirements=data["requirements"],
         leave_requests=data.get("leaveRequests", {}),
+        schedule_format=data.get("scheduleFormat", "default"),
+        skeleton_mode=data.get("skeletonMode", "fix"),
     )
 
     if result["success"]:
@@ -71,11 +122,8 @@ def solverGenerateShift(req: https_fn.Request) -> https_fn.Response:
     else:
         status = 500
 
-    return https_fn.Response(
-        json.dumps(result),
-        status=status,
-        headers={"Content-Type": "application/json"},
-    )
+    metrics.record_result("solverGenerateShift", data, result)
+    return _json_response(req, result, status)
 
 
 @https_fn.on_request(
@@ -83,6 +131,7 @@ def solverGenerateShift(req: https_fn.Request) -> https_fn.Response:
     timeout_sec=60,
     region="asia-northeast1",
 )
+@_traced
 def solverUnifiedGenerate(req: https_fn.Request) -> https_fn.Response:
     """統合Solver: Phase 1-3を1回の求解で完結（Skeleton不要）"""
 
@@ -90,52 +139,197 @@ def solverUnifiedGenerate(req: https_fn.Request) -> https_fn.Response:
         return https_fn.Response("", status=204, headers={
             "Access-Control-Allow-Origin": "*",
             "Access-Control-Allow-Methods": "POST",
-            "Access-Control-Allow-Headers": "Content-Type",
+            "Access-Control-Allow-Headers": "Content-Type, Content-Encoding",
         })
 
     if req.method != "POST":
-        return https_fn.Response(
-            json.dumps({"success": False, "error": "Method Not Allowed", "errorType": "METHOD_ERROR", "details": {}}),
-            status=405,
-            headers={"Content-Type": "application/json"},
+        return _json_response(
+            req,
+            {"success": False, "error": "Method Not Allowed", "errorType": "METHOD_ERROR", "details": {}},
+            405,
         )
 
-    data = req.get_json(silent=True)
+    data = transport.read_json(req)
     if data is None:
-        return https_fn.Response(
-            json.dumps({"success": False, "error": "リクエストボディが不正です", "errorType": "VALIDATION_ERROR", "details": {}}),
-            status=400,
-            headers={"Content-Type": "application/json"},
+        return _json_response(
+            req,
+            {"success": False, "error": "リクエストボディが不正です", "errorType": "VALIDATION_ERROR", "details": {}},
+            400,
         )
 
     missing = [f for f in ("staffList", "requirements") if f not in data]
     if missing:
-        return https_fn.Response(
-            json.dumps({
+        return _json_response(
+            req,
+            {
                 "success": False,
                 "error": f"必須フィールドが不足: {', '.join(missing)}",
                 "errorType": "VALIDATION_ERROR",
                 "details": {"missingFields": missing},
-            }),
-            status=400,
-            headers={"Content-Type": "application/json"},
+            },
+            400,
         )
 
+    data, errors = validate_request(data, UnifiedSolverRequest)
+    if errors:
+        return _json_response(req, validation_error_response(errors), 400)
+
+    from solver.service import UnifiedSolverService
+
     result = UnifiedSolverService.solve(
         staff_list=data["staffList"],
         requirements=data["requirements"],
         leave_requests=data.get("leaveRequests", {}),
+        schedule_format=data.get("scheduleFormat", "default"),
+        previous_month_tail=data.get("previousMonthTail", {}),
+        next_month_overlap_days=data.get("nextMonthOverlapDays", 0),
+        objective_mode=data.get("objectiveMode", "weighted"),
+        objective_priority=data.get("objectivePriority"),
+        stage_time_limit_sec=data.get("stageTimeLimitSec", 10.0),
+        time_limit_mode=data.get("timeLimitMode", "wallclock"),
+        max_deterministic_time=data.get("maxDeterministicTime"),
+        coverage_mode=data.get("coverageMode", "hard"),
+    )
+
+    if result["success"]:
+        status = 200
+    elif result.get("errorType") == "INFEASIBLE":
+        status = 422
+    else:
+        status = 500
+
+    metrics.record_result("solverUnifiedGenerate", data, result)
+    return _json_response(req, result, status)
+
+
+@https_fn.on_request(
+    memory=options.MemoryOption.GB_1,
+    timeout_sec=60,
+    region="asia-northeast1",
+)
+@_traced
+def solverUnifiedRepair(req: https_fn.Request) -> https_fn.Response:
+    """統合Solver: 既存スケジュールの局所修復（欠勤・休暇追加・スタッフ除外）"""
+
+    if req.method == "OPTIONS":
+        return https_fn.Response("", status=204, headers={
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "POST",
+            "Access-Control-Allow-Headers": "Content-Type, Content-Encoding",
+        })
+
+    if req.method != "POST":
+        return _json_response(
+            req,
+            {"success": False, "error": "Method Not Allowed", "errorType": "METHOD_ERROR", "details": {}},
+            405,
+        )
+
+    data = transport.read_json(req)
+    if data is None:
+        return _json_response(
+            req,
+            {"success": False, "error": "リクエストボディが不正です", "errorType": "VALIDATION_ERROR", "details": {}},
+            400,
+        )
+
+    missing = [f for f in ("staffList", "requirements", "schedule", "changes") if f not in data]
+    if missing:
+        return _json_response(
+            req,
+            {
+                "success": False,
+                "error": f"必須フィールドが不足: {', '.join(missing)}",
+                "errorType": "VALIDATION_ERROR",
+                "details": {"missingFields": missing},
+            },
+            400,
+        )
+
+    data, errors = validate_request(data, UnifiedRepairRequest)
+    if errors:
+        return _json_response(req, validation_error_response(errors), 400)
+
+    from solver.service import UnifiedSolverService
+
+    result = UnifiedSolverService.repair(
+        staff_list=data["staffList"],
+        requirements=data["requirements"],
+        leave_requests=data.get("leaveRequests", {}),
+        schedule=data["schedule"],
+        changes=data["changes"],
     )
 
     if result["success"]:
         status = 200
     elif result.get("errorType") == "INFEASIBLE":
         status = 422
+    elif result.get("errorType") == "TIMEOUT":
+        status = 504
     else:
         status = 500
 
-    return https_fn.Response(
-        json.dumps(result),
-        status=status,
-        headers={"Content-Type": "application/json"},
+    metrics.record_result("solverUnifiedRepair", data, result)
+    return _json_response(req, result, status)
+
+
+@https_fn.on_request(
+    memory=options.MemoryOption.GB_2,
+    timeout_sec=120,
+    region="asia-northeast1",
+)
+@_traced
+def solverUnifiedScenarios(req: https_fn.Request) -> https_fn.Response:
+    """統合Solver: What-ifシナリオの並列比較"""
+
+    if req.method == "OPTIONS":
+        return https_fn.Response("", status=204, headers={
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Methods": "POST",
+            "Access-Control-Allow-Headers": "Content-Type, Content-Encoding",
+        })
+
+    if req.method != "POST":
+        return _json_response(
+            req,
+            {"success": False, "error": "Method Not Allowed", "errorType": "METHOD_ERROR", "details": {}},
+            405,
+        )
+
+    data = transport.read_json(req)
+    if data is None:
+        return _json_response(
+            req,
+            {"success": False, "error": "リクエストボディが不正です", "errorType": "VALIDATION_ERROR", "details": {}},
+            400,
+        )
+
+    missing = [f for f in ("staffList", "requirements", "scenarios") if f not in data]
+    if missing:
+        return _json_response(
+            req,
+            {
+                "success": False,
+                "error": f"必須フィールドが不足: {', '.join(missing)}",
+                "errorType": "VALIDATION_ERROR",
+                "details": {"missingFields": missing},
+            },
+            400,
+        )
+
+    data, errors = validate_request(data, UnifiedScenarioRequest)
+    if errors:
+        return _json_response(req, validation_error_response(errors), 400)
+
+    from solver.service import UnifiedSolverService
+
+    result = UnifiedSolverService.compare_scenarios(
+        staff_list=data["staffList"],
+        requirements=data["requirements"],
+        leave_requests=data.get("leaveRequests", {}),
+        scenarios=data["scenarios"],
+        include_schedules=data.get("includeSchedules", False),
     )
+
+    metrics.record_result("solverUnifiedScenarios", data, result)
+    return _json_response(req, result, 200 if result["success"] else 500)
@@ -0,0 +1,99 @@
+"""
+配置可能性のビットセット: 人員充足・資格要件・役職要件で共有する
+
+スタッフを staff_list の位置（0始まり）で番号付けし、集合を int のビットマスクで表す
+（bit pos が立っている ⇔ そのスタッフを含む）。
+
+  StaffEligibility: 資格・役職 → 該当スタッフのマスク（リクエストごとに1回、スタッフ1周で構築）
+  ShiftSlots: (日, シフト種別) → 配置可能スタッフ（変数がある）のマスクと位置ごとの変数
+              （変数表1周で構築）
+
+要件ごとの対象スタッフは「配置可能マスク & 資格／役職マスク」のビット演算で求まり、
+日×シフト×要件ごとにスタッフ全員を走査しない。
+ortools を import しない（変数は不透明な値として扱う）。
+"""
+
+from collections.abc import Iterator, Mapping
+
+from solver.types import REQUIREMENT_SHIFT_TYPES, DailyRequirementDict, StaffDict
+
+# 要件の種類: 資格（requiredQualifications）/ 役職（requiredRoles）
+QUALIFICATION = "qualification"
+ROLE = "role"
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """立っているビットの位置を昇順に返す"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class StaffEligibility:
+    """資格・役職ごとの該当スタッフのビットマスク"""
+
+    def __init__(self, staff_list: list[StaffDict]) -> None:
+        self.positions: dict[str, int] = {}
+        self._masks: dict[tuple[str, str], int] = {}
+        for pos, staff in enumerate(staff_list):
+            self.positions[staff["id"]] = pos
+            bit = 1 << pos
+            for qualification in staff["qualifications"]:
+                key = (QUALIFICATION, qualification)
+                self._masks[key] = self._masks.get(key, 0) | bit
+            key = (ROLE, staff["role"])
+            self._masks[key] = self._masks.get(key, 0) | bit
+
+    def mask(self, kind: str, name: str) -> int:
+        """kind（QUALIFICATION | ROLE）が name のスタッフ（該当なしは0）"""
+        return self._masks.get((kind, name), 0)
+
+    def requirement_groups(
+        self, req: DailyRequirementDict
+    ) -> list[tuple[str, str, int, int]]:
+        """要件の資格・役職の下限 → [(kind, 名前, 該当スタッフのマスク, 必要人数)]"""
+        groups = [
+            (QUALIFICATION, q["qualification"], self.mask(QUALIFICATION, q["qualification"]),
+             q["count"])
+            for q in req["requiredQualifications"]
+        ]
+        groups.extend(
+            (ROLE, r["role"], self.mask(ROLE, r["role"]), r["count"])
+            for r in req.get("requiredRoles", ())
+        )
+        return groups
+
+
+class ShiftSlots:
+    """(日, シフト種別) ごとの配置可能スタッフのマスクと、スタッフ位置 → 変数"""
+
+    def __init__(
+        self,
+        variables: Mapping[tuple[str, int, str], object],
+        positions: dict[str, int],
+        shift_types: list[str] = REQUIREMENT_SHIFT_TYPES,
+    ) -> None:
+        self._masks: dict[tuple[int, str], int] = {}
+        self._vars: dict[tuple[int, str], dict[int, object]] = {}
+        wanted = set(shift_types)
+        for (staff_id, day, shift_type), var in variables.items():
+            if shift_type not in wanted or staff_id not in positions:
+                continue
+            pos = positions[staff_id]
+            key = (day, shift_type)
+            self._masks[key] = self._masks.get(key, 0) | (1 << pos)
+            self._vars.setdefault(key, {})[pos] = var
+
+    def mask(self, day: int, shift_type: str) -> int:
+        """配置可能スタッフ（変数がある）のマスク"""
+        return self._masks.get((day, shift_type), 0)
+
+    def select(self, day: int, shift_type: str, eligible: int = -1) -> list:
+        """配置可能 かつ eligible に含まれるスタッフの変数（staff_list順）"""
+        key = (day, shift_type)
+        mask = self._masks.get(key, 0) & eligible
+        if not mask:
+            return []
+        by_pos = self._vars[key]
+        return [by_pos[pos] for pos in iter_bits(mask)]
@@ -0,0 +1,125 @@
+"""
+辞書式（lexicographic）多段階最適化
+
+重み付き和の代わりに、ソフト制約のステージを優先順に1つずつ最大化する。
+各ステージの達成値を下限制約として固定し、その解を次ステージのヒントにする。
+ステージごとに時間上限（壁時計、または決定的時間）を設け、全ステージで1つの締め切り
+（total_time_limit_sec）を共有する。
+"""
+
+import time
+
+from ortools.sat.python import cp_model
+
+from solver.parameter_profile import apply_parameters
+
+
+def _hint_solution(model: cp_model.CpModel, solver: cp_model.CpSolver) -> None:
+    """直前の解を全変数のヒントとして設定"""
+    model.ClearHints()
+    solution = list(solver.ResponseProto().solution)
+    for idx, value in enumerate(solution):
+        model.AddHint(model.GetIntVarFromProtoIndex(idx), value)
+
+
+def solve_lexicographic(
+    model: cp_model.CpModel,
+    stages: dict[str, list],
+    priority: list[str],
+    stage_time_limit_sec: float,
+    relative_gap_limit: float = 0.05,
+    max_deterministic_time: float | None = None,
+    parameters: dict | None = None,
+    exact_stages: tuple[str, ...] = (),
+    total_time_limit_sec: float | None = None,
+) -> tuple[cp_model.CpSolver, int, list[dict]]:
+    """ステージを優先順に最適化し (最後に解を得たsolver, status, ステージ報告) を返す
+
+    2段目以降で解が得られなかった場合（時間切れ）は、直前ステージの解を採用して終了する。
+    項のないステージは飛ばす。
+    max_deterministic_time を渡すと各ステージを決定的時間で打ち切る
+    （stage_time_limit_sec は安全上限としてのみ働く）。
+    parameters（SatParameters のフィールド名 → 値）は各ステージの既定値の上に適用する。
+    exact_stages のステージはギャップ0（relative_gap_limit=0）で最適性の証明まで解く。
+    total_time_limit_sec を渡すと全ステージで1つの締め切りを共有し、各ステージは
+    min(stage_time_limit_sec, 残り時間) で解く。残り時間がなくなったら以降のステージは
+    status="SKIPPED" として報告し、直前ステージの解を採用する。
+    """
+    deadline = None if total_time_limit_sec is None else time.monotonic() + total_time_limit_sec
+
+    def time_limit() -> float:
+        if deadline is None:
+            return stage_time_limit_sec
+        return min(stage_time_limit_sec, deadline - time.monotonic())
+
+    reports: list[dict] = []
+    best_solver: cp_model.CpSolver | None = None
+    best_status = cp_model.UNKNOWN
+    solver: cp_model.CpSolver | None = None
+    status = cp_model.UNKNOWN
+
+    for name in priority:
+        terms = stages.get(name, [])
+        if not terms:
+            continue
+        limit = time_limit()
+        if limit <= 0:
+            reports.append({
+                "stage": name,
+                "status": "SKIPPED",
+                "value": None,
+                "solveTimeMs": 0,
+                "deterministicTime": 0.0,
+            })
+            break
+        expr = cp_model.LinearExpr.Sum(terms)
+
+        model.Maximize(expr)
+        solver = cp_model.CpSolver()
+        if max_deterministic_time is not None:
+            solver.parameters.max_deterministic_time = max_deterministic_time
+        solver.parameters.num_workers = 1  # 決定性保証
+        solver.parameters.relative_gap_limit = relative_gap_limit
+        if parameters:
+            apply_parameters(solver.parameters, parameters)
+        # parameters の max_time_in_seconds より締め切りまでの残り時間を優先
+        solver.parameters.max_time_in_seconds = limit
+        if name in exact_stages:
+            solver.parameters.relative_gap_limit = 0.0
+
+        start_time = time.time()
+        status = solver.Solve(model)
+        solve_time_ms = int((time.time() - start_time) * 1000)
+
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            reports.append({
+                "stage": name,
+                "status": solver.StatusName(status),
+                "value": None,
+                "solveTimeMs": solve_time_ms,
+                "deterministicTime": round(solver.deterministic_time, 3),
+            })
+            break
+
+        value = int(solver.ObjectiveValue())
+        reports.append({
+            "stage": name,
+            "status": solver.StatusName(status),
+            "value": value,
+            "solveTimeMs": solve_time_ms,
+            "deterministicTime": round(solver.deterministic_time, 3),
+        })
+        # このステージの達成値を以降のステージで維持
+        model.Add(expr >= value)
+        _hint_solution(model, solver)
+        best_solver, best_status = solver, status
+
+    if best_solver is None:
+        if solver is None:
+            # 目的関数項がない → 実行可能性のみ判定
+            solver = cp_model.CpSolver()
+            solver.parameters.max_time_in_seconds = max(time_limit(), 0.0)
+            solver.parameters.num_workers = 1
+            status = solver.Solve(model)
+        return solver, status, reports
+    return best_solver, best_status, reports
@@ -2,28 +2,119 @@
 Cloud Function エンドポイント: solverGenerateShift
 
 POST /solverGenerateShift
-- リクエスト: SolverRequest (staffList, skeleton, requirements, leaveRequests)
+- リクエスト: SolverRequest (staffList, skeleton, requirements, leaveRequests, skeletonMode)
 - レスポンス: SolverResponse or SolverErrorResponse
+
+入出力は solver.transport 経由（orjson / gzip・br 圧縮 / 圧縮リクエスト対応）。
+入力は solver.request_validation で検証・正規化してからサービスに渡す（不正なら400）。
+
+環境変数 SOLVER_POOL_WORKERS が1以上なら求解をワーカープロセスプールで実行する
+（solver.worker_pool: キュー満杯は429、期限切れは503、統計は GET /solverPoolStats）。
+プールは最初の求解リクエストで生成する（import時・/metrics 等では起動しない）。
+求解結果は solver.metrics に記録し、GET /metrics でPrometheus形式で公開する。
+各リクエストは solver.tracing のルートスパンで囲む（traceparent ヘッダがあればその子）。
 """
 
-from flask import Flask, jsonify, request
+import functools
+import threading
+
+from flask import Flask, Response, request
 
+from solver import metrics, tracing, transport
+from solver.request_validation import validate_request, validation_error_response
 from solver.service import SolverService, UnifiedSolverService
+from solver.types import (
+    SolverRequest,
+    UnifiedRepairRequest,
+    UnifiedScenarioRequest,
+    UnifiedSolverRequest,
+)
+from solver.worker_pool import PoolDeadlineError, PoolSaturatedError, SolverPool
 
 app = Flask(__name__)
+# 未生成の印（生成後は SolverPool、プール無効なら None）
+_UNSET = object()
+_pool = _UNSET
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> SolverPool | None:
+    """ワーカープール（初回呼び出し時に SolverPool.from_env で生成）"""
+    global _pool
+    if _pool is _UNSET:
+        with _pool_lock:
+            if _pool is _UNSET:
+                _pool = SolverPool.from_env()
+    return _pool
+
+
+def _json_response(payload: dict, status: int) -> Response:
+    """Accept-Encodingに応じて圧縮したJSONレスポンスを返す"""
+    body, headers = transport.encode_response(
+        payload, request.headers.get("Accept-Encoding")
+    )
+    return Response(body, status=status, headers=headers)
+
+
+def _traced(view):
+    """リクエスト全体をルートスパンで囲む"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with tracing.start_trace(
+            request.path, request.headers.get("traceparent"), **{"http.method": request.method}
+        ) as sp:
+            response = view(*args, **kwargs)
+            sp.set_attribute("http.status_code", response.status_code)
+            return response
+    return wrapper
+
+
+def _run(fn, **kwargs) -> dict:
+    """サービス呼び出し（プールモードならワーカーで実行、混雑・期限切れはエラー結果）"""
+    pool = _get_pool()
+    if pool is None:
+        return fn(**kwargs)
+    try:
+        return pool.run(fn, kwargs)
+    except PoolSaturatedError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "errorType": "OVERLOADED",
+            "details": pool.stats(),
+        }
+    except PoolDeadlineError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "errorType": "UNAVAILABLE",
+            "details": pool.stats(),
+        }
+
+
+def _status_for(result: dict) -> int:
+    if result["success"]:
+        return 200
+    return {
+        "INFEASIBLE": 422,
+        "TIMEOUT": 504,
+        "OVERLOADED": 429,
+        "UNAVAILABLE": 503,
+    }.get(result.get("errorType"), 500)
 
 
 @app.route("/solverGenerateShift", methods=["POST"])
+@_traced
 def solver_generate_shift():
     """CP-SAT Solverによるシフト生成エンドポイント"""
-    data = request.get_json(silent=True)
+    data = transport.read_json(request)
     if data is None:
-        return jsonify({
+        return _json_response({
             "success": False,
             "error": "リクエストボディが不正です",
             "errorType": "VALIDATION_ERROR",
             "details": {},
-        }), 400
+        }, 400)
 
     # 必須フィールドの検証
     missing = []
@@ -31,58 +122,171 @@ def solver_generate_shift():
         if field not in data:
             missing.append(field)
     if missing:
-        return jsonify({
+        return _json_response({
             "success": False,
             "error": f"必須フィールドが不足: {', '.join(missing)}",
             "errorType": "VALIDATION_ERROR",
             "details": {"missingFields": missing},
-        }), 400
+        }, 400)
 
-    result = SolverService.solve(
+    data, errors = validate_request(data, SolverRequest)
+    if errors:
+        return _json_response(validation_error_response(errors), 400)
+
+    result = _run(
+        SolverService.solve,
         staff_list=data["staffList"],
         skeleton=data["skeleton"],
         requirements=data["requirements"],
         leave_requests=data.get("leaveRequests", {}),
+        schedule_format=data.get("scheduleFormat", "default"),
+        skeleton_mode=data.get("skeletonMode", "fix"),
     )
 
-    if result["success"]:
-        return jsonify(result), 200
-    elif result.get("errorType") == "INFEASIBLE":
-        return jsonify(result), 422
-    else:
-        return jsonify(result), 500
+    metrics.record_result("solverGenerateShift", data, result)
+    return _json_response(result, _status_for(result))
 
 
 @app.route("/solverUnifiedGenerate", methods=["POST"])
+@_traced
 def solver_unified_generate():
     """統合Solver: Phase 1-3を1回の求解で完結"""
-    data = request.get_json(silent=True)
+    data = transport.read_json(request)
     if data is None:
-        return jsonify({
+        return _json_response({
             "success": False,
             "error": "リクエストボディが不正です",
             "errorType": "VALIDATION_ERROR",
             "details": {},
-        }), 400
+        }, 400)
 
     missing = [f for f in ("staffList", "requirements") if f not in data]
     if missing:
-        return jsonify({
+        return _json_response({
             "success": False,
             "error": f"必須フィールドが不足: {', '.join(missing)}",
             "errorType": "VALIDATION_ERROR",
             "details": {"missingFields": missing},
-        }), 400
+        }, 400)
 
-    result = UnifiedSolverService.solve(
+    data, errors = validate_request(data, UnifiedSolverRequest)
+    if errors:
+        return _json_response(validation_error_response(errors), 400)
+
+    result = _run(
+        UnifiedSolverService.solve,
         staff_list=data["staffList"],
         requirements=data["requirements"],
         leave_requests=data.get("leaveRequests", {}),
+        schedule_format=data.get("scheduleFormat", "default"),
+        previous_month_tail=data.get("previousMonthTail", {}),
+        next_month_overlap_days=data.get("nextMonthOverlapDays", 0),
+        objective_mode=data.get("objectiveMode", "weighted"),
+        objective_priority=data.get("objectivePriority"),
+        stage_time_limit_sec=data.get("stageTimeLimitSec", 10.0),
+        time_limit_mode=data.get("timeLimitMode", "wallclock"),
+        max_deterministic_time=data.get("maxDeterministicTime"),
+        coverage_mode=data.get("coverageMode", "hard"),
     )
 
-    if result["success"]:
-        return jsonify(result), 200
-    elif result.get("errorType") == "INFEASIBLE":
-        return jsonify(result), 422
-    else:
-        return jsonify(result), 500
+    metrics.record_result("solverUnifiedGenerate", data, result)
+    return _json_response(result, _status_for(result))
+
+
+@app.route("/solverUnifiedRepair", methods=["POST"])
+@_traced
+def solver_unified_repair():
+    """統合Solver: 既存スケジュールの局所修復"""
+    data = transport.read_json(request)
+    if data is None:
+        return _json_response({
+            "success": False,
+            "error": "リクエストボディが不正です",
+            "errorType": "VALIDATION_ERROR",
+            "details": {},
+        }, 400)
+
+    missing = [f for f in ("staffList", "requirements", "schedule", "changes") if f not in data]
+    if missing:
+        return _json_response({
+            "success": False,
+            "error": f"必須フィールドが不足: {', '.join(missing)}",
+            "errorType": "VALIDATION_ERROR",
+            "details": {"missingFields": missing},
+        }, 400)
+
+    data, errors = validate_request(data, UnifiedRepairRequest)
+    if errors:
+        return _json_response(validation_error_response(errors), 400)
+
+    result = _run(
+        UnifiedSolverService.repair,
+        staff_list=data["staffList"],
+        requirements=data["requirements"],
+        leave_requests=data.get("leaveRequests", {}),
+        schedule=data["schedule"],
+        changes=data["changes"],
+    )
+
+    metrics.record_result("solverUnifiedRepair", data, result)
+    return _json_response(result, _status_for(result))
+
+
+@app.route("/solverUnifiedScenarios", methods=["POST"])
+@_traced
+def solver_unified_scenarios():
+    """統合Solver: What-ifシナリオの並列比較"""
+    data = transport.read_json(request)
+    if data is None:
+        return _json_response({
+            "success": False,
+            "error": "リクエストボディが不正です",
+            "errorType": "VALIDATION_ERROR",
+            "details": {},
+        }, 400)
+
+    missing = [f for f in ("staffList", "requirements", "scenarios") if f not in data]
+    if missing:
+        return _json_response({
+            "success": False,
+            "error": f"必須フィールドが不足: {', '.join(missing)}",
+            "errorType": "VALIDATION_ERROR",
+            "details": {"missingFields": missing},
+        }, 400)
+
+    data, errors = validate_request(data, UnifiedScenarioRequest)
+    if errors:
+        return _json_response(validation_error_response(errors), 400)
+
+    result = _run(
+        UnifiedSolverService.compare_scenarios,
+        staff_list=data["staffList"],
+        requirements=data["requirements"],
+        leave_requests=data.get("leaveRequests", {}),
+        scenarios=data["scenarios"],
+        include_schedules=data.get("includeSchedules", False),
+    )
+
+    metrics.record_result("solverUnifiedScenarios", data, result)
+    return _json_response(result, _status_for(result))
+
+
+@app.route("/solverPoolStats", methods=["GET"])
+def solver_pool_stats():
+    """ワーカープールの統計（キュー深さ・待ち時間）。インライン実行時は enabled=false
+
+    プール未生成（求解リクエスト前）は生成せず started=false を返す。
+    """
+    if _pool is _UNSET:
+        return _json_response({"enabled": SolverPool.enabled_in_env(), "started": False}, 200)
+    if _pool is None:
+        return _json_response({"enabled": False}, 200)
+    return _json_response({"enabled": True, **_pool.stats()}, 200)
+
+
+@app.route("/metrics", methods=["GET"])
+def solver_metrics():
+    """Prometheus形式のメトリクス"""
+    return Response(metrics.REGISTRY.render(), status=200, headers={
+        "Content-Type": metrics.CONTENT_TYPE,
+    })
@@ -0,0 +1,221 @@
+"""
+メトリクス: Prometheus互換のレジストリとテキスト形式（exposition format 0.0.4）の出力
+
+エンドポイント（Flask版・Cloud Functions版）が求解結果ごとに record_result() で記録する:
+  - solver_solve_seconds / solver_build_seconds: 求解・モデル構築時間のヒストグラム
+    （スタッフ数の区分 staff と施設種別 facility=night|day でラベル付け）
+  - solver_requests_total: 結果ステータス（OPTIMAL / FEASIBLE / INFEASIBLE / INTERNAL_ERROR など）
+  - solver_warnings_total: 事前検証警告（UnifiedModelBuilder.warnings）の件数
+  - solver_model_variables / solver_model_constraints: 直近のモデル規模
+記録は結果の solverStats から行うため、プールモード（求解が別プロセス）でも親プロセスに集計される。
+Flask版は GET /metrics で公開する。
+
+外部依存なし（prometheus_client は使わない）。ortools も import しない。
+"""
+
+import threading
+from abc import ABC, abstractmethod
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# スタッフ数の区分（上限, ラベル）
+STAFF_BUCKETS = [(10, "1-10"), (30, "11-30"), (50, "31-50"), (100, "51-100"), (200, "101-200")]
+# 時間ヒストグラムのバケット上限（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[n]) for n in self.label_names)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> list[str]:
+        """ロック保持中に呼ばれ、サンプル行を返す"""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()) -> None:
+        super().__init__(name, help_text, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS) -> None:
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        # ラベル → (バケットごとの件数（非累積）, 合計, 件数)
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next(i for i, upper in enumerate(self.buckets) if value <= upper)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[2] if entry else 0
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total, n) in sorted(self._values.items()):
+            cumulative = 0
+            for upper, c in zip(self.buckets, counts):
+                cumulative += c
+                le = f'le="{_format_value(upper)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {n}")
+        return lines
+
+
+class Registry:
+    """メトリクスの登録と一括出力"""
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+_SIZE_LABELS = ("endpoint", "staff", "facility")
+
+SOLVE_SECONDS = REGISTRY.register(Histogram(
+    "solver_solve_seconds", "CP-SAT solve time in seconds", _SIZE_LABELS,
+))
+BUILD_SECONDS = REGISTRY.register(Histogram(
+    "solver_build_seconds", "Model build time in seconds", _SIZE_LABELS,
+))
+REQUESTS_TOTAL = REGISTRY.register(Counter(
+    "solver_requests_total", "Solver requests by result status", ("endpoint", "status"),
+))
+WARNINGS_TOTAL = REGISTRY.register(Counter(
+    "solver_warnings_total", "Skipped-constraint warnings by constraint type",
+    ("endpoint", "constraint_type"),
+))
+MODEL_VARIABLES = REGISTRY.register(Gauge(
+    "solver_model_variables", "Number of CP-SAT variables in the latest model", _SIZE_LABELS,
+))
+MODEL_CONSTRAINTS = REGISTRY.register(Gauge(
+    "solver_model_constraints", "Number of CP-SAT constraints in the latest model", _SIZE_LABELS,
+))
+
+
+def staff_bucket(staff_count: int) -> str:
+    for upper, label in STAFF_BUCKETS:
+        if staff_count <= upper:
+            return label
+    return f"{STAFF_BUCKETS[-1][0] + 1}+"
+
+
+def facility_type(requirements: dict) -> str:
+    """要件キーに夜勤があれば night（UnifiedModelBuilder の夜勤施設判定と同じ基準）"""
+    reqs = requirements.get("requirements", {}) if isinstance(requirements, dict) else {}
+    return "night" if any("夜勤" in key for key in reqs) else "day"
+
+
+def record_result(endpoint: str, request_data: dict, result: dict) -> None:
+    """求解結果1件をメトリクスに記録する
+
+    ステータスは成功時 solverStats.status、失敗時 errorType。
+    時間は solverStats（失敗時は details）の solveTimeMs / buildTimeMs から取る。
+    """
+    stats = result.get("solverStats")
+    if result.get("success"):
+        status = stats["status"] if stats else "OK"
+    else:
+        status = result.get("errorType", "INTERNAL_ERROR")
+    REQUESTS_TOTAL.inc(endpoint=endpoint, status=status)
+
+    for warning in result.get("warnings", []):
+        WARNINGS_TOTAL.inc(endpoint=endpoint, constraint_type=warning["constraintType"])
+
+    timings = stats if stats is not None else result.get("details", {})
+    labels = {
+        "endpoint": endpoint,
+        "staff": staff_bucket(len(request_data.get("staffList", []))),
+        "facility": facility_type(request_data.get("requirements", {})),
+    }
+    if "solveTimeMs" in timings:
+        SOLVE_SECONDS.observe(timings["solveTimeMs"] / 1000, **labels)
+    if "buildTimeMs" in timings:
+        BUILD_SECONDS.observe(timings["buildTimeMs"] / 1000, **labels)
+    if stats is not None and "numVariables" in stats:
+        MODEL_VARIABLES.set(stats["numVariables"], **labels)
+        MODEL_CONSTRAINTS.set(stats["numConstraints"], **labels)
@@ -0,0 +1,138 @@
+"""
+Calendar: 対象月の曜日・日付インデックス（月単位でメモ化）
+
+スタッフ×日ごとに datetime.date を生成したり日付文字列を split するのを避け、
+固定休日の計算をスタッフごとのビット演算に置き換える。
+
+ビットマスク表現: bit (day - 1) が立っている ⇔ その日を含む
+"""
+
+import datetime
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+
+from solver.types import StaffDict
+
+
+class Calendar:
+    """1か月分の曜日配列・曜日別ビットマスク・日付文字列→日の逆引き"""
+
+    def __init__(self, target_month: str) -> None:
+        self.target_month = target_month
+        self.year, self.month = map(int, target_month.split("-"))
+        if self.month == 12:
+            next_first = datetime.date(self.year + 1, 1, 1)
+        else:
+            next_first = datetime.date(self.year, self.month + 1, 1)
+        first = datetime.date(self.year, self.month, 1)
+        self.days_in_month = (next_first - first).days
+        self.all_days_mask = (1 << self.days_in_month) - 1
+
+        # JS weekday (Sun=0): 1日の曜日から順に求める
+        first_js_wd = (first.weekday() + 1) % 7
+        self.weekdays: tuple[int, ...] = tuple(
+            (first_js_wd + day - 1) % 7 for day in range(1, self.days_in_month + 1)
+        )
+
+        masks = [0] * 7
+        for day, js_wd in enumerate(self.weekdays, start=1):
+            masks[js_wd] |= 1 << (day - 1)
+        self.weekday_masks: tuple[int, ...] = tuple(masks)
+
+        self.dates: tuple[str, ...] = tuple(
+            f"{target_month}-{day:02d}" for day in range(1, self.days_in_month + 1)
+        )
+        self.day_of: dict[str, int] = {
+            date_str: day for day, date_str in enumerate(self.dates, start=1)
+        }
+
+    def day_for(self, date_str: str) -> int | None:
+        """日付文字列 → 当月の日（当月外・不正形式は None）
+
+        正規形（"2026-03-05"）は辞書引き、ゼロ埋めなし等はパースで救済する。
+        """
+        day = self.day_of.get(date_str)
+        if day is not None:
+            return day
+        parts = date_str.split("-")
+        if len(parts) != 3:
+            return None
+        try:
+            d_year, d_month, d_day = int(parts[0]), int(parts[1]), int(parts[2])
+        except ValueError:
+            return None
+        if d_year == self.year and d_month == self.month and 1 <= d_day <= self.days_in_month:
+            return d_day
+        return None
+
+    def mask_for_days(self, days) -> int:
+        mask = 0
+        for day in days:
+            if 1 <= day <= self.days_in_month:
+                mask |= 1 << (day - 1)
+        return mask
+
+    def mask_for_dates(self, date_strs) -> int:
+        """日付文字列の集合 → ビットマスク（当月外は無視）"""
+        mask = 0
+        for date_str in date_strs:
+            day = self.day_for(date_str)
+            if day is not None:
+                mask |= 1 << (day - 1)
+        return mask
+
+    def mask_for_weekdays(self, js_weekdays) -> int:
+        """JS曜日（0=日）の集合 → その曜日に当たる日のビットマスク"""
+        mask = 0
+        for js_wd in set(js_weekdays):
+            if 0 <= js_wd <= 6:
+                mask |= self.weekday_masks[js_wd]
+        return mask
+
+    @staticmethod
+    def days_of(mask: int) -> set[int]:
+        """ビットマスク → 日の集合"""
+        days = set()
+        while mask:
+            low = mask & -mask
+            days.add(low.bit_length())
+            mask ^= low
+        return days
+
+
+@lru_cache(maxsize=32)
+def get_calendar(target_month: str) -> Calendar:
+    """対象月のCalendarを返す（月単位でメモ化、インスタンスは共有なので変更しないこと）"""
+    return Calendar(target_month)
+
+
+def non_operational_mask(cal: Calendar, requirement_keys: Iterable[str]) -> int:
+    """要件エントリ（"YYYY-MM-DD_シフト種別"）が1つもない日 → 非稼働日のビットマスク"""
+    operational = set()
+    for key in requirement_keys:
+        parts = key.split("_")
+        if len(parts) < 2:
+            continue  # 日別形式でないキーはスキップ
+        date_parts = parts[0].split("-")
+        if len(date_parts) < 3:
+            continue
+        operational.add(int(date_parts[2]))
+    return cal.all_days_mask & ~cal.mask_for_days(operational)
+
+
+def fixed_rest_mask(
+    cal: Calendar,
+    staff: StaffDict,
+    leave_requests: Mapping[str, Mapping[str, str]],
+    non_op_mask: int,
+) -> int:
+    """スタッフの固定休日: unavailableDates + leaveRequests + 非稼働日 + 非対応曜日
+
+    統合エンジン（変数を作らない日）とSkeleton事前検証（勤務できない日）で共有する。
+    """
+    fixed = non_op_mask
+    fixed |= cal.mask_for_dates(staff.get("unavailableDates", []))
+    fixed |= cal.mask_for_dates(leave_requests.get(staff["id"], ()))
+    # availableWeekdays (JS format: 0=Sun)
+    fixed |= cal.all_days_mask & ~cal.mask_for_weekdays(staff["availableWeekdays"])
+    return fixed
@@ -0,0 +1,198 @@
+"""
+CP-SATパラメータプロファイル: 問題規模に応じた求解パラメータの選択と、
+オフラインチューニング（solver.tuning）の結果の適用
+
+1. 規模別プロファイル: 構築済みモデルを 変数数・夜勤施設か・スタッフ数・要件の厳しさ で分類し、
+   条件（match）に合う最初のプロファイルのパラメータ（時間上限・ギャップ・ワーカー数・
+   presolve・linearization_level）を使う。既定は DEFAULT_SIZE_PROFILES。
+   環境変数 SOLVER_PARAMETER_PROFILES の設定ファイルで上書き・追加できる:
+     {"version": 1, "profiles": [{"name": "small", "match": {"maxVariables": 3000},
+                                  "parameters": {"max_time_in_seconds": 5.0}}, ...]}
+   組み込みと同名のプロファイルは指定した項目だけ上書きし（評価順は組み込みのまま）、
+   新しい名前のプロファイルは組み込みより先に評価する。
+2. チューニング済みプロファイル（SOLVER_PARAMETER_PROFILE）:
+     {"version": 1, "name": "...", "parameters": {"search_branching": "FIXED_SEARCH", ...}, ...}
+   規模別プロファイルの上に重ねて適用する（探索戦略の調整用）。
+
+parameters のキーは SatParameters のフィールド名、列挙型は名前（文字列）で書く。
+ortools は import しない。
+"""
+
+import json
+import os
+from functools import lru_cache
+
+PROFILE_VERSION = 1
+
+# match の条件キー → (特徴量, 比較)
+_MATCH_RULES = {
+    "minVariables": ("numVariables", "min"),
+    "maxVariables": ("numVariables", "max"),
+    "minStaff": ("staffCount", "min"),
+    "maxStaff": ("staffCount", "max"),
+    "minTightness": ("tightness", "min"),
+    "maxTightness": ("tightness", "max"),
+    "nightFacility": ("nightFacility", "eq"),
+}
+
+# 組み込みの規模別プロファイル（上から順に評価し、最初に条件を満たしたものを使う）。
+# Cloud Functions（1GiB = 1 vCPU、タイムアウト60秒）で動くよう、ワーカー数は1、
+# 時間上限はモデル構築を含めてタイムアウトに収まる値にする
+DEFAULT_SIZE_PROFILES: list[dict] = [
+    {
+        # 〜30名規模: 1秒前後で5%ギャップに届くため、大規模向けの長い上限で待たせない
+        "name": "small",
+        "match": {"maxVariables": 6000},
+        "parameters": {
+            "max_time_in_seconds": 10.0, "relative_gap_limit": 0.05, "num_workers": 1,
+            "cp_model_presolve": True, "linearization_level": 1,
+        },
+    },
+    {
+        # 100名超の夜勤施設: 夜勤チェーンで最も重いため上限を最長にする
+        "name": "large-night",
+        "match": {"minVariables": 20000, "nightFacility": True},
+        "parameters": {
+            "max_time_in_seconds": 45.0, "relative_gap_limit": 0.05, "num_workers": 1,
+            "cp_model_presolve": True, "linearization_level": 0,
+        },
+    },
+    {
+        # 100名超: LP緩和のコストが大きいため linearization を切り、時間を延ばす
+        "name": "large",
+        "match": {"minVariables": 20000},
+        "parameters": {
+            "max_time_in_seconds": 40.0, "relative_gap_limit": 0.05, "num_workers": 1,
+            "cp_model_presolve": True, "linearization_level": 0,
+        },
+    },
+    {
+        # 要件が在籍数に対して厳しい: 実行可能解探索にLP緩和を強める
+        "name": "tight",
+        "match": {"minTightness": 0.6},
+        "parameters": {
+            "max_time_in_seconds": 30.0, "relative_gap_limit": 0.05, "num_workers": 1,
+            "cp_model_presolve": True, "linearization_level": 2,
+        },
+    },
+    {
+        "name": "default",
+        "match": {},
+        "parameters": {
+            "max_time_in_seconds": 30.0, "relative_gap_limit": 0.05, "num_workers": 1,
+            "cp_model_presolve": True, "linearization_level": 1,
+        },
+    },
+]
+
+
+def load_profile(path: str) -> dict:
+    """プロファイルファイルを読み込む（形式が不正なら ValueError）"""
+    with open(path, encoding="utf-8") as f:
+        profile = json.load(f)
+    if not isinstance(profile, dict) or not isinstance(profile.get("parameters"), dict):
+        raise ValueError(f"パラメータプロファイルの形式が不正です: {path}")
+    if profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"未対応のプロファイルバージョンです: {profile.get('version')}")
+    return profile
+
+
+@lru_cache(maxsize=8)
+def _load_cached(path: str, mtime: float) -> dict:
+    return load_profile(path)
+
+
+def active_profile() -> dict | None:
+    """SOLVER_PARAMETER_PROFILE のプロファイル（未設定なら None、ファイル更新時は読み直す）"""
+    path = os.environ.get("SOLVER_PARAMETER_PROFILE")
+    if not path:
+        return None
+    return _load_cached(path, os.path.getmtime(path))
+
+
+def load_size_profiles(path: str) -> list[dict]:
+    """規模別プロファイルの設定ファイルを読み込む（形式が不正なら ValueError）"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    if not isinstance(config, dict) or config.get("version") != PROFILE_VERSION:
+        raise ValueError(f"未対応のプロファイル設定です: {path}")
+    profiles = config.get("profiles")
+    if not isinstance(profiles, list):
+        raise ValueError(f"profiles がありません: {path}")
+    for profile in profiles:
+        if not isinstance(profile, dict) or not isinstance(profile.get("name"), str):
+            raise ValueError(f"プロファイルに name がありません: {path}")
+        unknown = set(profile.get("match", {})) - set(_MATCH_RULES)
+        if unknown:
+            raise ValueError(f"不明な match 条件です: {sorted(unknown)}")
+        if not isinstance(profile.get("parameters", {}), dict):
+            raise ValueError(f"parameters の形式が不正です: {profile['name']}")
+    return profiles
+
+
+@lru_cache(maxsize=8)
+def _size_profiles_cached(path: str, mtime: float) -> list[dict]:
+    configured = {p["name"]: p for p in load_size_profiles(path)}
+    merged = []
+    for builtin in DEFAULT_SIZE_PROFILES:
+        override = configured.pop(builtin["name"], {})
+        merged.append({
+            "name": builtin["name"],
+            "match": override.get("match", builtin["match"]),
+            "parameters": {**builtin["parameters"], **override.get("parameters", {})},
+        })
+    # 新しい名前のプロファイルは組み込みより先に評価する
+    return list(configured.values()) + merged
+
+
+def size_profiles() -> list[dict]:
+    """評価順の規模別プロファイル（SOLVER_PARAMETER_PROFILES の設定 → 組み込み）"""
+    path = os.environ.get("SOLVER_PARAMETER_PROFILES")
+    if not path:
+        return DEFAULT_SIZE_PROFILES
+    return _size_profiles_cached(path, os.path.getmtime(path))
+
+
+def requirement_tightness(requirements: dict, staff_count: int, days: int) -> float:
+    """要件の厳しさ: 月間の必要人数合計 / (スタッフ数 × 日数)
+
+    全員が毎日勤務して1.0。週5勤務では約0.7が上限の目安。
+    """
+    if staff_count == 0 or days == 0:
+        return 0.0
+    required = sum(req["totalStaff"] for req in requirements.get("requirements", {}).values())
+    return round(required / (staff_count * days), 3)
+
+
+def _matches(match: dict, features: dict) -> bool:
+    for key, expected in match.items():
+        feature, op = _MATCH_RULES[key]
+        value = features[feature]
+        if op == "min" and value < expected:
+            return False
+        if op == "max" and value > expected:
+            return False
+        if op == "eq" and value != expected:
+            return False
+    return True
+
+
+def select_profile(features: dict, profiles: list[dict] | None = None) -> dict:
+    """特徴量（numVariables, staffCount, nightFacility, tightness）に合う最初のプロファイル"""
+    for profile in size_profiles() if profiles is None else profiles:
+        if _matches(profile.get("match", {}), features):
+            return profile
+    return {"name": "none", "match": {}, "parameters": {}}
+
+
+def apply_parameters(parameters, overrides: dict) -> None:
+    """SatParameters に {フィールド名: 値} を設定する（列挙型は名前で指定可）"""
+    for name, value in overrides.items():
+        if name.startswith("_") or not hasattr(parameters, name):
+            raise ValueError(f"不明なCP-SATパラメータです: {name}")
+        if isinstance(value, str):
+            # 列挙値は SatParameters のクラス属性（例: SatParameters.FIXED_SEARCH）
+            if not hasattr(parameters, value):
+                raise ValueError(f"不明なCP-SATパラメータ値です: {name}={value}")
+            value = getattr(parameters, value)
+        setattr(parameters, name, value)
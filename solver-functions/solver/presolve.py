@@ -0,0 +1,200 @@
+"""
+Python側プリソルブ: CP-SAT変数を作る前に スタッフ×日×シフト の定義域を絞り込む
+
+UnifiedModelBuilder が変数生成の直前に呼ぶ。定義域は (staffId, 日) → 候補シフト種別のリストで、
+ここから外したシフトには変数を作らない。以下を不動点まで繰り返す:
+
+  1. 夜勤チェーンの除去: 翌日に明け休みの候補がない夜勤（翌日が固定休日等）、
+     翌々日に休の候補がない夜勤（翌々日が固定休日ならエントリなし＝休なので残す）と、
+     前日に夜勤の候補がない明け休みを外す。夜勤に確定した日の翌日は明け休み、
+     翌々日は休に確定する
+  2. 必要人数ちょうどの確定: 要件の配置可能スタッフ数（資格・役職要件は該当者数）が
+     必要人数と等しいとき、その全員をそのシフトに確定する（他の候補を外す）
+
+どちらもモデルの制約から導かれる割当だけを確定するため、実行可能解の集合は変わらない。
+確定先のシフトが候補にない・定義域が空になる等の矛盾が出たら、その時点で打ち切って
+presolveInfeasible=True を返す（実行可能解なし。呼び出し側はモデルを実行不能にする）。
+
+需要なしシフトの除去（prune_no_demand=True のときのみ、最初に1回）: その日の要件キーがない
+勤務系シフトを全スタッフから外す（休・明け休みは残す）。要件キーのないシフトには必要人数制約が
+ないだけで配置は禁止されていない（勤務回数の調整に使われうる）ため、解を変えるこの規則は
+既定では行わず、呼び出し側が明示したときだけ適用する。
+ortools を import しない。
+"""
+
+from collections.abc import Mapping
+
+from solver.eligibility import StaffEligibility, iter_bits
+from solver.types import REQUIREMENT_SHIFT_TYPES, DailyRequirementDict, StaffDict
+
+_NIGHT = "夜勤"
+_FOLLOWUP = "明け休み"
+_REST = "休"
+_REST_SHIFT_TYPES = (_REST, _FOLLOWUP)
+
+Domains = dict[tuple[str, int], list[str]]
+
+
+class _Conflict(Exception):
+    """確定した割当どうしが矛盾した（実行可能解なし）"""
+
+
+def presolve(
+    domains: Domains,
+    staff_list: list[StaffDict],
+    requirements: Mapping[str, DailyRequirementDict],
+    target_month: str,
+    days_in_month: int,
+    force_exact_cover: bool = True,
+    keep: set[tuple[str, int, str]] | None = None,
+    eligibility: StaffEligibility | None = None,
+    prune_no_demand: bool = False,
+) -> dict:
+    """定義域をその場で絞り込み、統計（presolvePrunedVariables, presolveForcedAssignments,
+    presolveInfeasible）を返す
+
+    domains は翌月重なり日（days_in_month より後）を含んでよい（需要なし・確定の対象外）。
+    force_exact_cover=False で 2 を行わない（必要人数を満たせなくてもよいモードで使う）。
+    prune_no_demand=True で需要なしシフトを外す。keep の (staffId, 日, シフト種別) は
+    その場合も残す（Skeletonが指定した夜勤など）。
+    eligibility はビルダーと共有する資格・役職のマスク（省略時はここで作る）。
+    矛盾を検出したら絞り込みを打ち切り presolveInfeasible=True を返す（domains は途中まで
+    絞り込まれた状態で残る）。
+    """
+    before = sum(len(dom) for dom in domains.values())
+    if prune_no_demand:
+        _prune_no_demand(domains, requirements, target_month, days_in_month, keep or set())
+
+    eligibility = eligibility or StaffEligibility(staff_list)
+    forced = 0
+    infeasible = False
+    changed = True
+    try:
+        while changed:
+            changed = _prune_night_chains(domains)
+            if force_exact_cover:
+                newly_forced = _force_exact_cover(
+                    domains, staff_list, eligibility, requirements, target_month, days_in_month
+                )
+                forced += newly_forced
+                changed = changed or newly_forced > 0
+    except _Conflict:
+        infeasible = True
+
+    return {
+        "presolvePrunedVariables": before - sum(len(dom) for dom in domains.values()),
+        "presolveForcedAssignments": forced,
+        "presolveInfeasible": infeasible,
+    }
+
+
+def _prune_no_demand(
+    domains: Domains,
+    requirements: Mapping[str, DailyRequirementDict],
+    target_month: str,
+    days_in_month: int,
+    keep: set[tuple[str, int, str]],
+) -> None:
+    for (staff_id, day), dom in domains.items():
+        if day > days_in_month:
+            continue
+        date = f"{target_month}-{day:02d}"
+        dom[:] = [
+            st for st in dom
+            if st in _REST_SHIFT_TYPES or f"{date}_{st}" in requirements
+            or (staff_id, day, st) in keep
+        ]
+
+
+def _restrict(
+    domains: Domains, key: tuple[str, int], shift_type: str, fixed_rest_ok: bool = False
+) -> bool:
+    """(staffId, 日) を shift_type に確定 → 変化したか
+
+    shift_type が候補にない場合は矛盾（_Conflict）。エントリのない日（固定休日）は
+    fixed_rest_ok=True（休への確定）なら何もせず、それ以外は矛盾。
+    """
+    dom = domains.get(key)
+    if dom is None:
+        if fixed_rest_ok:
+            return False
+        raise _Conflict(key)
+    if shift_type not in dom:
+        raise _Conflict(key)
+    if len(dom) == 1:
+        return False
+    dom[:] = [shift_type]
+    return True
+
+
+def _remove(dom: list[str], shift_type: str, key: tuple[str, int]) -> None:
+    """候補から shift_type を外す（定義域が空になれば矛盾）"""
+    dom.remove(shift_type)
+    if not dom:
+        raise _Conflict(key)
+
+
+def _prune_night_chains(domains: Domains) -> bool:
+    """夜勤[d] → 明け休み[d+1] → 休[d+2] の連鎖で候補を絞る → 変化したか"""
+    changed = False
+    for (staff_id, day), dom in domains.items():
+        if _NIGHT in dom:
+            rest_day = domains.get((staff_id, day + 2))
+            if (_FOLLOWUP not in domains.get((staff_id, day + 1), ())
+                    or (rest_day is not None and _REST not in rest_day)):
+                _remove(dom, _NIGHT, (staff_id, day))
+                changed = True
+        # 1日目の明け休みは前月末の夜勤（引き継ぎ）による
+        if day > 1 and _FOLLOWUP in dom and _NIGHT not in domains.get((staff_id, day - 1), ()):
+            _remove(dom, _FOLLOWUP, (staff_id, day))
+            changed = True
+
+    for (staff_id, day), dom in domains.items():
+        if dom == [_NIGHT]:
+            changed |= _restrict(domains, (staff_id, day + 1), _FOLLOWUP)
+            changed |= _restrict(domains, (staff_id, day + 2), _REST, fixed_rest_ok=True)
+        elif dom == [_FOLLOWUP] and day > 1:
+            changed |= _restrict(domains, (staff_id, day - 1), _NIGHT)
+    return changed
+
+
+def _force_exact_cover(
+    domains: Domains,
+    staff_list: list[StaffDict],
+    eligibility: StaffEligibility,
+    requirements: Mapping[str, DailyRequirementDict],
+    target_month: str,
+    days_in_month: int,
+) -> int:
+    """配置可能人数＝必要人数 の要件で全員を確定 → 新たに確定した (スタッフ, 日) の数
+
+    配置可能スタッフはスタッフ位置のビットマスクで持ち、資格・役職要件は
+    StaffEligibility のマスクとの積で求める。
+    """
+    forced = 0
+    for day in range(1, days_in_month + 1):
+        date = f"{target_month}-{day:02d}"
+        day_domains = [
+            (pos, domains[(staff["id"], day)])
+            for pos, staff in enumerate(staff_list)
+            if (staff["id"], day) in domains
+        ]
+        for shift_type in REQUIREMENT_SHIFT_TYPES:
+            req = requirements.get(f"{date}_{shift_type}")
+            if req is None:
+                continue
+            eligible = 0
+            for pos, dom in day_domains:
+                if shift_type in dom:
+                    eligible |= 1 << pos
+            groups = [(eligible, req["totalStaff"])] + [
+                (eligible & mask, count)
+                for _, _, mask, count in eligibility.requirement_groups(req)
+            ]
+            for group, required in groups:
+                if required == 0 or group.bit_count() != required:
+                    continue
+                for pos in iter_bits(group):
+                    if _restrict(domains, (staff_list[pos]["id"], day), shift_type):
+                        forced += 1
+    return forced
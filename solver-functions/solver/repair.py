@@ -0,0 +1,148 @@
+"""
+局所修復（リペア）: 月途中の欠勤・休暇追加・退職に対する再求解
+
+既存スケジュールに変更（不可日追加・休暇追加・スタッフ除外）を適用し、
+近傍（影響日から半径R日 × 影響スタッフとその同僚）以外のセルを既存割当に固定して解く。
+固定部分が矛盾する場合は近傍を広げて再試行する（最終的に全月・全スタッフを再求解）。
+モデルは1回だけ構築し、固定は仮定（assumption）として試行ごとに置き換える。
+"""
+
+from solver.month_calendar import get_calendar
+from solver.types import (
+    RepairChangesDict,
+    StaffDict,
+    StaffScheduleDict,
+)
+from solver.unified_builder import WORK_SHIFT_TYPES
+
+# 近傍（半径（日）, 同僚のみか）の試行順。同僚のみ=False は全スタッフ、
+# 半径 None は全月を自由にする（通常の再求解）
+REPAIR_NEIGHBORHOODS: list[tuple[int | None, bool]] = [
+    (2, True), (4, True), (4, False), (8, False), (None, False),
+]
+
+
+def apply_changes(
+    staff_list: list[StaffDict],
+    leave_requests: dict[str, dict[str, str]],
+    changes: RepairChangesDict,
+) -> tuple[list[StaffDict], dict[str, dict[str, str]]]:
+    """変更を適用した staff_list・leave_requests を返す（入力は変更しない）"""
+    removed = set(changes.get("removedStaffIds", []))
+    new_unavailable = changes.get("unavailableDates", {})
+
+    new_staff_list: list[StaffDict] = []
+    for staff in staff_list:
+        if staff["id"] in removed:
+            continue
+        added = new_unavailable.get(staff["id"])
+        if added:
+            staff = {
+                **staff,
+                "unavailableDates": list(staff.get("unavailableDates", [])) + [
+                    d for d in added if d not in staff.get("unavailableDates", [])
+                ],
+            }
+        new_staff_list.append(staff)
+
+    new_leave = {sid: dict(dates) for sid, dates in leave_requests.items() if sid not in removed}
+    for sid, dates in changes.get("leaveRequests", {}).items():
+        if sid in removed:
+            continue
+        new_leave.setdefault(sid, {}).update(dates)
+
+    return new_staff_list, new_leave
+
+
+def affected_days(
+    target_month: str,
+    schedule: list[StaffScheduleDict],
+    changes: RepairChangesDict,
+) -> set[int]:
+    """変更の影響を受ける日: 追加された不可日・休暇日、除外スタッフの勤務日"""
+    cal = get_calendar(target_month)
+    days: set[int] = set()
+    for dates in changes.get("unavailableDates", {}).values():
+        days |= {d for d in map(cal.day_for, dates) if d is not None}
+    for dates in changes.get("leaveRequests", {}).values():
+        days |= {d for d in map(cal.day_for, dates) if d is not None}
+
+    removed = set(changes.get("removedStaffIds", []))
+    for staff_schedule in schedule:
+        if staff_schedule["staffId"] not in removed:
+            continue
+        for shift in staff_schedule["monthlyShifts"]:
+            if shift["shiftType"] in WORK_SHIFT_TYPES:
+                day = cal.day_for(shift["date"])
+                if day is not None:
+                    days.add(day)
+    return days
+
+
+def affected_staff(changes: RepairChangesDict) -> set[str]:
+    """変更の対象スタッフ: 不可日・休暇を追加したスタッフと除外スタッフ"""
+    return (
+        set(changes.get("unavailableDates", {}))
+        | set(changes.get("leaveRequests", {}))
+        | set(changes.get("removedStaffIds", []))
+    )
+
+
+def peer_staff(staff_list: list[StaffDict], staff_ids: set[str]) -> set[str]:
+    """staff_ids（除外スタッフを含む元の staff_list の ID）と、役職または資格が
+    1つでも共通するスタッフ（欠けた勤務を代われる同僚）の ID"""
+    affected = [s for s in staff_list if s["id"] in staff_ids]
+    roles = {s["role"] for s in affected}
+    qualifications = {q for s in affected for q in s["qualifications"]}
+    return staff_ids | {
+        s["id"] for s in staff_list
+        if s["role"] in roles or qualifications.intersection(s["qualifications"])
+    }
+
+
+def neighborhood_days(days: set[int], radius: int | None, days_in_month: int) -> set[int]:
+    """影響日から半径radius日以内の日（radius=None は全日）"""
+    if radius is None:
+        return set(range(1, days_in_month + 1))
+    result: set[int] = set()
+    for day in days:
+        result.update(range(max(1, day - radius), min(days_in_month, day + radius) + 1))
+    return result
+
+
+def schedule_cells(
+    target_month: str, schedule: list[StaffScheduleDict]
+) -> dict[tuple[str, int], str]:
+    """StaffSchedule[] → {(staffId, day): shiftType}"""
+    cal = get_calendar(target_month)
+    cells: dict[tuple[str, int], str] = {}
+    for staff_schedule in schedule:
+        staff_id = staff_schedule["staffId"]
+        for shift in staff_schedule["monthlyShifts"]:
+            day = cal.day_for(shift["date"])
+            if day is not None:
+                cells[(staff_id, day)] = shift["shiftType"]
+    return cells
+
+
+def changed_cells(
+    target_month: str,
+    before: list[StaffScheduleDict],
+    after: list[StaffScheduleDict],
+) -> list[dict]:
+    """修復前後で変化したセル（除外スタッフは含まない）"""
+    cal = get_calendar(target_month)
+    before_cells = schedule_cells(target_month, before)
+    changed = []
+    for staff_schedule in after:
+        staff_id = staff_schedule["staffId"]
+        for day, shift in enumerate(staff_schedule["monthlyShifts"], start=1):
+            old = before_cells.get((staff_id, day))
+            if old != shift["shiftType"]:
+                changed.append({
+                    "staffId": staff_id,
+                    "date": cal.dates[day - 1],
+                    "before": old,
+                    "after": shift["shiftType"],
+                })
+    return changed
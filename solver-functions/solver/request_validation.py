@@ -0,0 +1,469 @@
+"""
+リクエスト検証・正規化: モデル構築前に入力全体を1パスで検証する
+
+solver.types の TypedDict から検証関数を一度だけ組み立て（型ごとにメモ化）、
+リクエストを1回走査して以下を確認する:
+  - 型（str / int / float / bool / list / dict / TypedDict、必須フィールドの有無。
+    任意フィールドは TypedDict の NotRequired / total=False から読む）
+  - 列挙値（ROLES / QUALIFICATIONS / TIME_SLOT_PREFERENCES / ALL_SHIFT_TYPES / LEAVE_TYPES、
+    各モード（scheduleFormat 等）、objectivePriority のステージ名）
+  - 数値範囲・日付形式（実在する日付か）
+  - targetMonth と要件キー（"YYYY-MM-DD_シフト種別"、対象月内）の整合
+  - 週間パターン形式の要件（weeklyPattern / exceptions / closedDays）の曜日・日付・シフト種別
+エラーは途中で打ち切らずすべて集めて返す。
+
+正規化: 任意フィールドの既定値補完、日付・要件キーのゼロ埋め正規形への変換、
+未知フィールドの除去、週間パターン形式の要件索引（RequirementIndex）への展開。
+ビルダーは正規化後のリクエストだけを受け取る。
+
+ortools を import しない（コールドスタート時のエンドポイント import を軽く保つ）。
+"""
+
+import datetime
+import re
+import types
+from copy import copy
+from functools import lru_cache
+from typing import Any, Callable, Union, get_args, get_origin, get_type_hints, is_typeddict
+
+from solver import tracing
+from solver.month_calendar import get_calendar
+from solver.requirement_pattern import WEEKDAY_KEYS, RequirementIndex
+from solver.types import (
+    ALL_SHIFT_TYPES,
+    COVERAGE_MODES,
+    COVERAGE_STAGE,
+    LEAVE_TYPES,
+    MAX_DETERMINISTIC_TIME,
+    OBJECTIVE_MODES,
+    OBJECTIVE_STAGES,
+    QUALIFICATIONS,
+    REQUIREMENT_SHIFT_TYPES,
+    ROLES,
+    SCHEDULE_FORMATS,
+    SKELETON_MODES,
+    SOLVE_TIME_BUDGET_SEC,
+    TIME_LIMIT_MODES,
+    TIME_SLOT_PREFERENCES,
+    RequestValidationErrorDict,
+)
+
+# 検証関数: (値, パス, エラー蓄積先) → 正規化後の値（不正なら _INVALID）
+Validator = Callable[[Any, str, list[RequestValidationErrorDict]], Any]
+
+_INVALID = object()
+_REQUIRED = object()
+_OMIT = object()  # 任意・既定値なし（正規化後も省略のまま）
+
+# フィールド名 → 許可値（list の要素・dict の値にも適用）
+_ENUM_FIELDS: dict[str, list[str]] = {
+    "role": ROLES,
+    "qualifications": QUALIFICATIONS,
+    "qualification": QUALIFICATIONS,
+    "timeSlotPreference": TIME_SLOT_PREFERENCES,
+    "shiftType": ALL_SHIFT_TYPES,
+    "previousMonthTail": ALL_SHIFT_TYPES,
+    "scheduleFormat": SCHEDULE_FORMATS,
+    "skeletonMode": SKELETON_MODES,
+    "objectiveMode": OBJECTIVE_MODES,
+    "objectivePriority": OBJECTIVE_STAGES + [COVERAGE_STAGE],
+    "timeLimitMode": TIME_LIMIT_MODES,
+    "coverageMode": COVERAGE_MODES,
+}
+
+# フィールド名 → 数値範囲（両端を含む、上限 None は無制限）
+_RANGE_FIELDS: dict[str, tuple[float, float | None]] = {
+    "hope": (0, 7),
+    "must": (0, 7),
+    "maxConsecutiveWorkDays": (1, None),
+    "availableWeekdays": (0, 6),
+    "restDays": (1, 31),
+    "nightShiftDays": (1, 31),
+    "nightShiftFollowupDays": (1, 31),
+    "totalStaff": (0, None),
+    "count": (0, None),
+    "nextMonthOverlapDays": (0, 2),
+    "stageTimeLimitSec": (0.1, SOLVE_TIME_BUDGET_SEC),
+    "maxDeterministicTime": (0.01, MAX_DETERMINISTIC_TIME),
+}
+
+# 文字列が日付（"YYYY-MM-DD"）であるフィールド
+_DATE_FIELDS = {"unavailableDates", "date", "closedDays"}
+
+# 任意フィールド（TypedDict の NotRequired / total=False）の既定値。ここにないフィールド、
+# 型注釈と型が合わないフィールド（RepairChangesDict.unavailableDates は dict）は補完しない
+_DEFAULTS: dict[str, Any] = {
+    "leaveRequests": {},
+    "isNightShiftOnly": False,
+    "unavailableDates": [],
+}
+
+_TARGET_MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+
+def validate_request(
+    data: Any, request_type: type
+) -> tuple[dict, list[RequestValidationErrorDict]]:
+    """リクエストを検証・正規化する → (正規化後のリクエスト, エラー一覧)
+
+    request_type は solver.types のリクエスト型（SolverRequest 等）。
+    エラーが空でなければ正規化後のリクエストは使わないこと。
+    """
+    errors: list[RequestValidationErrorDict] = []
+    with tracing.span("request.validate", **{"solver.request_type": request_type.__name__}) as sp:
+        normalized = _compile(request_type)(data, "", errors)
+        if normalized is _INVALID:
+            normalized = {}
+        else:
+            _check_request(normalized, errors)
+        sp.set_attribute("solver.validation_errors", len(errors))
+    return normalized, errors
+
+
+def _error(path: str, message: str, **extra) -> RequestValidationErrorDict:
+    return RequestValidationErrorDict(path=path or "$", message=message, **extra)
+
+
+def _join(path: str, name: str) -> str:
+    return f"{path}.{name}" if path else name
+
+
+@lru_cache(maxsize=None)
+def _canonical_date(value: str) -> str | None:
+    """日付文字列 → ゼロ埋め正規形（実在しない日付・不正形式は None）"""
+    parts = value.split("-")
+    if len(parts) != 3:
+        return None
+    try:
+        return datetime.date(int(parts[0]), int(parts[1]), int(parts[2])).isoformat()
+    except ValueError:
+        return None
+
+
+# --- 検証関数の組み立て ---
+
+@lru_cache(maxsize=None)
+def _compile(tp: Any, field: str = "") -> Validator:
+    """型注釈 → 検証関数（field はフィールド名ごとの規則の引き当てに使う）"""
+    if field == "leaveRequests":
+        return _validate_leave_requests
+    if is_typeddict(tp):
+        return _compile_typeddict(tp)
+
+    origin = get_origin(tp)
+    if origin is list:
+        return _compile_list(_compile(get_args(tp)[0], field))
+    if origin is dict:
+        return _compile_dict(_compile(get_args(tp)[1], field))
+    if origin in (Union, types.UnionType):
+        # X | None のみ（None はそのまま通す）
+        (inner,) = [a for a in get_args(tp) if a is not type(None)]
+        return _compile_optional(_compile(inner, field))
+    if tp is str:
+        if field in _DATE_FIELDS:
+            return _validate_date
+        if field in _ENUM_FIELDS:
+            return _compile_enum(_ENUM_FIELDS[field])
+        return _compile_scalar(str, "文字列")
+    if tp is bool:
+        return _compile_scalar(bool, "真偽値")
+    if tp is int:
+        return _compile_int(_RANGE_FIELDS.get(field))
+    if tp is float:
+        return _compile_number(_RANGE_FIELDS.get(field))
+    raise TypeError(f"検証できない型注釈: {tp!r}")
+
+
+def _compile_typeddict(td: type) -> Validator:
+    fields = [
+        (name, _compile(hint, name), _field_default(td, name, hint))
+        for name, hint in get_type_hints(td).items()
+    ]
+
+    def validate(value, path, errors):
+        if not isinstance(value, dict):
+            errors.append(_error(path, "オブジェクトが必要です"))
+            return _INVALID
+        out = {}
+        for name, check, default in fields:
+            if name not in value:
+                if default is _REQUIRED:
+                    errors.append(_error(_join(path, name), "必須フィールドがありません"))
+                elif default is not _OMIT:
+                    out[name] = copy(default)
+                continue
+            result = check(value[name], _join(path, name), errors)
+            if result is not _INVALID:
+                out[name] = result
+        return out
+
+    return validate
+
+
+def _field_default(td: type, name: str, hint: Any) -> Any:
+    """必須なら _REQUIRED、任意なら既定値（補完しないものは _OMIT）"""
+    if name in td.__required_keys__:
+        return _REQUIRED
+    default = _DEFAULTS.get(name, _OMIT)
+    if default is _OMIT or not isinstance(default, get_origin(hint) or hint):
+        return _OMIT
+    return default
+
+
+def _compile_list(check_item: Validator) -> Validator:
+    def validate(value, path, errors):
+        if not isinstance(value, list):
+            errors.append(_error(path, "配列が必要です"))
+            return _INVALID
+        out = []
+        for i, item in enumerate(value):
+            result = check_item(item, f"{path}[{i}]", errors)
+            if result is not _INVALID:
+                out.append(result)
+        return out
+
+    return validate
+
+
+def _compile_dict(check_value: Validator) -> Validator:
+    def validate(value, path, errors):
+        if not isinstance(value, dict):
+            errors.append(_error(path, "オブジェクトが必要です"))
+            return _INVALID
+        out = {}
+        for key, item in value.items():
+            result = check_value(item, f"{path}[{key!r}]", errors)
+            if result is not _INVALID:
+                out[key] = result
+        return out
+
+    return validate
+
+
+def _compile_optional(check: Validator) -> Validator:
+    def validate(value, path, errors):
+        return None if value is None else check(value, path, errors)
+
+    return validate
+
+
+def _compile_scalar(expected: type, label: str) -> Validator:
+    def validate(value, path, errors):
+        if type(value) is not expected:
+            errors.append(_error(path, f"{label}が必要です"))
+            return _INVALID
+        return value
+
+    return validate
+
+
+def _compile_enum(allowed: list[str]) -> Validator:
+    allowed_set = frozenset(allowed)
+
+    def validate(value, path, errors):
+        if type(value) is not str or value not in allowed_set:
+            errors.append(_error(path, f"不正な値です: {value!r}", allowedValues=allowed))
+            return _INVALID
+        return value
+
+    return validate
+
+
+def _in_range(
+    value: float, bounds: tuple[float, float | None] | None, path: str,
+    errors: list[RequestValidationErrorDict],
+) -> bool:
+    if bounds is None:
+        return True
+    low, high = bounds
+    if value < low or (high is not None and value > high):
+        upper = "" if high is None else str(high)
+        errors.append(_error(path, f"範囲外の値です: {value}（{low}〜{upper}）"))
+        return False
+    return True
+
+
+def _compile_int(bounds: tuple[float, float | None] | None) -> Validator:
+    def validate(value, path, errors):
+        if type(value) is not int:
+            errors.append(_error(path, "整数が必要です"))
+            return _INVALID
+        return value if _in_range(value, bounds, path, errors) else _INVALID
+
+    return validate
+
+
+def _compile_number(bounds: tuple[float, float | None] | None) -> Validator:
+    def validate(value, path, errors):
+        if type(value) not in (int, float) or value != value:  # NaN を除く
+            errors.append(_error(path, "数値が必要です"))
+            return _INVALID
+        return float(value) if _in_range(value, bounds, path, errors) else _INVALID
+
+    return validate
+
+
+def _validate_date(value, path, errors):
+    canonical = _canonical_date(value) if type(value) is str else None
+    if canonical is None:
+        errors.append(_error(path, f"日付（YYYY-MM-DD）が不正です: {value!r}"))
+        return _INVALID
+    return canonical
+
+
+_check_leave_type = _compile_enum(LEAVE_TYPES)
+
+
+def _validate_leave_requests(value, path, errors):
+    """staffId → {日付: 休暇種別}"""
+    if not isinstance(value, dict):
+        errors.append(_error(path, "オブジェクトが必要です"))
+        return _INVALID
+    out = {}
+    for staff_id, leaves in value.items():
+        staff_path = f"{path}[{staff_id!r}]"
+        if not isinstance(leaves, dict):
+            errors.append(_error(staff_path, "オブジェクトが必要です"))
+            continue
+        staff_out = {}
+        for date_str, leave_type in leaves.items():
+            date_path = f"{staff_path}[{date_str!r}]"
+            date = _validate_date(date_str, date_path, errors)
+            leave = _check_leave_type(leave_type, date_path, errors)
+            if date is not _INVALID and leave is not _INVALID:
+                staff_out[date] = leave
+        out[staff_id] = staff_out
+    return out
+
+
+# --- 項目間の整合 ---
+
+def _check_request(request: dict, errors: list[RequestValidationErrorDict]) -> None:
+    """targetMonth・要件キー・スタッフIDの整合（構造検証を通った部分のみ）"""
+    staff_ids: set[str] = set()
+    for i, staff in enumerate(request.get("staffList", [])):
+        staff_id = staff.get("id")
+        if staff_id in staff_ids:
+            errors.append(_error(f"staffList[{i}].id", f"スタッフIDが重複しています: {staff_id}"))
+        staff_ids.add(staff_id)
+
+    requirements = request.get("requirements")
+    if not isinstance(requirements, dict) or "targetMonth" not in requirements:
+        return
+    target_month = requirements["targetMonth"]
+    if not _TARGET_MONTH_RE.match(target_month) or not 1 <= int(target_month[5:]) <= 12:
+        errors.append(_error(
+            "requirements.targetMonth", f"対象月（YYYY-MM）が不正です: {target_month!r}",
+        ))
+        return
+    cal = get_calendar(target_month)
+
+    has_pattern = "weeklyPattern" in requirements
+    if ("requirements" in requirements) == has_pattern:
+        errors.append(_error(
+            "requirements", "requirements（日別）か weeklyPattern（週間パターン）のどちらか一方が必要です",
+        ))
+    elif has_pattern:
+        _expand_weekly_pattern(requirements, cal, errors)
+    else:
+        for name in ("exceptions", "closedDays"):
+            if name in requirements:
+                errors.append(_error(
+                    f"requirements.{name}", "weeklyPattern（週間パターン）と併用してください",
+                ))
+        requirements["requirements"] = _normalize_requirement_keys(
+            requirements["requirements"], cal, "requirements.requirements", errors,
+        )
+    for i, scenario in enumerate(request.get("scenarios", [])):
+        if scenario.get("requirements"):
+            scenario["requirements"] = _normalize_requirement_keys(
+                scenario["requirements"], cal, f"scenarios[{i}].requirements", errors,
+            )
+
+
+def _normalize_requirement_keys(
+    reqs: dict, cal, path: str, errors: list[RequestValidationErrorDict]
+) -> dict:
+    """要件キーを "YYYY-MM-DD_シフト種別"（対象月内）の正規形にそろえる"""
+    out = {}
+    for key, req in reqs.items():
+        key_path = f"{path}[{key!r}]"
+        date_str, sep, shift_type = key.partition("_")
+        date = _canonical_date(date_str) if sep else None
+        if date is None or cal.day_for(date) is None:
+            errors.append(_error(
+                key_path, f"要件キーは対象月{cal.target_month}の「YYYY-MM-DD_シフト種別」が必要です",
+            ))
+            continue
+        if shift_type not in REQUIREMENT_SHIFT_TYPES:
+            errors.append(_error(
+                key_path, f"不正なシフト種別です: {shift_type!r}",
+                allowedValues=REQUIREMENT_SHIFT_TYPES,
+            ))
+            continue
+        canonical = f"{date}_{shift_type}"
+        if canonical in out:
+            errors.append(_error(key_path, f"要件キーが重複しています: {canonical}"))
+            continue
+        out[canonical] = req
+    return out
+
+
+def _expand_weekly_pattern(
+    requirements: dict, cal, errors: list[RequestValidationErrorDict]
+) -> None:
+    """weeklyPattern / exceptions / closedDays を検証し、requirements の索引に置き換える"""
+    pattern = {}
+    for weekday, shifts in requirements.pop("weeklyPattern").items():
+        path = f"requirements.weeklyPattern[{weekday!r}]"
+        if weekday not in WEEKDAY_KEYS:
+            errors.append(_error(path, "曜日は \"0\"（日）〜\"6\"（土）です", allowedValues=WEEKDAY_KEYS))
+            continue
+        pattern[weekday] = _check_shift_keys(shifts, path, errors)
+
+    exceptions = {}
+    for date_str, shifts in requirements.pop("exceptions", {}).items():
+        path = f"requirements.exceptions[{date_str!r}]"
+        date = _canonical_date(date_str)
+        if date is None or cal.day_for(date) is None:
+            errors.append(_error(path, f"対象月{cal.target_month}の日付（YYYY-MM-DD）が必要です"))
+            continue
+        if date in exceptions:
+            errors.append(_error(path, f"例外の日付が重複しています: {date}"))
+            continue
+        exceptions[date] = _check_shift_keys(shifts, path, errors)
+
+    closed_days = requirements.pop("closedDays", [])
+    for i, date in enumerate(closed_days):
+        if cal.day_for(date) is None:
+            errors.append(_error(
+                f"requirements.closedDays[{i}]", f"対象月{cal.target_month}の日付が必要です",
+            ))
+
+    requirements["requirements"] = RequirementIndex(
+        cal.target_month, pattern, exceptions, closed_days
+    )
+
+
+def _check_shift_keys(shifts: dict, path: str, errors: list[RequestValidationErrorDict]) -> dict:
+    """シフト種別 → 要件 のキーを検証（不正なキーは除く）"""
+    out = {}
+    for shift_type, req in shifts.items():
+        if shift_type not in REQUIREMENT_SHIFT_TYPES:
+            errors.append(_error(
+                f"{path}[{shift_type!r}]", f"不正なシフト種別です: {shift_type!r}",
+                allowedValues=REQUIREMENT_SHIFT_TYPES,
+            ))
+            continue
+        out[shift_type] = req
+    return out
+
+
+def validation_error_response(errors: list[RequestValidationErrorDict]) -> dict:
+    """検証エラー → エンドポイントの400レスポンス本体"""
+    return {
+        "success": False,
+        "error": f"リクエストが不正です（{len(errors)}件）: {errors[0]['path']} {errors[0]['message']}",
+        "errorType": "VALIDATION_ERROR",
+        "details": {"validationErrors": errors},
+    }
@@ -0,0 +1,74 @@
+"""
+週間パターン形式のシフト要件: 曜日×シフトのテンプレート＋日付ごとの例外＋休業日
+
+日別形式（requirements）は 日付×シフト ごとにほぼ同一の DailyRequirementDict を
+1か月で93〜124件送るが、週間パターン形式では曜日ごとの要件7件と差分だけを送る:
+
+  {"targetMonth": "2026-03", "timeSlots": [...],
+   "weeklyPattern": {"0": {"日勤": {...}}, "1": {"早番": {...}, "日勤": {...}, "遅番": {...}}, ...},
+   "exceptions": {"2026-03-20": {"早番": null, "日勤": {...}}},
+   "closedDays": ["2026-03-31"]}
+
+RequirementIndex は "YYYY-MM-DD_シフト種別" → 要件 を引くたびにパターンから解決する
+読み取り専用の索引（Mapping）で、日別形式の dict と同じように使える（展開済みの dict は作らない）。
+同じ曜日・例外なしの日は同じ DailyRequirementDict オブジェクトを返す。
+
+ortools を import しない。
+"""
+
+from collections.abc import Iterator, Mapping
+
+from solver.month_calendar import get_calendar
+from solver.types import REQUIREMENT_SHIFT_TYPES, DailyRequirementDict
+
+WEEKDAY_KEYS = ["0", "1", "2", "3", "4", "5", "6"]
+
+
+class RequirementIndex(Mapping):
+    """週間パターン＋例外＋休業日 → 「日付_シフト種別」をキーとする要件の索引"""
+
+    def __init__(
+        self,
+        target_month: str,
+        weekly_pattern: dict[str, dict[str, DailyRequirementDict]],
+        exceptions: dict[str, dict[str, DailyRequirementDict | None]] | None = None,
+        closed_days: list[str] | None = None,
+    ) -> None:
+        self._cal = get_calendar(target_month)
+        self._pattern = weekly_pattern
+        self._exceptions = exceptions or {}
+        self._closed = frozenset(closed_days or ())
+        self._keys: tuple[str, ...] | None = None
+
+    def __getitem__(self, key: str) -> DailyRequirementDict:
+        date, _, shift_type = key.partition("_")
+        day = self._cal.day_of.get(date)
+        if day is None or date in self._closed:
+            raise KeyError(key)
+        override = self._exceptions.get(date, {})
+        if shift_type in override:
+            req = override[shift_type]
+        else:
+            req = self._pattern.get(str(self._cal.weekdays[day - 1]), {}).get(shift_type)
+        if req is None:
+            raise KeyError(key)
+        return req
+
+    def __iter__(self) -> Iterator[str]:
+        """日付順・シフト種別順にキーを返す（初回に一覧を作ってキャッシュ）"""
+        if self._keys is None:
+            self._keys = tuple(
+                key
+                for date in self._cal.dates
+                for shift_type in REQUIREMENT_SHIFT_TYPES
+                if (key := f"{date}_{shift_type}") in self
+            )
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        if self._keys is None:
+            iter(self)
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"RequirementIndex({self._cal.target_month!r}, {len(self)} entries)"
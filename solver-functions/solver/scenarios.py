@@ -0,0 +1,230 @@
+"""
+What-ifシナリオ比較
+
+基準リクエストを1回解き、その解をヒントとしてK個の変更シナリオ
+（スタッフ追加・除外、要件の上書き・削除）をプロセスプールで並列に求解する。
+結果は実行可否・目的関数値・要員不足・基準からの変更セル数の比較表で返す。
+各シナリオは要員不足を許して解き（人手が足りなくても実行不能にしない）、要員不足は
+求解後のグリッドを要件（日付×シフトの必要人数・資格・役職）と照合して数える。
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ortools.sat.python import cp_model
+
+from solver.eligibility import StaffEligibility
+from solver.lexicographic import solve_lexicographic
+from solver.month_calendar import get_calendar
+from solver.repair import changed_cells, schedule_cells
+from solver.solution import grid_to_schedules
+from solver.types import (
+    COVERAGE_STAGE,
+    ScenarioDict,
+    ShiftRequirementDict,
+    ShortageDict,
+    StaffDict,
+    StaffScheduleDict,
+)
+from solver.unified_builder import WEIGHTED_STAGE, UnifiedModelBuilder
+
+
+def apply_scenario(
+    staff_list: list[StaffDict],
+    requirements: ShiftRequirementDict,
+    scenario: ScenarioDict,
+) -> tuple[list[StaffDict], ShiftRequirementDict]:
+    """シナリオの差分を適用した staff_list・requirements を返す（入力は変更しない）"""
+    removed = set(scenario.get("removedStaffIds", []))
+    new_staff = [s for s in staff_list if s["id"] not in removed]
+    new_staff.extend(scenario.get("addStaff", []))
+
+    overrides = scenario.get("requirements", {})
+    if overrides:
+        reqs = dict(requirements["requirements"])
+        for key, req in overrides.items():
+            if req is None:
+                reqs.pop(key, None)
+            else:
+                reqs[key] = req
+        requirements = {**requirements, "requirements": reqs}
+    return new_staff, requirements
+
+
+def grid_shortages(
+    staff_list: list[StaffDict],
+    requirements: ShiftRequirementDict,
+    grid: list[list[str]],
+) -> list[ShortageDict]:
+    """grid[staff_pos][day-1] の配置を要件と照合し、不足している要件を返す（要件キー順）
+
+    必要人数（totalStaff）と資格・役職ごとの下限を、その日・シフトに配置された
+    スタッフのマスクから数える。
+    """
+    eligibility = StaffEligibility(staff_list)
+    shortages: list[ShortageDict] = []
+    for key, req in requirements["requirements"].items():
+        date, _, shift_type = key.partition("_")
+        day = int(date.rsplit("-", 1)[1])
+        assigned = 0
+        for pos, row in enumerate(grid):
+            if row[day - 1] == shift_type:
+                assigned |= 1 << pos
+        checks = [({}, req["totalStaff"], assigned.bit_count())]
+        checks.extend(
+            ({kind: name}, required_count, (assigned & mask).bit_count())
+            for kind, name, mask, required_count in eligibility.requirement_groups(req)
+        )
+        for group, required_count, assigned_count in checks:
+            if assigned_count < required_count:
+                shortages.append(ShortageDict(
+                    date=date,
+                    shiftType=shift_type,
+                    **group,
+                    requiredCount=required_count,
+                    assignedCount=assigned_count,
+                    shortage=required_count - assigned_count,
+                ))
+    return shortages
+
+
+def solve_variant(
+    staff_list: list[StaffDict],
+    requirements: ShiftRequirementDict,
+    leave_requests: dict[str, dict[str, str]],
+    hint_cells: dict[tuple[str, int], str] | None,
+    time_limit_sec: float,
+) -> tuple[int, str, dict, list[StaffScheduleDict] | None]:
+    """1シナリオを求解し (status, statusName, stats, schedule) を返す
+
+    要員不足を許す（coverage_mode="soft"）モデルで、不足の最小化（ギャップ0）→
+    全ステージの重み付き和 の2段で解く（時間上限は2段合計で time_limit_sec）。
+    人手の足りないシナリオも INFEASIBLE にせず、不足を比較表に出す。
+    """
+    builder = UnifiedModelBuilder(
+        staff_list, requirements, leave_requests, coverage_mode="soft",
+    )
+    model = builder.build()
+    if hint_cells:
+        builder.add_hints(hint_cells)
+
+    stages = builder.objective_stages
+    all_terms = [t for terms in stages.values() for t in terms]
+    start_time = time.time()
+    solver, status, _ = solve_lexicographic(
+        model,
+        {COVERAGE_STAGE: stages[COVERAGE_STAGE], WEIGHTED_STAGE: all_terms},
+        [COVERAGE_STAGE, WEIGHTED_STAGE],
+        time_limit_sec,
+        exact_stages=(COVERAGE_STAGE,),
+        total_time_limit_sec=time_limit_sec,
+    )
+    solve_time_ms = int((time.time() - start_time) * 1000)
+
+    feasible = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    stats = {
+        "solveTimeMs": solve_time_ms,
+        "numVariables": len(model.Proto().variables),
+        "numConstraints": len(model.Proto().constraints),
+        "objectiveValue": (
+            int(solver.Value(cp_model.LinearExpr.Sum(all_terms))) if feasible else None
+        ),
+        "warnings": builder.warnings,
+        "shortages": None,
+    }
+    schedule = None
+    if feasible:
+        grid = builder.extract_grid(solver)
+        stats["shortages"] = grid_shortages(staff_list, requirements, grid)
+        target_month = requirements["targetMonth"]
+        schedule = grid_to_schedules(
+            staff_list, target_month, get_calendar(target_month).days_in_month, grid,
+        )
+    return status, solver.StatusName(status), stats, schedule
+
+
+def _comparison_row(name: str, status_name: str, stats: dict, schedule) -> dict:
+    return {
+        "name": name,
+        "success": schedule is not None,
+        "status": status_name,
+        "objectiveValue": stats["objectiveValue"],
+        "shortageCount": (
+            sum(s["shortage"] for s in stats["shortages"])
+            if stats["shortages"] is not None else None
+        ),
+        "shortages": stats["shortages"],
+        "warnings": stats["warnings"],
+        "solveTimeMs": stats["solveTimeMs"],
+        "numVariables": stats["numVariables"],
+    }
+
+
+def _run_scenario(args: tuple) -> dict:
+    """プロセスプールのワーカー: シナリオ1件の比較行を返す"""
+    (name, staff_list, requirements, leave_requests, hint_cells,
+     base_schedule, time_limit_sec, include_schedule) = args
+    try:
+        status, status_name, stats, schedule = solve_variant(
+            staff_list, requirements, leave_requests, hint_cells, time_limit_sec
+        )
+    except Exception as e:
+        return {"name": name, "success": False, "status": "INTERNAL_ERROR", "error": str(e)}
+
+    row = _comparison_row(name, status_name, stats, schedule)
+    if schedule is not None and base_schedule is not None:
+        row["changedCellCount"] = len(
+            changed_cells(requirements["targetMonth"], base_schedule, schedule)
+        )
+    if include_schedule:
+        row["schedule"] = schedule
+    return row
+
+
+def compare_scenarios(
+    staff_list: list[StaffDict],
+    requirements: ShiftRequirementDict,
+    leave_requests: dict[str, dict[str, str]],
+    scenarios: list[ScenarioDict],
+    time_limit_sec: float = 10.0,
+    max_workers: int | None = None,
+    include_schedules: bool = False,
+) -> dict:
+    """基準＋K個のシナリオを求解して比較表を返す
+
+    基準はこのプロセスで解き、その解を各シナリオのヒントにする。
+    シナリオはspawnしたプロセスプールで並列に解く（ortoolsのスレッドとforkの相性を避ける）。
+    """
+    _, base_status_name, base_stats, base_schedule = solve_variant(
+        staff_list, requirements, leave_requests, None, time_limit_sec
+    )
+    hint_cells = (
+        schedule_cells(requirements["targetMonth"], base_schedule)
+        if base_schedule is not None else None
+    )
+    base_row = _comparison_row("base", base_status_name, base_stats, base_schedule)
+    if include_schedules:
+        base_row["schedule"] = base_schedule
+
+    jobs = []
+    for i, scenario in enumerate(scenarios):
+        s_staff, s_reqs = apply_scenario(staff_list, requirements, scenario)
+        jobs.append((
+            scenario.get("name", f"scenario{i + 1}"),
+            s_staff, s_reqs, leave_requests, hint_cells,
+            base_schedule, time_limit_sec, include_schedules,
+        ))
+
+    rows: list[dict] = []
+    if jobs:
+        workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+        if workers <= 1:
+            rows = [_run_scenario(job) for job in jobs]
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                rows = list(pool.map(_run_scenario, jobs))
+
+    return {"base": base_row, "scenarios": rows}
@@ -1,27 +1,133 @@
 """
 SolverService: CP-SAT求解のオーケストレーション
 
-SolverModelBuilder → ConstraintBuilder → ObjectiveBuilder → CpSolver
-の一連のパイプラインを実行し、結果をSolverResponse形式で返す。
+Skeleton付きリクエストを事前検証したうえで、統合エンジン（UnifiedModelBuilder）に
+Skeletonを固定（fix）またはヒント（hint）として渡して求解し、SolverResponse形式で返す。
 
-UnifiedSolverService: Phase 1-3統合版（Skeleton不要）
+UnifiedSolverService: Phase 1-3統合版（Skeleton不要）、局所修復（repair）、
+                     What-ifシナリオ比較（compare_scenarios）
+
+コールドスタート短縮のため、各パイプラインのビルダーは solve() 内で遅延importする
+（統合エンドポイントはSkeleton系モジュールを読み込まない）。
 """
 
 import time
 
 from ortools.sat.python import cp_model
 
-from solver.model_builder import SolverModelBuilder
-from solver.constraints import ConstraintBuilder
-from solver.objective import ObjectiveBuilder
-from solver.unified_builder import UnifiedModelBuilder
+from solver import tracing
+from solver.parameter_profile import (
+    active_profile,
+    apply_parameters,
+    requirement_tightness,
+    select_profile,
+)
 from solver.types import (
+    SOLVE_TIME_BUDGET_SEC,
+    RepairChangesDict,
+    ScenarioDict,
     ScheduleSkeletonDict,
     ShiftRequirementDict,
     StaffDict,
+    StaffScheduleDict,
 )
 
 
+# 決定的時間モードの上限（変数数に比例、CP-SATの決定的時間単位）。
+# 1コア実測で 壁時計秒 ≈ 決定的時間 × 2.5〜4、100名×3シフト（約1.8万変数）の
+# 5%ギャップ到達が約1.7 → 同規模で約11を割り当てる
+DETERMINISTIC_TIME_BASE = 2.0
+DETERMINISTIC_TIME_PER_VARIABLE = 0.0005
+DETERMINISTIC_TIME_MAX = 15.0
+
+
+def deterministic_time_limit(num_variables: int) -> float:
+    """問題規模（変数数）に応じた決定的時間の上限"""
+    return min(
+        DETERMINISTIC_TIME_MAX,
+        DETERMINISTIC_TIME_BASE + num_variables * DETERMINISTIC_TIME_PER_VARIABLE,
+    )
+
+
+def _deterministic_time(solver: cp_model.CpSolver, stage_reports: list[dict] | None) -> float:
+    """使用した決定的時間（辞書式モードは全ステージの合計）"""
+    if stage_reports:
+        return round(sum(r["deterministicTime"] for r in stage_reports), 3)
+    return round(solver.deterministic_time, 3)
+
+
+def _solver_parameters(
+    builder, model: cp_model.CpModel, staff_list: list[StaffDict], requirements: ShiftRequirementDict,
+) -> tuple[dict, dict]:
+    """モデルを分類して求解パラメータを選ぶ → (solverStats用のプロファイル情報, パラメータ)
+
+    規模別プロファイルの上に、チューニング済みプロファイル（あれば）を重ねる。
+    """
+    features = {
+        "numVariables": len(model.Proto().variables),
+        "staffCount": len(staff_list),
+        "nightFacility": builder.is_night_facility,
+        "tightness": requirement_tightness(
+            requirements, len(staff_list), builder.days_in_month
+        ),
+    }
+    profile = select_profile(features)
+    parameters = dict(profile["parameters"])
+    tuned = active_profile()
+    if tuned is not None:
+        parameters.update(tuned["parameters"])
+    profile_stats = {
+        "name": profile["name"],
+        "tunedProfile": tuned.get("name") if tuned is not None else None,
+        "features": features,
+    }
+    return profile_stats, parameters
+
+
+def _schedule_payload(builder, solver: cp_model.CpSolver, schedule_format: str) -> dict:
+    """scheduleFormatに応じたスケジュール部分のレスポンスを生成"""
+    with tracing.span("solution.extract", **{"solver.schedule_format": schedule_format}):
+        if schedule_format == "compact":
+            return {"compactSchedule": builder.extract_compact(solver)}
+        return {"schedule": builder.extract_solution(solver)}
+
+
+def _skeleton_precheck(
+    staff_list: list[StaffDict],
+    skeleton: ScheduleSkeletonDict,
+    requirements: ShiftRequirementDict,
+    leave_requests: dict[str, dict[str, str]],
+) -> dict | None:
+    """Skeletonを事前検証し、矛盾があればエラーレスポンス（なければ None）を返す"""
+    from solver.skeleton_validation import validate_skeleton
+
+    start_time = time.time()
+    try:
+        with tracing.span("skeleton.validate", **{"solver.staff_count": len(staff_list)}):
+            validation_errors = validate_skeleton(
+                staff_list, skeleton, requirements, leave_requests
+            )
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "errorType": "INTERNAL_ERROR",
+            "details": {},
+        }
+    if not validation_errors:
+        return None
+    return {
+        "success": False,
+        "error": f"Skeletonが制約を満たせません（{len(validation_errors)}件）",
+        "errorType": "INFEASIBLE",
+        "details": {
+            "status": "SKELETON_INVALID",
+            "validationErrors": validation_errors,
+            "validationTimeMs": int((time.time() - start_time) * 1000),
+        },
+    }
+
+
 class SolverService:
     @staticmethod
     def solve(
@@ -29,45 +135,182 @@ class SolverService:
         skeleton: ScheduleSkeletonDict,
         requirements: ShiftRequirementDict,
         leave_requests: dict[str, dict[str, str]],
+        schedule_format: str = "default",
+        skeleton_mode: str = "fix",
     ) -> dict:
-        """CP-SAT求解を実行し結果を返す"""
-        try:
-            builder = SolverModelBuilder(
-                staff_list, skeleton, requirements, leave_requests
-            )
-            model = builder.build_model()
-            variables = builder.get_variables()
+        """Skeletonを統合エンジンに渡して求解し結果を返す
 
-            ConstraintBuilder.add_hard_constraints(
-                model, variables, staff_list, skeleton, requirements, leave_requests
-            )
-            ObjectiveBuilder.add_soft_constraints(
-                model, variables, staff_list, requirements
-            )
+        skeleton_mode="fix" では求解前にSkeletonを事前検証し、矛盾があればCP-SATを呼ばずに
+        details.validationErrors に構造化エラーを入れて INFEASIBLE を返す。
+        "hint" ではSkeletonは解のヒントにすぎないため検証しない。
+        schedule_format="compact" の場合は schedule の代わりに compactSchedule を返す。
+        """
+        if skeleton_mode == "fix":
+            error = _skeleton_precheck(staff_list, skeleton, requirements, leave_requests)
+            if error is not None:
+                return error
+
+        return UnifiedSolverService.solve(
+            staff_list, requirements, leave_requests,
+            schedule_format=schedule_format,
+            skeleton=skeleton,
+            skeleton_mode=skeleton_mode,
+        )
+
+
+class UnifiedSolverService:
+    """Phase 1-3統合Solver（Skeletonは任意）"""
+
+    @staticmethod
+    def solve(
+        staff_list: list[StaffDict],
+        requirements: ShiftRequirementDict,
+        leave_requests: dict[str, dict[str, str]],
+        schedule_format: str = "default",
+        previous_month_tail: dict[str, list[str]] | None = None,
+        next_month_overlap_days: int = 0,
+        objective_mode: str = "weighted",
+        objective_priority: list[str] | None = None,
+        stage_time_limit_sec: float = 10.0,
+        skeleton: ScheduleSkeletonDict | None = None,
+        skeleton_mode: str = "fix",
+        time_limit_mode: str = "wallclock",
+        max_deterministic_time: float | None = None,
+        coverage_mode: str = "hard",
+    ) -> dict:
+        """統合CP-SAT求解を実行し結果を返す
+
+        schedule_format="compact" の場合は schedule の代わりに compactSchedule を返す。
+        previous_month_tail / next_month_overlap_days で月またぎの状態を引き継ぐ。
+        objective_mode="lexicographic" の場合はソフト制約を objective_priority の順に
+        1段ずつ最適化する（各段 stage_time_limit_sec 秒まで、全段の合計は SOLVE_TIME_BUDGET_SEC まで）。
+        skeleton を渡すと skeleton_mode（"fix" | "hint"）で固定またはヒントとして適用する。
+        time_limit_mode="deterministic" では壁時計ではなく決定的時間
+        （max_deterministic_time、省略時は deterministic_time_limit(変数数)）で打ち切るため、
+        CPU負荷によらず同一入力から同一の解が得られる（壁時計の上限は、エンドポイントの
+        タイムアウトより短い安全上限 SOLVE_TIME_BUDGET_SEC（辞書式モードは全ステージ合計）に
+        置き換わる。これに当たった場合だけ再現性は保証されない）。
+        求解パラメータはモデルの規模・夜勤施設か・要件の厳しさから規模別プロファイルを選び、
+        SOLVER_PARAMETER_PROFILE のチューニング済みプロファイル（solver.tuning で作成）を
+        その上に重ねる。選んだプロファイルは solverStats.parameterProfile に返す。
+        coverage_mode="soft" では必要人数・資格要件の不足を許して重いペナルティを課し、
+        人手が足りなくても解（下書き）と不足一覧 shortages を返す。不足の最小化は
+        どちらのモードでも最優先のステージとして単独でギャップ0まで解いて固定し、
+        重み付きモードではその後に全ステージの重み付き和を最大化する。
+        """
+        from solver.lexicographic import solve_lexicographic
+        from solver.unified_builder import (
+            COVERAGE_STAGE,
+            DEFAULT_OBJECTIVE_PRIORITY,
+            WEIGHTED_STAGE,
+            UnifiedModelBuilder,
+        )
+
+        try:
+            build_start = time.time()
+            with tracing.span("model.build", **{"solver.staff_count": len(staff_list)}) as sp:
+                builder = UnifiedModelBuilder(
+                    staff_list, requirements, leave_requests,
+                    previous_month_tail=previous_month_tail,
+                    next_month_overlap_days=next_month_overlap_days,
+                    skeleton=skeleton,
+                    skeleton_mode=skeleton_mode,
+                    coverage_mode=coverage_mode,
+                )
+                model = builder.build()
+                sp.set_attribute("solver.days", builder.days_in_month)
+                sp.set_attribute("solver.warnings", len(builder.warnings))
+            build_time_ms = int((time.time() - build_start) * 1000)
+            pre_warnings = builder.warnings
+            stage_reports = None
 
-            solver = cp_model.CpSolver()
-            solver.parameters.max_time_in_seconds = 10.0
-            solver.parameters.num_workers = 1
+            profile_stats, parameters = _solver_parameters(builder, model, staff_list, requirements)
+            dtime_limit = None
+            if time_limit_mode == "deterministic":
+                dtime_limit = max_deterministic_time or deterministic_time_limit(
+                    len(model.Proto().variables)
+                )
+                stage_time_limit_sec = SOLVE_TIME_BUDGET_SEC
+                # 決定的時間モードはプロファイルによらず安全上限・1ワーカーで固定
+                parameters.update(
+                    max_time_in_seconds=SOLVE_TIME_BUDGET_SEC,
+                    max_deterministic_time=dtime_limit,
+                    num_workers=1,
+                )
+            priority = objective_priority or DEFAULT_OBJECTIVE_PRIORITY
+            if coverage_mode == "soft" and COVERAGE_STAGE not in priority:
+                priority = [COVERAGE_STAGE] + priority
+            stages = builder.objective_stages
+            total_time_limit_sec = SOLVE_TIME_BUDGET_SEC
+            if objective_mode == "lexicographic":
+                # 時間上限はステージごとに stage_time_limit_sec（全ステージで締め切りを共有）
+                parameters["max_time_in_seconds"] = stage_time_limit_sec
+            elif coverage_mode == "soft":
+                # 不足の最小化 → 全ステージの重み付き和 の2段で解く（2段合計でプロファイルの時間上限）
+                stage_time_limit_sec = total_time_limit_sec = parameters["max_time_in_seconds"]
+                stages = {
+                    COVERAGE_STAGE: stages[COVERAGE_STAGE],
+                    WEIGHTED_STAGE: [t for terms in stages.values() for t in terms],
+                }
+                priority = [COVERAGE_STAGE, WEIGHTED_STAGE]
+            profile_stats["parameters"] = parameters
 
             start_time = time.time()
-            status = solver.Solve(model)
+            with tracing.span(
+                "solver.solve",
+                **{"solver.objective_mode": objective_mode, "solver.profile": profile_stats["name"]},
+            ) as sp:
+                if objective_mode == "lexicographic" or coverage_mode == "soft":
+                    solver, status, stage_reports = solve_lexicographic(
+                        model,
+                        stages,
+                        priority,
+                        stage_time_limit_sec,
+                        max_deterministic_time=dtime_limit,
+                        parameters=parameters,
+                        exact_stages=(COVERAGE_STAGE,),
+                        total_time_limit_sec=total_time_limit_sec,
+                    )
+                else:
+                    solver = cp_model.CpSolver()
+                    apply_parameters(solver.parameters, parameters)
+                    status = solver.Solve(model)
+                sp.set_attribute("solver.status", solver.StatusName(status))
             solve_time_ms = int((time.time() - start_time) * 1000)
 
             status_name = solver.StatusName(status)
 
             if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-                schedule = builder.extract_solution(solver)
-                return {
+                solver_stats = {
+                    "status": status_name,
+                    "solveTimeMs": solve_time_ms,
+                    "buildTimeMs": build_time_ms,
+                    "deterministicTime": _deterministic_time(solver, stage_reports),
+                    "timeLimitMode": time_limit_mode,
+                    "parameterProfile": profile_stats,
+                    "numVariables": model.Proto().variables.__len__(),
+                    "numConstraints": model.Proto().constraints.__len__(),
+                    "objectiveValue": int(solver.ObjectiveValue()),
+                    **builder.presolve_stats,
+                    **builder.skeleton_stats,
+                }
+                if stage_reports is not None:
+                    # 重み付きモードと比較できるよう全ステージの重み付き和を報告
+                    all_terms = [t for terms in builder.objective_stages.values() for t in terms]
+                    solver_stats["objectiveValue"] = int(solver.Value(cp_model.LinearExpr.Sum(all_terms)))
+                    solver_stats["objectiveStages"] = stage_reports
+                response = {
                     "success": True,
-                    "schedule": schedule,
-                    "solverStats": {
-                        "status": status_name,
-                        "solveTimeMs": solve_time_ms,
-                        "numVariables": model.Proto().variables.__len__(),
-                        "numConstraints": model.Proto().constraints.__len__(),
-                        "objectiveValue": int(solver.ObjectiveValue()),
-                    },
+                    **_schedule_payload(builder, solver, schedule_format),
+                    "solverStats": solver_stats,
+                    "warnings": pre_warnings,
                 }
+                if coverage_mode == "soft":
+                    shortages = builder.extract_shortages(solver)
+                    solver_stats["coverageMode"] = coverage_mode
+                    solver_stats["totalShortage"] = sum(s["shortage"] for s in shortages)
+                    response["shortages"] = shortages
+                return response
             else:
                 return {
                     "success": False,
@@ -76,7 +319,12 @@ class SolverService:
                     "details": {
                         "status": status_name,
                         "solveTimeMs": solve_time_ms,
+                        "buildTimeMs": build_time_ms,
+                        "deterministicTime": _deterministic_time(solver, stage_reports),
+                        "timeLimitMode": time_limit_mode,
+                        "parameterProfile": profile_stats,
                     },
+                    "warnings": pre_warnings,
                 }
 
         except Exception as e:
@@ -85,60 +333,110 @@ class SolverService:
                 "error": str(e),
                 "errorType": "INTERNAL_ERROR",
                 "details": {},
+                "warnings": [],
             }
 
-
-class UnifiedSolverService:
-    """Phase 1-3統合Solver（Skeleton不要）"""
-
     @staticmethod
-    def solve(
+    def repair(
         staff_list: list[StaffDict],
         requirements: ShiftRequirementDict,
         leave_requests: dict[str, dict[str, str]],
+        schedule: list[StaffScheduleDict],
+        changes: RepairChangesDict,
+        time_limit_sec: float = 5.0,
     ) -> dict:
-        """統合CP-SAT求解を実行し結果を返す"""
-        try:
-            builder = UnifiedModelBuilder(staff_list, requirements, leave_requests)
-            model = builder.build()
-            pre_warnings = builder.warnings
+        """既存スケジュールの局所修復
 
-            solver = cp_model.CpSolver()
-            solver.parameters.max_time_in_seconds = 30.0
-            solver.parameters.num_workers = 1  # 決定性保証
-            # 最適値の5%以内で早期終了（4シフト対応の高速化）
-            solver.parameters.relative_gap_limit = 0.05
+        変更を適用したうえで、近傍（影響日の前後 × 影響スタッフと役職・資格が共通する同僚）
+        以外のセルを既存割当に固定して求解する。モデルは1回だけ構築し、固定は仮定として
+        置くため、矛盾する場合は仮定を減らして（近傍を広げて）再求解し、最後は全月を再求解する。
+        time_limit_sec は構築と全試行の合計で、使い切ったら残りの近傍は試さず
+        errorType="TIMEOUT" を返す（時間切れで解がない場合も同じ）。
+        レスポンスには変化したセル（changedCells）を含める。
+        """
+        from solver.repair import (
+            REPAIR_NEIGHBORHOODS,
+            affected_days,
+            affected_staff,
+            apply_changes,
+            changed_cells,
+            neighborhood_days,
+            peer_staff,
+            schedule_cells,
+        )
+        from solver.unified_builder import UnifiedModelBuilder
+
+        try:
+            target_month = requirements["targetMonth"]
+            new_staff_list, new_leave = apply_changes(staff_list, leave_requests, changes)
+            days = affected_days(target_month, schedule, changes)
+            peers = peer_staff(staff_list, affected_staff(changes))
+            cells = schedule_cells(target_month, schedule)
 
             start_time = time.time()
-            status = solver.Solve(model)
-            solve_time_ms = int((time.time() - start_time) * 1000)
+            builder = UnifiedModelBuilder(new_staff_list, requirements, new_leave)
+            model = builder.build()
+            builder.add_hints(cells)
+            attempts = 0
+            solver: cp_model.CpSolver | None = None
+            status = cp_model.UNKNOWN
+            timed_out = False
+            for radius, peers_only in REPAIR_NEIGHBORHOODS:
+                remaining = time_limit_sec - (time.time() - start_time)
+                if remaining <= 0:
+                    timed_out = True  # 残りの近傍は試さない
+                    break
+                attempts += 1
+                free_days = neighborhood_days(days, radius, builder.days_in_month)
+                free_staff = peers if peers_only else {s["id"] for s in new_staff_list}
+                builder.assume_cells({
+                    key: st for key, st in cells.items()
+                    if key[1] not in free_days or key[0] not in free_staff
+                })
 
-            status_name = solver.StatusName(status)
+                solver = cp_model.CpSolver()
+                solver.parameters.max_time_in_seconds = remaining
+                solver.parameters.num_workers = 1  # 決定性保証
+                solver.parameters.relative_gap_limit = 0.05
+                with tracing.span("solver.solve", **{"solver.repair_radius": radius}) as sp:
+                    status = solver.Solve(model)
+                    sp.set_attribute("solver.status", solver.StatusName(status))
+                if status != cp_model.INFEASIBLE:
+                    break  # 解あり、または時間切れ
+            solve_time_ms = int((time.time() - start_time) * 1000)
+            status_name = solver.StatusName(status) if solver is not None else "UNKNOWN"
 
             if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-                schedule = builder.extract_solution(solver)
+                repaired = builder.extract_solution(solver)
                 return {
                     "success": True,
-                    "schedule": schedule,
+                    "schedule": repaired,
+                    "changedCells": changed_cells(target_month, schedule, repaired),
                     "solverStats": {
                         "status": status_name,
                         "solveTimeMs": solve_time_ms,
                         "numVariables": model.Proto().variables.__len__(),
                         "numConstraints": model.Proto().constraints.__len__(),
                         "objectiveValue": int(solver.ObjectiveValue()),
+                        "repairRadius": radius,
+                        "repairStaffScope": "peers" if peers_only else "all",
+                        "repairAttempts": attempts,
                     },
-                    "warnings": pre_warnings,
+                    "warnings": builder.warnings,
                 }
             else:
+                # 実行不能と言えるのは全近傍を試して INFEASIBLE だった場合のみ
+                timed_out = timed_out or status == cp_model.UNKNOWN
                 return {
                     "success": False,
-                    "error": f"求解失敗: {status_name}",
-                    "errorType": "INFEASIBLE",
+                    "error": f"修復失敗: {'時間切れ' if timed_out else status_name}",
+                    "errorType": "TIMEOUT" if timed_out else "INFEASIBLE",
                     "details": {
                         "status": status_name,
                         "solveTimeMs": solve_time_ms,
+                        "repairAttempts": attempts,
                     },
-                    "warnings": pre_warnings,
+                    "warnings": builder.warnings,
                 }
 
         except Exception as e:
@@ -149,3 +447,35 @@ class UnifiedSolverService:
                 "details": {},
                 "warnings": [],
             }
+
+    @staticmethod
+    def compare_scenarios(
+        staff_list: list[StaffDict],
+        requirements: ShiftRequirementDict,
+        leave_requests: dict[str, dict[str, str]],
+        scenarios: list[ScenarioDict],
+        include_schedules: bool = False,
+        max_workers: int | None = None,
+    ) -> dict:
+        """基準リクエストとK個のWhat-ifシナリオを並列に求解し比較表を返す"""
+        from solver.scenarios import compare_scenarios
+
+        try:
+            start_time = time.time()
+            comparison = compare_scenarios(
+                staff_list, requirements, leave_requests, scenarios,
+                max_workers=max_workers,
+                include_schedules=include_schedules,
+            )
+            return {
+                "success": True,
+                **comparison,
+                "totalTimeMs": int((time.time() - start_time) * 1000),
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "errorType": "INTERNAL_ERROR",
+                "details": {},
+            }
@@ -0,0 +1,178 @@
+"""
+Skeleton事前検証: CP-SATを呼ばずにSkeleton経路の矛盾を検出する
+
+Skeleton経路（SolverService）では非固定日は必ず勤務（早番/日勤/遅番のいずれか）になるため、
+以下はモデルを作らなくても判定できる:
+  1. 連続勤務: 休日・明け休み・固定休日以外の日（夜勤日を含む）の連続が上限を超えないか
+  2. 休暇との衝突: 休暇申請日に夜勤が割り当てられていないか
+  3. 人員充足: 固定日を除いた出勤可能人数で各日の必要人数・資格要件・役職要件を満たせるか
+固定休日（出勤不可日・休暇・非稼働日・非対応曜日）は統合エンジンと同じ
+month_calendar.fixed_rest_mask で求める。
+矛盾はスタッフ・期間・日付を特定した構造化エラーとして返す。
+"""
+
+from solver.eligibility import StaffEligibility
+from solver.month_calendar import fixed_rest_mask, get_calendar, non_operational_mask
+from solver.types import (
+    SHIFT_TYPES,
+    ScheduleSkeletonDict,
+    ShiftRequirementDict,
+    SkeletonValidationErrorDict,
+    StaffDict,
+)
+
+
+def validate_skeleton(
+    staff_list: list[StaffDict],
+    skeleton: ScheduleSkeletonDict,
+    requirements: ShiftRequirementDict,
+    leave_requests: dict[str, dict[str, str]],
+) -> list[SkeletonValidationErrorDict]:
+    """Skeletonを検証し、見つかった矛盾をすべて返す（空リストなら求解可能性あり）
+
+    人員充足は必要条件のみの判定（通過しても求解がINFEASIBLEになる可能性は残る）。
+    """
+    cal = get_calendar(requirements["targetMonth"])
+    skel_map = {s["staffId"]: s for s in skeleton["staffSchedules"]}
+    non_op_mask = non_operational_mask(cal, requirements["requirements"])
+    errors: list[SkeletonValidationErrorDict] = []
+
+    # スタッフごとの固定日（非勤務日・夜勤日）
+    available_masks: dict[str, int] = {}
+    for staff in staff_list:
+        staff_id = staff["id"]
+        skel = skel_map.get(staff_id)
+        leave_mask = cal.mask_for_dates(leave_requests.get(staff_id, ()))
+        # 統合エンジンと同じ固定休日（出勤不可日・休暇・非稼働日・非対応曜日）
+        fixed_mask = fixed_rest_mask(cal, staff, leave_requests, non_op_mask)
+        if skel is None:
+            # Skeletonに記載のないスタッフは固定されず自由に割り当てられる（求解結果の
+            # warnings に missingSkeleton として返す）→ 固定休日以外は出勤可能として数える
+            available_masks[staff_id] = cal.all_days_mask & ~fixed_mask
+            continue
+
+        rest_mask = (
+            cal.mask_for_days(skel["restDays"])
+            | cal.mask_for_days(skel["nightShiftFollowupDays"])
+            | fixed_mask
+        )
+        night_mask = cal.mask_for_days(skel["nightShiftDays"])
+
+        errors.extend(_check_leave_conflicts(staff, cal, leave_mask & night_mask))
+        errors.extend(_check_consecutive_work(staff, cal, rest_mask))
+        available_masks[staff_id] = cal.all_days_mask & ~(rest_mask | night_mask)
+
+    errors.extend(_check_coverage(staff_list, requirements, cal, available_masks))
+    return errors
+
+
+def _check_leave_conflicts(
+    staff: StaffDict, cal, conflict_mask: int
+) -> list[SkeletonValidationErrorDict]:
+    """休暇申請日に夜勤が入っている"""
+    errors: list[SkeletonValidationErrorDict] = []
+    for day in cal.days_of(conflict_mask):
+        date_str = cal.dates[day - 1]
+        errors.append(SkeletonValidationErrorDict(
+            constraintType="leaveConflict",
+            staffId=staff["id"],
+            staffName=staff["name"],
+            date=date_str,
+            detail=f"{staff['name']}: 休暇申請日{date_str}に夜勤が割り当てられています",
+        ))
+    return errors
+
+
+def _check_consecutive_work(
+    staff: StaffDict, cal, rest_mask: int
+) -> list[SkeletonValidationErrorDict]:
+    """非勤務日以外の連続が maxConsecutiveWorkDays を超える区間（最大連続区間ごとに1件）"""
+    max_consec = staff["maxConsecutiveWorkDays"]
+    errors: list[SkeletonValidationErrorDict] = []
+    run_start = 0
+    for day in range(1, cal.days_in_month + 2):
+        is_work = day <= cal.days_in_month and not rest_mask >> (day - 1) & 1
+        if is_work:
+            if not run_start:
+                run_start = day
+            continue
+        if run_start and day - run_start > max_consec:
+            start_date, end_date = cal.dates[run_start - 1], cal.dates[day - 2]
+            errors.append(SkeletonValidationErrorDict(
+                constraintType="consecutiveWork",
+                staffId=staff["id"],
+                staffName=staff["name"],
+                startDate=start_date,
+                endDate=end_date,
+                requiredCount=max_consec,
+                availableCount=day - run_start,
+                detail=(
+                    f"{staff['name']}: {start_date}〜{end_date}が{day - run_start}連勤"
+                    f"（上限{max_consec}日）"
+                ),
+            ))
+        run_start = 0
+    return errors
+
+
+def _check_coverage(
+    staff_list: list[StaffDict],
+    requirements: ShiftRequirementDict,
+    cal,
+    available_masks: dict[str, int],
+) -> list[SkeletonValidationErrorDict]:
+    """出勤可能人数で各日の必要人数の合計・資格要件／役職要件の合計を満たせるか
+
+    配置可能スタッフのいない要件はハード制約のままでは実行不能になるため、出勤可能0名の日・
+    該当者0名の資格／役職もエラーにする。
+    出勤可能スタッフは日ごとにスタッフ位置のビットマスクで持ち、資格・役職の該当人数は
+    StaffEligibility のマスクとの積のビット数で数える。
+    """
+    errors: list[SkeletonValidationErrorDict] = []
+    reqs = requirements["requirements"]
+    eligibility = StaffEligibility(staff_list)
+    # 日 → 出勤可能スタッフ（スタッフ位置のビットマスク）
+    available_by_day = [0] * (cal.days_in_month + 1)
+    for staff_id, mask in available_masks.items():
+        staff_bit = 1 << eligibility.positions[staff_id]
+        for day in cal.days_of(mask):
+            available_by_day[day] |= staff_bit
+
+    for day in range(1, cal.days_in_month + 1):
+        date_str = cal.dates[day - 1]
+        available = available_by_day[day]
+        available_count = available.bit_count()
+
+        total_required = 0
+        group_required: dict[tuple[str, str], list[int]] = {}
+        for shift_type in SHIFT_TYPES:
+            req = reqs.get(f"{date_str}_{shift_type}")
+            if req is None:
+                continue
+            total_required += req["totalStaff"]
+            for kind, name, mask, count in eligibility.requirement_groups(req):
+                group_required.setdefault((kind, name), [mask, 0])[1] += count
+
+        if total_required > available_count:
+            errors.append(SkeletonValidationErrorDict(
+                constraintType="staffShortage",
+                date=date_str,
+                requiredCount=total_required,
+                availableCount=available_count,
+                detail=(
+                    f"{date_str}: 日勤帯の必要人数{total_required}名に対し"
+                    f"出勤可能{available_count}名"
+                ),
+            ))
+        for (kind, name), (mask, required) in group_required.items():
+            eligible = (available & mask).bit_count()
+            if required > eligible:
+                errors.append(SkeletonValidationErrorDict(
+                    constraintType=f"{kind}Missing",
+                    date=date_str,
+                    requiredCount=required,
+                    availableCount=eligible,
+                    detail=f"{date_str}: {name}{required}名必要だが出勤可能{eligible}名",
+                    **{kind: name},
+                ))
+    return errors
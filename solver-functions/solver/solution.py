@@ -0,0 +1,104 @@
+"""
+SolutionIndex: 求解結果の一括読み出し
+
+決定変数ごとに solver.Value() を呼ぶ代わりに、CpSolverのsolutionベクトルを
+1回だけ取得し、事前計算したインデックス表で (スタッフ位置, 日, シフト種類) に逆引きする。
+"""
+
+from ortools.sat.python import cp_model
+
+from solver.types import (
+    ALL_SHIFT_TYPES,
+    CompactScheduleDict,
+    StaffDict,
+    StaffScheduleDict,
+)
+
+# コンパクト形式のシフトコード: ALL_SHIFT_TYPESのインデックスを1文字で表す
+SHIFT_CODES = {shift_type: str(i) for i, shift_type in enumerate(ALL_SHIFT_TYPES)}
+
+
+class SolutionIndex:
+    """決定変数インデックス → (スタッフ位置, 日, シフト種類) の逆引き表"""
+
+    def __init__(self) -> None:
+        self._keys: list[tuple[int, int, str]] = []
+        self._indices: list[int] = []
+
+    def add(self, staff_pos: int, day: int, shift_type: str, var: cp_model.IntVar) -> None:
+        """変数生成時に登録する（staff_posはstaff_list内の位置）"""
+        self._keys.append((staff_pos, day, shift_type))
+        self._indices.append(var.Index())
+
+    def fill_grid(self, solver: cp_model.CpSolver, grid: list[list[str]]) -> None:
+        """値が1の変数のシフト種類を grid[staff_pos][day-1] に書き込む
+
+        gridは固定日・デフォルト値（休など）で初期化済みのものを渡す。
+        """
+        solution = list(solver.ResponseProto().solution)
+        for (staff_pos, day, shift_type), idx in zip(self._keys, self._indices):
+            if solution[idx]:
+                grid[staff_pos][day - 1] = shift_type
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+
+def grid_to_schedules(
+    staff_list: list[StaffDict],
+    target_month: str,
+    days_in_month: int,
+    grid: list[list[str]],
+) -> list[StaffScheduleDict]:
+    """シフトグリッドをStaffSchedule[]形式に変換（日付文字列は1回だけ生成）"""
+    dates = [f"{target_month}-{day:02d}" for day in range(1, days_in_month + 1)]
+    return [
+        {
+            "staffId": staff["id"],
+            "staffName": staff["name"],
+            "monthlyShifts": [
+                {"date": date_str, "shiftType": shift_type}
+                for date_str, shift_type in zip(dates, row)
+            ],
+        }
+        for staff, row in zip(staff_list, grid)
+    ]
+
+
+def grid_to_compact(
+    staff_list: list[StaffDict],
+    target_month: str,
+    days_in_month: int,
+    grid: list[list[str]],
+) -> CompactScheduleDict:
+    """シフトグリッドをコンパクト形式（スタッフごとに月1本のコード文字列）に変換"""
+    return {
+        "startDate": f"{target_month}-01",
+        "endDate": f"{target_month}-{days_in_month:02d}",
+        "legend": list(ALL_SHIFT_TYPES),
+        "staffSchedules": [
+            {
+                "staffId": staff["id"],
+                "staffName": staff["name"],
+                "shifts": "".join(SHIFT_CODES[shift_type] for shift_type in row),
+            }
+            for staff, row in zip(staff_list, grid)
+        ],
+    }
+
+
+def compact_to_schedules(compact: CompactScheduleDict) -> list[StaffScheduleDict]:
+    """コンパクト形式を標準のStaffSchedule[]形式に戻す（クライアント・テスト用）"""
+    target_month = compact["startDate"][:7]
+    legend = compact["legend"]
+    return [
+        {
+            "staffId": s["staffId"],
+            "staffName": s["staffName"],
+            "monthlyShifts": [
+                {"date": f"{target_month}-{day:02d}", "shiftType": legend[int(code)]}
+                for day, code in enumerate(s["shifts"], start=1)
+            ],
+        }
+        for s in compact["staffSchedules"]
+    ]
@@ -0,0 +1,186 @@
+"""
+トレーシング: OpenTelemetry形式のスパンで求解パイプラインの各段階を計測する
+
+リクエスト解析 → 検証 → 固定休日計算 → 変数生成 → 各制約・目的関数ビルダー →
+solver.Solve → 解の抽出 → レスポンスエンコード をスパンとして記録し、
+スタッフ数・日数・変数数・制約数を属性に持たせる。
+
+- 受信した W3C traceparent ヘッダを親にできるため、シフト生成フロー全体のトレースと突き合わせられる
+- エクスポータ: コンソール（標準エラーにJSON行）/ ファイル（JSON Lines）。オフライン解析用
+- エクスポータ未設定時はスパンを記録しない（計測コストはほぼゼロ）
+
+環境変数 SOLVER_TRACE_EXPORTER=console|file（file の出力先は SOLVER_TRACE_FILE、
+既定 solver-traces.jsonl）で有効化する。外部依存なし（opentelemetry パッケージは使わない）。
+"""
+
+import contextvars
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, TextIO
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    """記録中のスパン（終了時にエクスポータへ渡す）"""
+
+    recording = True
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "OK"
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = "ERROR"
+        self.status_message = message
+
+    def to_dict(self) -> dict:
+        span = {
+            "name": self.name,
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+        if self.status_message:
+            span["statusMessage"] = self.status_message
+        return span
+
+
+class _NoopSpan:
+    """トレーシング無効時のスパン（何もしない）"""
+
+    recording = False
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class ConsoleSpanExporter:
+    """スパンをJSON行で出力（既定は標準エラー）"""
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, span: dict) -> None:
+        line = json.dumps(span, ensure_ascii=False)
+        with self._lock:
+            print(line, file=self._stream or sys.stderr, flush=True)
+
+
+class FileSpanExporter:
+    """スパンをJSON Lines形式でファイルに追記"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: dict) -> None:
+        line = json.dumps(span, ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+_exporter = None
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("solver_span", default=None)
+# 受信した traceparent（ルートスパンの親）
+_remote_parent: contextvars.ContextVar[tuple[str, str] | None] = contextvars.ContextVar(
+    "solver_remote_parent", default=None
+)
+
+
+def set_exporter(exporter) -> None:
+    """エクスポータを設定（None で無効化）"""
+    global _exporter
+    _exporter = exporter
+
+
+def configure_from_env() -> None:
+    kind = os.environ.get("SOLVER_TRACE_EXPORTER", "")
+    if kind == "console":
+        set_exporter(ConsoleSpanExporter())
+    elif kind == "file":
+        set_exporter(FileSpanExporter(os.environ.get("SOLVER_TRACE_FILE", "solver-traces.jsonl")))
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span | _NoopSpan]:
+    """現在のスパンの子としてスパンを開始する（例外時は status=ERROR で記録して再送出）"""
+    if _exporter is None:
+        yield _NOOP
+        return
+
+    parent = _current.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        remote = _remote_parent.get()
+        trace_id, parent_id = remote if remote is not None else (secrets.token_hex(16), None)
+
+    current = Span(name, trace_id, parent_id, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(current.to_dict())
+
+
+@contextmanager
+def start_trace(name: str, traceparent: str | None = None, **attributes) -> Iterator[Span | _NoopSpan]:
+    """リクエスト単位のルートスパン（traceparent があればその子になる）"""
+    match = _TRACEPARENT_RE.match(traceparent.strip().lower()) if traceparent else None
+    token = _remote_parent.set((match.group(1), match.group(2)) if match else None)
+    try:
+        with span(name, **attributes) as root:
+            yield root
+    finally:
+        _remote_parent.reset(token)
+
+
+def current_traceparent() -> str | None:
+    """現在のスパンを W3C traceparent 形式で返す（別プロセスへの伝搬用）"""
+    current = _current.get()
+    if current is None:
+        return None
+    return f"00-{current.trace_id}-{current.span_id}-01"
+
+
+configure_from_env()
@@ -0,0 +1,155 @@
+"""
+HTTP入出力の共通レイヤー（Cloud Functions / Flask 共用）
+
+- JSONエンコード: orjson があれば使用、なければ標準 json
+- レスポンス圧縮: Accept-Encoding に応じて br（brotli導入時）/ gzip
+- リクエスト展開: Content-Encoding: gzip / deflate / br のボディを展開
+
+https_fn.Request / flask.Request はどちらも werkzeug.Request なので同じ関数で扱える。
+"""
+
+import gzip
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson未導入環境
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli未導入環境
+    brotli = None
+
+from solver import tracing
+
+
+# これより小さいレスポンスは圧縮しない（ヘッダ・CPUコストの方が大きい）
+MIN_COMPRESS_BYTES = 1024
+# 展開後のリクエストボディ上限（圧縮爆弾対策）
+MAX_REQUEST_BYTES = 32 * 1024 * 1024
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+def dumps(obj: object) -> bytes:
+    """JSONをUTF-8バイト列にエンコード"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes) -> object:
+    """UTF-8バイト列のJSONをデコード"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def supported_encodings() -> list[str]:
+    """サーバ側で利用可能な圧縮方式（優先順）"""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Accept-Encodingヘッダから使用する圧縮方式を選ぶ（q=0は除外）"""
+    if not accept_encoding:
+        return None
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+
+    best: str | None = None
+    best_q = 0.0
+    for encoding in supported_encodings():
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    raise ValueError(f"未対応の圧縮方式: {encoding}")
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    """Content-Encodingに従ってボディを展開（MAX_REQUEST_BYTES超過はValueError）"""
+    encoding = encoding.strip().lower()
+    if encoding in ("", "identity"):
+        out = data
+    elif encoding in ("gzip", "x-gzip", "deflate"):
+        wbits = zlib.MAX_WBITS | 16 if encoding != "deflate" else zlib.MAX_WBITS
+        decomp = zlib.decompressobj(wbits)
+        out = decomp.decompress(data, MAX_REQUEST_BYTES + 1)
+    elif encoding == "br":
+        out = _brotli_decompress(data)
+    else:
+        raise ValueError(f"未対応の圧縮方式: {encoding}")
+    if len(out) > MAX_REQUEST_BYTES:
+        raise ValueError("リクエストボディが大きすぎます")
+    return out
+
+
+def _brotli_decompress(data: bytes) -> bytes:
+    """brotliボディを展開（出力は MAX_REQUEST_BYTES + 1 で打ち切り、全体を膨張させない）"""
+    if brotli is None:
+        raise ValueError("brotliが利用できません")
+    decomp = brotli.Decompressor()
+    try:
+        return decomp.process(data, output_buffer_limit=MAX_REQUEST_BYTES + 1)
+    except TypeError as e:  # brotli < 1.2 は出力上限を指定できない
+        raise ValueError("brotli 1.2以上が必要です") from e
+    except brotli.error as e:
+        raise ValueError(f"brotliの展開に失敗しました: {e}") from e
+
+
+def read_json(request) -> dict | None:
+    """リクエストボディをJSONとして読む（圧縮ボディ対応）
+
+    request.get_json(silent=True) と同様、Content-Typeが JSON でない場合や
+    展開・デコードに失敗した場合は None を返す。
+    """
+    if not request.is_json:
+        return None
+    with tracing.span("request.parse") as sp:
+        try:
+            raw = request.get_data(cache=False)
+            body = decompress(raw, request.headers.get("Content-Encoding", ""))
+            data = loads(body)
+        except (ValueError, zlib.error, OSError) as e:
+            sp.set_error(str(e))
+            return None
+        sp.set_attribute("http.request.body.size", len(raw))
+    return data if isinstance(data, dict) else None
+
+
+def encode_response(
+    payload: object, accept_encoding: str | None
+) -> tuple[bytes, dict[str, str]]:
+    """レスポンスボディとヘッダを生成（必要に応じて圧縮）"""
+    with tracing.span("response.encode") as sp:
+        body = dumps(payload)
+        headers = {"Content-Type": JSON_CONTENT_TYPE, "Vary": "Accept-Encoding"}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            encoding = negotiate_encoding(accept_encoding)
+            if encoding is not None:
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+        sp.set_attribute("http.response.body.size", len(body))
+    return body, headers
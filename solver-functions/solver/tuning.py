@@ -0,0 +1,366 @@
+"""
+CP-SATパラメータのオフライン自動チューニング
+
+UnifiedSolverService の求解パラメータを、自施設のワークロードに近い
+ベンチマーク集合で探索して選ぶためのツール。
+
+  - 探索空間: search_branching / linearization_level / symmetry_level / num_workers / LNS設定
+    （PARAMETER_SPACE。グリッド探索 grid_configs またはランダム探索 random_configs）
+  - ベンチマーク: 規模・施設種別を変えた生成モデル（generated_corpus）と、
+    実リクエスト（UnifiedSolverRequest のJSON）の再生（load_corpus）
+  - 評価: 各インスタンスで、サービスと同じ規模別プロファイル（solver.parameter_profile）の
+    上に候補を重ねて求解し、最良既知目的値とのギャップの平均 → 壁時計時間の平均 の順に順位付け
+  - 出力: 順位付きレポート（Markdown）と、サービスが読み込むパラメータプロファイル
+    （solver.parameter_profile、環境変数 SOLVER_PARAMETER_PROFILE で指定）
+
+実行例（solver-functions ディレクトリで）:
+  python -m solver.tuning --random 20 --replay requests/ \\
+      --report tuning-report.md --profile solver-profile.json
+
+求解時間を計測するため、本番と同じ性能のマシンで実行すること。
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from ortools.sat.python import cp_model
+
+from solver.parameter_profile import (
+    PROFILE_VERSION,
+    apply_parameters,
+    requirement_tightness,
+    select_profile,
+)
+
+# 探索するパラメータと候補値（SatParameters のフィールド名、列挙型は名前）
+PARAMETER_SPACE: dict[str, list] = {
+    "search_branching": [
+        "AUTOMATIC_SEARCH", "FIXED_SEARCH", "PORTFOLIO_SEARCH", "PSEUDO_COST_SEARCH",
+    ],
+    "linearization_level": [0, 1, 2],
+    "symmetry_level": [0, 1, 2],
+    "num_workers": [1, 2, 4, 8],
+    "use_lns": [True, False],
+    "use_rins_lns": [True, False],
+    "lns_initial_difficulty": [0.3, 0.5, 0.7],
+}
+
+# 解が得られなかった場合のギャップ
+_NO_SOLUTION_GAP = 1.0
+
+_GENERATED_MONTH = "2026-03"
+_DAY_SHIFTS = ["早番", "日勤", "遅番"]
+_TIME_SLOTS = {
+    "早番": {"name": "早番", "start": "07:00", "end": "16:00", "restHours": 1.0},
+    "日勤": {"name": "日勤", "start": "09:00", "end": "18:00", "restHours": 1.0},
+    "遅番": {"name": "遅番", "start": "11:00", "end": "20:00", "restHours": 1.0},
+    "夜勤": {"name": "夜勤", "start": "22:00", "end": "07:00", "restHours": 2.0},
+}
+
+
+def grid_configs(space: dict[str, list] | None = None) -> list[dict]:
+    """探索空間の全組み合わせ"""
+    space = space or PARAMETER_SPACE
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def random_configs(n: int, space: dict[str, list] | None = None, seed: int = 0) -> list[dict]:
+    """探索空間から重複なしに n 件を無作為抽出（全組み合わせが n 件以下なら全件）"""
+    configs = grid_configs(space)
+    if len(configs) <= n:
+        return configs
+    return random.Random(seed).sample(configs, n)
+
+
+def _generated_staff(n: int) -> list[dict]:
+    """n名のスタッフ（1割が看護職員、2割が介護福祉士、1/8が日勤のみ）"""
+    staff = []
+    for i in range(1, n + 1):
+        role, qualifications, preference = "介護職員", [], "いつでも可"
+        if i % 10 == 1:
+            role, qualifications = "看護職員", ["看護師"]
+        elif i % 5 == 0:
+            qualifications = ["介護福祉士"]
+        if i % 8 == 0:
+            preference = "日勤のみ"
+        staff.append({
+            "id": f"s{i}",
+            "name": f"スタッフ{i}",
+            "role": role,
+            "qualifications": qualifications,
+            "weeklyWorkCount": {"hope": 5, "must": 4},
+            "maxConsecutiveWorkDays": 5,
+            "availableWeekdays": [0, 1, 2, 3, 4, 5, 6],
+            "unavailableDates": [],
+            "timeSlotPreference": preference,
+            "isNightShiftOnly": False,
+        })
+    return staff
+
+
+def _generated_requirements(staff_count: int, night: bool) -> dict:
+    """1か月分の要件（各シフトに約1/6ずつ配置、夜勤施設は夜勤1名以上）"""
+    per_shift = max(1, staff_count // 6)
+    shifts = _DAY_SHIFTS + (["夜勤"] if night else [])
+    requirements = {}
+    for day in range(1, 32):
+        for shift in shifts:
+            total = max(1, per_shift // 2) if shift == "夜勤" else per_shift
+            requirements[f"{_GENERATED_MONTH}-{day:02d}_{shift}"] = {
+                "totalStaff": total,
+                "requiredQualifications": [],
+                "requiredRoles": [],
+            }
+    return {
+        "targetMonth": _GENERATED_MONTH,
+        "timeSlots": [_TIME_SLOTS[s] for s in shifts],
+        "requirements": requirements,
+    }
+
+
+def generated_corpus(
+    sizes: tuple[int, ...] = (15, 50, 100), facilities: tuple[str, ...] = ("day", "night"),
+) -> list[dict]:
+    """生成ベンチマーク（スタッフ数 × 施設種別 day|night）"""
+    return [
+        {
+            "name": f"generated-{size}-{facility}",
+            "staffList": _generated_staff(size),
+            "requirements": _generated_requirements(size, facility == "night"),
+            "leaveRequests": {},
+        }
+        for size in sizes
+        for facility in facilities
+    ]
+
+
+def load_corpus(directory: str) -> list[dict]:
+    """保存済みリクエスト（UnifiedSolverRequest のJSON）を再生用に読み込む
+
+    request_validation で検証・正規化し、不正なファイルは ValueError。
+    """
+    from solver.request_validation import validate_request
+    from solver.types import UnifiedSolverRequest
+
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, encoding="utf-8") as f:
+            data, errors = validate_request(json.load(f), UnifiedSolverRequest)
+        if errors:
+            raise ValueError(f"{path}: 不正なリクエストです（{errors[0]['path']}: {errors[0]['message']}）")
+        corpus.append({
+            "name": os.path.splitext(os.path.basename(path))[0],
+            "staffList": data["staffList"],
+            "requirements": data["requirements"],
+            "leaveRequests": data["leaveRequests"],
+        })
+    return corpus
+
+
+def _build(instance: dict) -> tuple[cp_model.CpModel, str, dict]:
+    """モデルを構築し、サービスが選ぶ規模別プロファイルと合わせて返す"""
+    from solver.unified_builder import UnifiedModelBuilder
+
+    builder = UnifiedModelBuilder(
+        instance["staffList"], instance["requirements"], instance["leaveRequests"]
+    )
+    model = builder.build()
+    staff_count = len(instance["staffList"])
+    profile = select_profile({
+        "numVariables": len(model.Proto().variables),
+        "staffCount": staff_count,
+        "nightFacility": builder.is_night_facility,
+        "tightness": requirement_tightness(
+            instance["requirements"], staff_count, builder.days_in_month
+        ),
+    })
+    return model, profile["name"], profile["parameters"]
+
+
+def _solve(model: cp_model.CpModel, parameters: dict, seed: int) -> dict:
+    solver = cp_model.CpSolver()
+    apply_parameters(solver.parameters, {**parameters, "random_seed": seed})
+    start = time.perf_counter()
+    status = solver.Solve(model)
+    wall_time = time.perf_counter() - start
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return {
+        "status": solver.StatusName(status),
+        "objective": solver.ObjectiveValue() if solved else None,
+        "wallTime": wall_time,
+        "deterministicTime": solver.deterministic_time,
+    }
+
+
+def run_benchmark(
+    configs: list[dict],
+    corpus: list[dict],
+    base: dict | None = None,
+    seeds: tuple[int, ...] = (0,),
+    progress=None,
+) -> list[dict]:
+    """全候補 × 全インスタンス × 全シードを求解し、順位付きの結果を返す
+
+    パラメータは 規模別プロファイル → base（全候補共通の上書き）→ 候補 の順に重ねる。
+
+    各インスタンスの最良既知目的値（全候補中の最大値）に対するギャップを
+    (最良 - 目的値) / max(1, |最良|) で求め、解なしは 1.0 とする。
+    順位は ギャップ平均 → 壁時計時間平均 の昇順。
+    """
+    base = base or {}
+    models = [(instance["name"], *_build(instance)) for instance in corpus]
+
+    runs: list[list[dict]] = []
+    for i, config in enumerate(configs):
+        config_runs = []
+        for name, model, profile_name, profile_parameters in models:
+            for seed in seeds:
+                run = _solve(model, {**profile_parameters, **base, **config}, seed)
+                run.update(instance=name, seed=seed, sizeProfile=profile_name)
+                config_runs.append(run)
+        runs.append(config_runs)
+        if progress is not None:
+            progress(i + 1, len(configs))
+
+    best: dict[str, float] = {}
+    for config_runs in runs:
+        for run in config_runs:
+            if run["objective"] is not None:
+                best[run["instance"]] = max(best.get(run["instance"], run["objective"]), run["objective"])
+
+    results = []
+    for config, config_runs in zip(configs, runs):
+        for run in config_runs:
+            if run["objective"] is None:
+                run["gap"] = _NO_SOLUTION_GAP
+            else:
+                reference = best[run["instance"]]
+                run["gap"] = (reference - run["objective"]) / max(1.0, abs(reference))
+        results.append({
+            "parameters": config,
+            "meanGap": statistics.fmean(r["gap"] for r in config_runs),
+            "meanWallTime": statistics.fmean(r["wallTime"] for r in config_runs),
+            "meanDeterministicTime": statistics.fmean(r["deterministicTime"] for r in config_runs),
+            "solved": sum(r["objective"] is not None for r in config_runs),
+            "runs": config_runs,
+        })
+    results.sort(key=lambda r: (r["meanGap"], r["meanWallTime"]))
+    for rank, result in enumerate(results, start=1):
+        result["rank"] = rank
+    return results
+
+
+def _format_parameters(parameters: dict) -> str:
+    return ", ".join(f"{k}={v}" for k, v in parameters.items())
+
+
+def render_report(results: list[dict], corpus: list[dict], base: dict | None = None) -> str:
+    """順位付きレポート（Markdown）"""
+    base = base or {}
+    lines = [
+        "# CP-SATパラメータ チューニング結果",
+        "",
+        f"- 実行日時: {datetime.now(timezone.utc).isoformat(timespec='seconds')}",
+        f"- ベンチマーク: {', '.join(instance['name'] for instance in corpus)}",
+        f"- 共通の上書き: {_format_parameters(base) or 'なし'}（規模別プロファイルの上に適用）",
+        f"- 候補数: {len(results)}",
+        "",
+        "| 順位 | ギャップ平均 | 壁時計平均(s) | 決定的時間平均 | 解あり | パラメータ |",
+        "|---:|---:|---:|---:|---:|---|",
+    ]
+    for result in results:
+        lines.append(
+            f"| {result['rank']} | {result['meanGap']:.4f} | {result['meanWallTime']:.2f} "
+            f"| {result['meanDeterministicTime']:.2f} | {result['solved']}/{len(result['runs'])} "
+            f"| {_format_parameters(result['parameters'])} |"
+        )
+
+    if results:
+        lines += ["", "## 1位の内訳", "", "| インスタンス | 規模別プロファイル | シード | ステータス | 目的値 | ギャップ | 壁時計(s) |",
+                  "|---|---|---:|---|---:|---:|---:|"]
+        for run in results[0]["runs"]:
+            objective = "-" if run["objective"] is None else f"{run['objective']:.0f}"
+            lines.append(
+                f"| {run['instance']} | {run['sizeProfile']} | {run['seed']} | {run['status']} | {objective} "
+                f"| {run['gap']:.4f} | {run['wallTime']:.2f} |"
+            )
+    return "\n".join(lines) + "\n"
+
+
+def build_profile(results: list[dict], corpus: list[dict], name: str = "tuned") -> dict:
+    """1位の候補からパラメータプロファイルを作る"""
+    top = results[0]
+    return {
+        "version": PROFILE_VERSION,
+        "name": name,
+        "parameters": top["parameters"],
+        "metadata": {
+            "createdAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "corpus": [instance["name"] for instance in corpus],
+            "candidates": len(results),
+            "meanGap": round(top["meanGap"], 6),
+            "meanWallTime": round(top["meanWallTime"], 3),
+        },
+    }
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m solver.tuning", description="CP-SATパラメータのオフライン自動チューニング",
+    )
+    search = parser.add_mutually_exclusive_group()
+    search.add_argument("--grid", action="store_true", help="全組み合わせを評価する")
+    search.add_argument("--random", type=int, default=20, metavar="N",
+                        help="無作為に N 件を評価する（既定 20）")
+    parser.add_argument("--seed", type=int, default=0, help="ランダム探索の乱数シード")
+    parser.add_argument("--solver-seeds", type=int, default=1, metavar="K",
+                        help="各インスタンスを random_seed=0..K-1 で求解する（既定 1）")
+    parser.add_argument("--sizes", default="15,50,100", help="生成ベンチマークのスタッフ数（カンマ区切り）")
+    parser.add_argument("--no-generated", action="store_true", help="生成ベンチマークを使わない")
+    parser.add_argument("--replay", metavar="DIR", help="再生するリクエストJSONのディレクトリ")
+    parser.add_argument("--time-limit", type=float,
+                        help="1求解あたりの壁時計上限（秒、既定は規模別プロファイルの値）")
+    parser.add_argument("--report", default="tuning-report.md", help="レポートの出力先")
+    parser.add_argument("--profile", default="solver-profile.json", help="プロファイルの出力先")
+    parser.add_argument("--name", default="tuned", help="プロファイル名")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+
+    corpus = []
+    if not args.no_generated:
+        corpus += generated_corpus(tuple(int(s) for s in args.sizes.split(",")))
+    if args.replay:
+        corpus += load_corpus(args.replay)
+    if not corpus:
+        print("ベンチマークが空です（--replay を指定するか --no-generated を外してください）")
+        return 1
+
+    configs = grid_configs() if args.grid else random_configs(args.random, seed=args.seed)
+    base = {} if args.time_limit is None else {"max_time_in_seconds": args.time_limit}
+    results = run_benchmark(
+        configs, corpus, base, seeds=tuple(range(args.solver_seeds)),
+        progress=lambda done, total: print(f"[{done}/{total}] 評価済み", flush=True),
+    )
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        f.write(render_report(results, corpus, base))
+    with open(args.profile, "w", encoding="utf-8") as f:
+        json.dump(build_profile(results, corpus, args.name), f, ensure_ascii=False, indent=2)
+    print(f"1位: {_format_parameters(results[0]['parameters'])}")
+    print(f"レポート: {args.report} / プロファイル: {args.profile}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -12,9 +12,10 @@ TypeScript側の型定義との対応関係:
 - SolverResponse ← GenerateShiftResponse (Solver専用)
 - SolverErrorResponse ← (Solver専用)
 - SolverStats ← (Solver専用)
+- CompactScheduleDict ← (Solver専用、scheduleFormat="compact" 時の出力)
 """
 
-from typing import Literal, TypedDict
+from typing import Literal, NotRequired, TypedDict
 
 
 # --- Enum値（TypeScript enum互換） ---
@@ -30,9 +31,41 @@ TIME_SLOT_PREFERENCES = ["日勤のみ", "夜勤のみ", "いつでも可"]
 
 SHIFT_TYPES = ["早番", "日勤", "遅番"]
 ALL_SHIFT_TYPES = ["早番", "日勤", "遅番", "夜勤", "休", "明け休み"]
+# 要件を指定できるシフト種別（勤務系のみ）
+REQUIREMENT_SHIFT_TYPES = SHIFT_TYPES + ["夜勤"]
 
 LEAVE_TYPES = ["希望休", "有給休暇", "研修"]
 
+# レスポンスのスケジュール形式（リクエストの scheduleFormat）
+SCHEDULE_FORMATS = ["default", "compact"]
+
+# 統合Solverの目的関数モード（リクエストの objectiveMode）
+OBJECTIVE_MODES = ["weighted", "lexicographic"]
+
+# 1リクエストの求解（辞書式モードは全ステージの合計）の壁時計上限（秒）。
+# エンドポイントのタイムアウト（timeout_sec=60）から構築・応答の余裕を引いた値
+SOLVE_TIME_BUDGET_SEC = 45.0
+# maxDeterministicTime の上限（CP-SATの決定的時間単位）。1コアで 壁時計秒 ≈ 決定的時間 × 2.5〜4
+# のため、これより大きい値は SOLVE_TIME_BUDGET_SEC の壁時計上限に先に当たり意味を持たない
+MAX_DETERMINISTIC_TIME = 18.0
+
+# 求解時間上限の種類（リクエストの timeLimitMode）: 壁時計 / 決定的時間（負荷によらず再現可能）
+TIME_LIMIT_MODES = ["wallclock", "deterministic"]
+
+# 必要人数・資格要件の扱い（リクエストの coverageMode）:
+# ハード制約 / 不足を許して重いペナルティ（不足一覧 shortages を返す）
+COVERAGE_MODES = ["hard", "soft"]
+
+# ソフト制約のステージ名（リクエストの objectivePriority に指定できる値、目的関数への追加順）
+OBJECTIVE_STAGES = [
+    "preference", "fairness", "nightFairness", "restSpacing", "workCount", "consecutiveSoft",
+]
+# 要員不足のステージ名（coverageMode="soft" のみ。objectivePriority になければ先頭に置く）
+COVERAGE_STAGE = "coverage"
+
+# Skeletonの適用方法（リクエストの skeletonMode）: 固定 / 解のヒント
+SKELETON_MODES = ["fix", "hint"]
+
 
 # --- 入力型 ---
 
@@ -50,8 +83,8 @@ class StaffDict(TypedDict):
     maxConsecutiveWorkDays: int
     availableWeekdays: list[int]
     timeSlotPreference: str
-    isNightShiftOnly: bool
-    unavailableDates: list[str]  # ["2026-03-05", ...] 出勤不可日
+    isNightShiftOnly: NotRequired[bool]
+    unavailableDates: NotRequired[list[str]]  # ["2026-03-05", ...] 出勤不可日
 
 
 class StaffScheduleSkeletonDict(TypedDict):
@@ -90,9 +123,20 @@ class ShiftTimeDict(TypedDict):
 
 
 class ShiftRequirementDict(TypedDict):
+    """シフト要件: 日別形式（requirements）か週間パターン形式（weeklyPattern）のどちらか
+
+    週間パターン形式は検証時（request_validation）に requirements の索引
+    （requirement_pattern.RequirementIndex）へ展開され、ビルダーは日別形式と同じく
+    requirements["YYYY-MM-DD_シフト種別"] で引く。
+    """
     targetMonth: str
     timeSlots: list[ShiftTimeDict]
-    requirements: dict[str, DailyRequirementDict]
+    requirements: NotRequired[dict[str, DailyRequirementDict]]  # "YYYY-MM-DD_シフト種別" → 要件
+    # 週間パターン形式: 曜日（"0"=日〜"6"=土）→ シフト種別 → 要件
+    weeklyPattern: NotRequired[dict[str, dict[str, DailyRequirementDict]]]
+    # 任意: 日付 → シフト種別 → 要件（パターンを上書き、None でそのシフトなし）
+    exceptions: NotRequired[dict[str, dict[str, DailyRequirementDict | None]]]
+    closedDays: NotRequired[list[str]]  # 任意: 休業日（要件なし＝非稼働日）
 
 
 # --- 出力型 ---
@@ -108,6 +152,20 @@ class StaffScheduleDict(TypedDict):
     monthlyShifts: list[GeneratedShiftDict]
 
 
+class CompactStaffScheduleDict(TypedDict):
+    staffId: str
+    staffName: str
+    shifts: str  # 1日1文字、各文字は legend のインデックス（"0"=legend[0]）
+
+
+class CompactScheduleDict(TypedDict):
+    """コンパクト形式: スタッフごとに月1本のシフトコード文字列"""
+    startDate: str   # "2026-03-01"
+    endDate: str     # "2026-03-31"
+    legend: list[str]  # ALL_SHIFT_TYPES
+    staffSchedules: list[CompactStaffScheduleDict]
+
+
 # --- Solver専用レスポンス型 ---
 
 class SolverStats(TypedDict):
@@ -119,18 +177,54 @@ class SolverStats(TypedDict):
 
 
 class SolverWarningDict(TypedDict):
-    """制約スキップ警告: 配置可能スタッフ不足で制約適用不可"""
+    """警告: 配置可能スタッフのいない要件（ハードでは実行不能の原因）、またはSkeletonに記載のないスタッフ"""
+    date: NotRequired[str]           # "2026-03-05"
+    shiftType: NotRequired[str]      # "日勤"
+    constraintType: str # "staffShortage" | "qualificationMissing" | "roleMissing" | "missingSkeleton"
+    requiredCount: NotRequired[int]
+    availableCount: NotRequired[int]
+    staffId: NotRequired[str]        # missingSkeleton のみ
+    staffName: NotRequired[str]      # missingSkeleton のみ
+    detail: str         # 人間向け説明
+
+
+class ShortageDict(TypedDict, total=False):
+    """要員不足（coverageMode="soft" の結果）: 必要人数に対して配置できなかった人数"""
     date: str           # "2026-03-05"
     shiftType: str      # "日勤"
-    constraintType: str # "staffShortage" | "qualificationMissing"
+    qualification: str  # 資格要件の不足のみ
+    role: str           # 役職要件の不足のみ
+    requiredCount: int
+    assignedCount: int
+    shortage: int       # requiredCount - assignedCount（> 0）
+
+
+class SkeletonValidationErrorDict(TypedDict, total=False):
+    """Skeleton事前検証エラー（該当するキーのみ設定）"""
+    constraintType: str  # "consecutiveWork" | "leaveConflict" | "staffShortage"
+                         # | "qualificationMissing" | "roleMissing"
+    staffId: str
+    staffName: str
+    date: str            # 単日の矛盾
+    startDate: str       # 連勤区間の開始日
+    endDate: str         # 連勤区間の終了日
+    qualification: str
+    role: str
     requiredCount: int
     availableCount: int
-    detail: str         # 人間向け説明
+    detail: str          # 人間向け説明
+
+
+class RequestValidationErrorDict(TypedDict, total=False):
+    """リクエスト検証エラー"""
+    path: str                 # "staffList[2].role" 形式（ルートは "$"）
+    message: str              # 人間向け説明
+    allowedValues: list[str]  # 列挙値エラーのみ
 
 
 class SolverResponse(TypedDict):
     success: bool
-    schedule: list[StaffScheduleDict]
+    schedule: list[StaffScheduleDict]  # scheduleFormat="compact" 時は compactSchedule を返す
     solverStats: SolverStats
     warnings: list[SolverWarningDict]
 
@@ -148,11 +242,55 @@ class SolverRequest(TypedDict):
     staffList: list[StaffDict]
     skeleton: ScheduleSkeletonDict
     requirements: ShiftRequirementDict
-    leaveRequests: dict[str, dict[str, str]]
+    leaveRequests: NotRequired[dict[str, dict[str, str]]]
+    scheduleFormat: NotRequired[str]  # "default"（既定） | "compact"
+    skeletonMode: NotRequired[str]    # "fix"（既定） | "hint"
+
+
+class RepairChangesDict(TypedDict, total=False):
+    """局所修復の変更内容（いずれも任意）"""
+    unavailableDates: dict[str, list[str]]       # staffId → 追加の出勤不可日
+    leaveRequests: dict[str, dict[str, str]]     # staffId → 追加の休暇申請
+    removedStaffIds: list[str]                   # 除外するスタッフ
+
+
+class ScenarioDict(TypedDict, total=False):
+    """What-ifシナリオ: 基準リクエストへの差分（いずれも任意）"""
+    name: str
+    addStaff: list[StaffDict]
+    removedStaffIds: list[str]
+    requirements: dict[str, DailyRequirementDict | None]  # 要件キー → 上書き（Noneで削除）
 
 
 class UnifiedSolverRequest(TypedDict):
     """統合Solver用リクエスト（skeletonなし）"""
     staffList: list[StaffDict]
     requirements: ShiftRequirementDict
-    leaveRequests: dict[str, dict[str, str]]
+    leaveRequests: NotRequired[dict[str, dict[str, str]]]
+    scheduleFormat: NotRequired[str]  # "default" | "compact"
+    previousMonthTail: NotRequired[dict[str, list[str]]]  # staffId → 前月末N日分のシフト（古い順）
+    nextMonthOverlapDays: NotRequired[int]  # 翌月への重なり日数（0-2、夜勤施設のみ有効）
+    objectiveMode: NotRequired[str]  # "weighted" | "lexicographic"
+    objectivePriority: NotRequired[list[str]]  # 辞書式モードのステージ優先順
+    stageTimeLimitSec: NotRequired[float]  # 辞書式モードの1ステージあたり時間上限（全ステージ合計は SOLVE_TIME_BUDGET_SEC まで）
+    timeLimitMode: NotRequired[str]  # "wallclock"（既定） | "deterministic"
+    maxDeterministicTime: NotRequired[float]  # 決定的時間の上限（0.01〜MAX_DETERMINISTIC_TIME、省略時は問題規模から算出）
+    coverageMode: NotRequired[str]  # "hard"（既定） | "soft"
+
+
+class UnifiedRepairRequest(TypedDict):
+    """統合Solver局所修復用リクエスト"""
+    staffList: list[StaffDict]
+    requirements: ShiftRequirementDict
+    leaveRequests: NotRequired[dict[str, dict[str, str]]]
+    schedule: list[StaffScheduleDict]  # 修復対象の既存スケジュール
+    changes: RepairChangesDict
+
+
+class UnifiedScenarioRequest(TypedDict):
+    """統合Solver What-ifシナリオ比較用リクエスト"""
+    staffList: list[StaffDict]
+    requirements: ShiftRequirementDict
+    leaveRequests: NotRequired[dict[str, dict[str, str]]]
+    scenarios: list[ScenarioDict]
+    includeSchedules: NotRequired[bool]  # 比較表に各シナリオのスケジュールを含める
@@ -7,20 +7,69 @@ LLMによる骨子生成を排除し、全フェーズを1回の求解で完結
 変数モデル:
   BoolVar x[staff_id, day, shift_type] = 1 iff スタッフが当日そのシフトに割当
 
+夜勤ブロック（night_encoding="block"、既定）:
+  夜勤→明け休み→休 の3日を開始日ごとの1変数 b[staff_id, d] で表す。x[d, 夜勤] と
+  x[d+1, 明け休み] は同じ b[d] を共有し（明け休みの独立変数を作らない）、休[d+2] だけを
+  含意で結ぶ。ブロック同士の重なりは各日のexactly-one（d+1日に b[d] と b[d+1] が同居）で
+  排除される。night_encoding="chain" は従来の含意チェーン（夜勤→明け休み・夜勤→休・
+  明け休み→前日夜勤）。1日目の明け休み（前月末の夜勤の引き継ぎ）は独立変数のまま。
+
 制約:
-  ハード: exactly-one, 人員充足, 資格要件, 連続勤務上限,
-         勤務間インターバル, 夜勤チェーン, 固定休日
+  ハード: exactly-one, 人員充足, 資格要件・役職要件, 連続勤務上限,
+         勤務間インターバル, 夜勤チェーン, 固定休日, 前月からの引き継ぎ
   ソフト: timeSlotPreference, 均等配分, 夜勤均等, 休日間隔, 連勤最小化
+
+要員不足の許容（coverage_mode="soft"）:
+  人員充足・資格要件・役職要件を 日×シフト（×資格／役職）ごとの整数スラック付きにし、不足1名あたり
+  COVERAGE_SHORTAGE_WEIGHT を目的関数から引く（ステージ "coverage"）。求解側（service）は
+  重みに頼らず、このステージを先に単独で最小化して固定してから他のステージを解く。人手が足りない月も
+  INFEASIBLE にならず、extract_shortages で不足箇所と人数を返す。
+  必要人数ちょうどの確定（プリソルブ）は不足を許すと成り立たないため行わない。
+
+派生変数（DerivedVariables）:
+  勤務日リテラル work[staff_id, day] と勤務系シフト回数 count[staff_id, shift_type] を
+  1回だけ構築し、連勤・均等配分・勤務日数などの各制約で共有する。
+
+月またぎ（任意）:
+  previous_month_tail: 前月末N日分のシフト（古い順）。夜勤チェーン・連勤・
+    遅番→早番を月初に引き継ぐ。
+  next_month_overlap_days: 翌月への重なり日数（0-2）。重なり日には
+    明け休み・休の変数のみを作り、月末の夜勤チェーンを翌月側で完結させる。
+
+Skeleton（任意）:
+  skeleton: LLMが生成した骨子（休日・夜勤日・明け日）。各日を「休／夜勤／明け休み／
+    日勤帯のいずれか」に区分し、skeleton_mode="fix" は区分外のシフト変数を0に固定、
+    "hint" は同じ区分を解のヒントとして与える（制約にはしない）。
+
+プリソルブ（solver.presolve、presolve=False で無効）:
+  変数生成の前に スタッフ×日×シフト の定義域から完結しない夜勤チェーンを除き、
+  必要人数ちょうどの割当を確定する（解は変わらない。矛盾を検出したらモデルを実行不能にする）。
+  prune_no_demand=True のときだけ要件キーのない勤務系シフトも除く（そのシフトへの配置を禁止する）。
+  除いた変数数は presolve_stats で報告する。
+
+トレーシング: 構築の各段階（固定休日計算・変数生成・各制約/目的関数メソッド）を
+solver.tracing のスパンで囲み、終了時点の変数数・制約数を属性に記録する。
 """
 
-import datetime
+from contextlib import contextmanager
 
 from ortools.sat.python import cp_model
 
+from solver import tracing
+from solver.eligibility import ShiftSlots, StaffEligibility
+from solver.month_calendar import fixed_rest_mask, get_calendar, non_operational_mask
+from solver.presolve import presolve
+from solver.solution import SolutionIndex, grid_to_compact, grid_to_schedules
 from solver.types import (
     ALL_SHIFT_TYPES,
+    COVERAGE_MODES,
+    COVERAGE_STAGE,
+    OBJECTIVE_STAGES,
+    CompactScheduleDict,
     SHIFT_TYPES,
+    ScheduleSkeletonDict,
     ShiftRequirementDict,
+    ShortageDict,
     SolverWarningDict,
     StaffDict,
     StaffScheduleDict,
@@ -30,19 +79,37 @@ from solver.types import (
 DAY_SHIFT_TYPES = SHIFT_TYPES
 # 夜勤施設用の追加シフト
 NIGHT_SHIFT_TYPES = ["夜勤"]
+# 夜勤の符号化: 夜勤ブロック変数 / 含意チェーン
+NIGHT_ENCODINGS = ["block", "chain"]
 # 非勤務系
 REST_SHIFT_TYPES = ["休", "明け休み"]
-
-
-def _days_in_month(target_month: str) -> int:
-    year, month = map(int, target_month.split("-"))
-    if month == 12:
-        next_year, next_month = year + 1, 1
-    else:
-        next_year, next_month = year, month + 1
-    return (
-        datetime.date(next_year, next_month, 1) - datetime.date(year, month, 1)
-    ).days
+# 勤務日としてカウントするシフト
+WORK_SHIFT_TYPES = SHIFT_TYPES + NIGHT_SHIFT_TYPES
+# 夜勤チェーン（夜勤→明け休み→休）の完結に必要な翌月重なり日数の上限
+MAX_OVERLAP_DAYS = 2
+# ソフト制約のステージ名（目的関数への追加順）
+OBJECTIVE_STAGE_ORDER = OBJECTIVE_STAGES
+# 要員不足（coverage_mode="soft"、ステージ COVERAGE_STAGE）の不足1名あたりの重み。
+# 不足の最小化は重みではなく先行ステージ（service が単独で解いて固定）で優先させる。
+# 重みは目的関数値・ステージ報告での不足の表示用
+COVERAGE_SHORTAGE_WEIGHT = 1000
+# 重み付きモード＋coverage_mode="soft" で不足ステージの後に解く「全ステージの重み付き和」
+WEIGHTED_STAGE = "weighted"
+# 辞書式モードの既定優先順位（重み 10/8/7/5/4/3 の降順）
+DEFAULT_OBJECTIVE_PRIORITY = [
+    "preference", "nightFairness", "workCount", "fairness", "consecutiveSoft", "restSpacing",
+]
+
+
+@contextmanager
+def _stage_span(name: str, model: cp_model.CpModel, **attributes):
+    """構築段階のスパン（終了時のモデル規模を属性に付ける）"""
+    with tracing.span(name, **attributes) as sp:
+        yield sp
+        if sp.recording:
+            proto = model.Proto()
+            sp.set_attribute("solver.num_variables", len(proto.variables))
+            sp.set_attribute("solver.num_constraints", len(proto.constraints))
 
 
 def _has_night_shift(requirements: ShiftRequirementDict) -> bool:
@@ -50,26 +117,109 @@ def _has_night_shift(requirements: ShiftRequirementDict) -> bool:
     return any("夜勤" in key for key in requirements["requirements"])
 
 
-def _non_operational_days(
-    requirements: ShiftRequirementDict, days_in_month: int
-) -> set[int]:
-    """要件エントリがない日 → 非稼働日"""
-    operational = set()
-    for key in requirements["requirements"]:
-        parts = key.split("_")
-        if len(parts) < 2:
-            continue  # 日別形式でないキーはスキップ
-        date_parts = parts[0].split("-")
-        if len(date_parts) < 3:
-            continue
-        day = int(date_parts[2])
-        operational.add(day)
-    return set(range(1, days_in_month + 1)) - operational
+def skeleton_cells(
+    skeleton: ScheduleSkeletonDict, days_in_month: int
+) -> dict[tuple[str, int], str]:
+    """Skeleton → {(staffId, day): 休|夜勤|明け休み}（記載のない日は日勤帯の勤務）
+
+    明け日（nightShiftFollowupDays）は前日が夜勤なら明け休み、それ以外は休。
+    休日と明け日が重なる場合は明け日、夜勤日は常に夜勤を優先する。
+    """
+    cells: dict[tuple[str, int], str] = {}
+    for skel in skeleton["staffSchedules"]:
+        staff_id = skel["staffId"]
+        nights = set(skel["nightShiftDays"])
+        for day in skel["restDays"]:
+            cells[(staff_id, day)] = "休"
+        for day in skel["nightShiftFollowupDays"]:
+            cells[(staff_id, day)] = "明け休み" if day - 1 in nights else "休"
+        for day in nights:
+            cells[(staff_id, day)] = "夜勤"
+    return {
+        key: st for key, st in cells.items() if 1 <= key[1] <= days_in_month
+    }
+
+
+def _night_cut_off(shift_type: str, day: int, horizon: int) -> bool:
+    """夜勤→明け休み→休 がホライズン（当月+翌月重なり日）内で完結しない日の夜勤か"""
+    return shift_type in NIGHT_SHIFT_TYPES and day > horizon - 2
+
+
+class DerivedVariables:
+    """派生変数レイヤー: 制約・目的関数ビルダーで共有する勤務日リテラルとシフト回数
+
+    モデルごとに1回だけ構築する（exactly-one制約の追加後）。
+      work[staff_id, day]: 当日勤務するか。勤務系変数が1つならその変数自身、
+        複数なら BoolVar を作り「和と等しい」等式1本で結ぶ（exactly-oneにより0/1）。
+        勤務系変数がない日（固定休日・休のみの日）はエントリなし。
+      count[staff_id, shift_type]: 当月の勤務系シフト回数 IntVar（変数の和との等式1本）。
+        変数が1つもないシフト種類はエントリなし。
+    """
+
+    def __init__(
+        self,
+        model: cp_model.CpModel,
+        variables: dict[tuple[str, int, str], cp_model.IntVar],
+        staff_list: list[StaffDict],
+        days_in_month: int,
+    ) -> None:
+        # スタッフごとに日インデックス（0は未使用）の勤務日リテラル列
+        self._work_rows: dict[str, list[cp_model.IntVar | None]] = {}
+        self._counts: dict[tuple[str, str], cp_model.IntVar] = {}
 
+        for staff in staff_list:
+            staff_id = staff["id"]
+            by_type: dict[str, list] = {st: [] for st in WORK_SHIFT_TYPES}
+            row: list[cp_model.IntVar | None] = [None] * (days_in_month + 1)
+            self._work_rows[staff_id] = row
+            for day in range(1, days_in_month + 1):
+                day_vars = []
+                for st in WORK_SHIFT_TYPES:
+                    var = variables.get((staff_id, day, st))
+                    if var is not None:
+                        day_vars.append(var)
+                        by_type[st].append(var)
+                if not day_vars:
+                    continue
+                if len(day_vars) == 1:
+                    row[day] = day_vars[0]
+                else:
+                    work = model.NewBoolVar(f"work_{staff_id}_{day}")
+                    model.Add(work == cp_model.LinearExpr.Sum(day_vars))
+                    row[day] = work
 
-def _js_weekday(year: int, month: int, day: int) -> int:
-    """Python weekday (Mon=0) → JS weekday (Sun=0)"""
-    return (datetime.date(year, month, day).weekday() + 1) % 7
+            for st, type_vars in by_type.items():
+                if not type_vars:
+                    continue
+                count = model.NewIntVar(0, len(type_vars), f"count_{staff_id}_{st}")
+                model.Add(count == cp_model.LinearExpr.Sum(type_vars))
+                self._counts[(staff_id, st)] = count
+
+    def work(self, staff_id: str, day: int) -> cp_model.IntVar | None:
+        """勤務日リテラル（勤務不可の日は None）"""
+        row = self._work_rows.get(staff_id)
+        if row is None or not 1 <= day < len(row):
+            return None
+        return row[day]
+
+    def work_window(self, staff_id: str, start: int, stop: int) -> list[cp_model.IntVar]:
+        """start〜stop-1日のうち勤務可能な日の勤務日リテラル"""
+        row = self._work_rows.get(staff_id)
+        if row is None:
+            return []
+        return [w for w in row[max(start, 1):stop] if w is not None]
+
+    def count(self, staff_id: str, shift_type: str) -> cp_model.IntVar | None:
+        """シフト回数 IntVar（そのシフトに就けない場合は None）"""
+        return self._counts.get((staff_id, shift_type))
+
+    def work_counts(self, staff_id: str) -> list[cp_model.IntVar]:
+        """勤務系シフト回数 IntVar のリスト（和が月間勤務日数）"""
+        return [
+            self._counts[(staff_id, st)]
+            for st in WORK_SHIFT_TYPES
+            if (staff_id, st) in self._counts
+        ]
 
 
 class UnifiedModelBuilder:
@@ -80,30 +230,104 @@ class UnifiedModelBuilder:
         staff_list: list[StaffDict],
         requirements: ShiftRequirementDict,
         leave_requests: dict[str, dict[str, str]],
+        previous_month_tail: dict[str, list[str]] | None = None,
+        next_month_overlap_days: int = 0,
+        skeleton: ScheduleSkeletonDict | None = None,
+        skeleton_mode: str = "fix",
+        presolve: bool = True,
+        prune_no_demand: bool = False,
+        night_encoding: str = "block",
+        coverage_mode: str = "hard",
     ) -> None:
+        if night_encoding not in NIGHT_ENCODINGS:
+            raise ValueError(f"Unknown night_encoding: {night_encoding}")
+        if coverage_mode not in COVERAGE_MODES:
+            raise ValueError(f"Unknown coverage_mode: {coverage_mode}")
         self._staff_list = staff_list
         self._requirements = requirements
         self._leave_requests = leave_requests
+        self._previous_month_tail = previous_month_tail or {}
         self._model = cp_model.CpModel()
         self._variables: dict[tuple[str, int, str], cp_model.IntVar] = {}
+        self._solution_index = SolutionIndex()
 
         self._target_month = requirements["targetMonth"]
-        self._year, self._month = map(int, self._target_month.split("-"))
-        self._dim = _days_in_month(self._target_month)
-        self._is_night_facility = _has_night_shift(requirements)
-        self._non_op_days = _non_operational_days(requirements, self._dim)
+        self._calendar = get_calendar(self._target_month)
+        self._year, self._month = self._calendar.year, self._calendar.month
+        self._dim = self._calendar.days_in_month
+        self._skeleton = skeleton
+        self._skeleton_mode = skeleton_mode
+        # Skeletonに夜勤日があれば要件になくても夜勤変数を作る
+        self._is_night_facility = _has_night_shift(requirements) or bool(
+            skeleton and any(s["nightShiftDays"] for s in skeleton["staffSchedules"])
+        )
+        self._non_op_mask = non_operational_mask(self._calendar, requirements["requirements"])
+        self._non_op_days = self._calendar.days_of(self._non_op_mask)
+        # 翌月重なり日は夜勤チェーン完結用なので夜勤施設のみ
+        self._overlap = (
+            max(0, min(next_month_overlap_days, MAX_OVERLAP_DAYS))
+            if self._is_night_facility else 0
+        )
+        self._horizon = self._dim + self._overlap
 
         # スタッフごとの固定休日をキャッシュ
         self._fixed_rest: dict[str, set[int]] = {}
-        for staff in staff_list:
-            self._fixed_rest[staff["id"]] = self._compute_fixed_rest(staff)
+        with tracing.span(
+            "builder.compute_fixed_rest",
+            **{"solver.staff_count": len(staff_list), "solver.days": self._dim},
+        ):
+            for staff in staff_list:
+                self._fixed_rest[staff["id"]] = self._compute_fixed_rest(staff)
 
         self._warnings: list[SolverWarningDict] = []
+        self._objective_stages: dict[str, list] = {}
+        self._derived: DerivedVariables | None = None
+        self._skeleton_stats: dict = {}
+        self._presolve = presolve
+        self._prune_no_demand = prune_no_demand
+        self._presolve_stats: dict = {}
+        # 資格・役職のマスク（プリソルブと資格・役職要件制約で共有）
+        self._eligibility = StaffEligibility(staff_list)
+        self._night_encoding = night_encoding
+        # ヒント済み変数のインデックス（夜勤ブロックは2つのキーで共有されるため重複を避ける）
+        self._hinted: set[int] = set()
+        # soft: (不足の識別情報, 配置変数, スラック) の一覧
+        self._coverage: list[tuple[ShortageDict, list, cp_model.IntVar]] | None = (
+            [] if coverage_mode == "soft" else None
+        )
 
     def build(self) -> cp_model.CpModel:
         """モデル構築のエントリポイント"""
-        self._create_variables()
-        self._add_exactly_one()
+        size = {"solver.staff_count": len(self._staff_list), "solver.days": self._dim}
+        domains = self._initial_domains()
+        if self._presolve:
+            with tracing.span("builder.presolve", **size) as sp:
+                # Skeletonの夜勤日は要件になくても残す
+                keep = set() if self._skeleton is None else {
+                    (staff_id, day, st)
+                    for (staff_id, day), st in skeleton_cells(self._skeleton, self._dim).items()
+                    if st == "夜勤"
+                }
+                self._presolve_stats = presolve(
+                    domains, self._staff_list, self._requirements["requirements"],
+                    self._target_month, self._dim, keep=keep,
+                    force_exact_cover=self._coverage is None,
+                    eligibility=self._eligibility,
+                    prune_no_demand=self._prune_no_demand,
+                )
+                for key, value in self._presolve_stats.items():
+                    sp.set_attribute(f"solver.{key}", value)
+            if self._presolve_stats["presolveInfeasible"]:
+                # 確定した割当が矛盾 → 実行可能解なし（空の論理和は常に偽）
+                self._model.AddBoolOr([])
+        with _stage_span("builder.create_variables", self._model, **size):
+            self._create_variables(domains)
+        with _stage_span("builder.exactly_one", self._model):
+            self._add_exactly_one()
+        with _stage_span("builder.derived_variables", self._model):
+            self._derived = DerivedVariables(
+                self._model, self._variables, self._staff_list, self._dim
+            )
         self._warnings = UnifiedConstraintBuilder.add_all(
             self._model,
             self._variables,
@@ -117,8 +341,14 @@ class UnifiedModelBuilder:
             self._fixed_rest,
             self._year,
             self._month,
+            previous_month_tail=self._previous_month_tail,
+            horizon=self._horizon,
+            derived=self._derived,
+            night_encoding=self._night_encoding,
+            coverage=self._coverage,
+            eligibility=self._eligibility,
         )
-        UnifiedObjectiveBuilder.add_all(
+        self._objective_stages = UnifiedObjectiveBuilder.add_all(
             self._model,
             self._variables,
             self._staff_list,
@@ -126,7 +356,12 @@ class UnifiedModelBuilder:
             self._dim,
             self._is_night_facility,
             self._fixed_rest,
+            derived=self._derived,
+            coverage=self._coverage,
         )
+        if self._skeleton is not None:
+            with _stage_span("builder.apply_skeleton", self._model):
+                self._skeleton_stats = self._apply_skeleton(self._skeleton)
         return self._model
 
     @property
@@ -137,27 +372,169 @@ class UnifiedModelBuilder:
     def warnings(self) -> list[SolverWarningDict]:
         return self._warnings
 
+    @property
+    def days_in_month(self) -> int:
+        return self._dim
+
+    @property
+    def is_night_facility(self) -> bool:
+        return self._is_night_facility
+
+    @property
+    def derived(self) -> "DerivedVariables | None":
+        """build()で構築した派生変数レイヤー"""
+        return self._derived
+
+    @property
+    def skeleton_stats(self) -> dict:
+        """Skeleton適用結果（skeletonMode, skeletonAppliedCells, skeletonSkippedCells）"""
+        return self._skeleton_stats
+
+    @property
+    def presolve_stats(self) -> dict:
+        """プリソルブ結果（presolvePrunedVariables, presolveForcedAssignments, presolveInfeasible）"""
+        return self._presolve_stats
+
+    @property
+    def objective_stages(self) -> dict[str, list]:
+        """ソフト制約のステージ別目的関数項 {ステージ名: 項リスト}"""
+        return self._objective_stages
+
     def extract_solution(self, solver: cp_model.CpSolver) -> list[StaffScheduleDict]:
-        """求解結果をStaffSchedule[]形式に変換"""
-        schedules: list[StaffScheduleDict] = []
+        """求解結果をStaffSchedule[]形式に変換
+
+        solutionベクトルを1回だけ読み出し、変数生成時のインデックス表で逆引きする。
+        """
+        grid = self.extract_grid(solver)
+        return grid_to_schedules(self._staff_list, self._target_month, self._dim, grid)
+
+    def extract_shortages(self, solver: cp_model.CpSolver) -> list[ShortageDict]:
+        """coverage_mode="soft" の求解結果から不足している要件を返す（日付・シフト順）
+
+        不足人数は解の配置人数から数え直す（スラックの値ではなく実際の不足）。
+        """
+        shortages: list[ShortageDict] = []
+        for info, assigned, _ in self._coverage or ():
+            assigned_count = sum(solver.BooleanValue(v) for v in assigned)
+            if assigned_count < info["requiredCount"]:
+                shortages.append(ShortageDict(
+                    **info,
+                    assignedCount=assigned_count,
+                    shortage=info["requiredCount"] - assigned_count,
+                ))
+        return shortages
+
+    def extract_compact(self, solver: cp_model.CpSolver) -> CompactScheduleDict:
+        """求解結果をコンパクト形式（スタッフごとのシフトコード文字列）に変換"""
+        grid = self.extract_grid(solver)
+        return grid_to_compact(self._staff_list, self._target_month, self._dim, grid)
+
+    def extract_grid(self, solver: cp_model.CpSolver) -> list[list[str]]:
+        """求解結果を grid[staff_pos][day-1] = shiftType のグリッドで返す
+
+        変数のない日（固定休日）は「休」のまま残る。
+        """
+        grid = [["休"] * self._dim for _ in self._staff_list]
+        self._solution_index.fill_grid(solver, grid)
+        return grid
+
+    def fix_cells(self, cells: dict[tuple[str, int], str]) -> int:
+        """build()後に (staffId, day) → shiftType の割当を固定し、固定したセル数を返す
+
+        固定休日（変数なし）のセルはもともと「休」なので何もしない。
+        指定シフトの変数がないセル（変更により不可能になった割当）は固定しない。
+        """
+        fixed = 0
+        for (staff_id, day), shift_type in cells.items():
+            var = self._variables.get((staff_id, day, shift_type))
+            if var is not None:
+                self._model.Add(var == 1)
+                fixed += 1
+        return fixed
+
+    def assume_cells(self, cells: dict[tuple[str, int], str]) -> int:
+        """build()後に割当を仮定（assumption）として置き、置いたセル数を返す
+
+        fix_cells と違い前回の仮定を置き換えるため、モデルを作り直さずに固定範囲を変えて
+        再求解できる（仮定と矛盾すれば INFEASIBLE）。変数のないセルは fix_cells と同じく飛ばす。
+        """
+        literals = [
+            var for (staff_id, day), shift_type in cells.items()
+            if (var := self._variables.get((staff_id, day, shift_type))) is not None
+        ]
+        self._model.ClearAssumptions()
+        self._model.AddAssumptions(literals)
+        return len(literals)
+
+    def add_hints(self, cells: dict[tuple[str, int], str]) -> None:
+        """build()後に既存割当を解のヒントとして設定"""
+        for (staff_id, day, st), var in self._variables.items():
+            shift_type = cells.get((staff_id, day))
+            if shift_type is not None:
+                self._hint(var, 1 if shift_type == st else 0)
+
+    def _hint(self, var: cp_model.IntVar, value: int) -> None:
+        """ヒントを設定（同じ変数への2回目以降は無視: 重複ヒントはMODEL_INVALIDになる）"""
+        if var.Index() in self._hinted:
+            return
+        self._hinted.add(var.Index())
+        self._model.AddHint(var, value)
+
+    def _apply_skeleton(self, skeleton: ScheduleSkeletonDict) -> dict:
+        """Skeletonの区分を固定（fix）またはヒント（hint）として適用する
+
+        Skeletonに記載のないスタッフは自由（警告 missingSkeleton を warnings に加える）。
+        区分のシフト変数がない日（日勤のみスタッフの夜勤日、固定休日に勤務など）は
+        適用できずスキップとして数える。
+        """
+        cells = skeleton_cells(skeleton, self._dim)
+        skeleton_staff = {s["staffId"] for s in skeleton["staffSchedules"]}
+        fix = self._skeleton_mode == "fix"
+        applied = skipped = 0
+
         for staff in self._staff_list:
             staff_id = staff["id"]
-            monthly_shifts = []
+            if staff_id not in skeleton_staff:
+                self._warnings.append(SolverWarningDict(
+                    constraintType="missingSkeleton",
+                    staffId=staff_id,
+                    staffName=staff["name"],
+                    detail=f"{staff['name']}のSkeletonがないため固定せずに割り当てます",
+                ))
+                continue
+            fixed = self._fixed_rest[staff_id]
+            shift_types = self._shift_types_for_staff(staff)
             for day in range(1, self._dim + 1):
-                date_str = f"{self._target_month}-{day:02d}"
-                shift_type = "休"
-                for st in self._shift_types_for_staff(staff):
-                    key = (staff_id, day, st)
-                    if key in self._variables and solver.Value(self._variables[key]) == 1:
-                        shift_type = st
-                        break
-                monthly_shifts.append({"date": date_str, "shiftType": shift_type})
-            schedules.append({
-                "staffId": staff_id,
-                "staffName": staff["name"],
-                "monthlyShifts": monthly_shifts,
-            })
-        return schedules
+                target = cells.get((staff_id, day))
+                if day in fixed:
+                    # 変数なし（休）: 勤務・夜勤の指定は満たせない
+                    if target not in REST_SHIFT_TYPES:
+                        skipped += 1
+                    continue
+                allowed = DAY_SHIFT_TYPES if target is None else (target,)
+                day_vars = [
+                    (st, self._variables[(staff_id, day, st)])
+                    for st in shift_types
+                    if (staff_id, day, st) in self._variables
+                ]
+                if not any(st in allowed for st, _ in day_vars):
+                    skipped += 1
+                    continue
+                for st, var in day_vars:
+                    if st not in allowed:
+                        if fix:
+                            self._model.Add(var == 0)
+                        else:
+                            self._hint(var, 0)
+                    elif not fix and target is not None:
+                        self._hint(var, 1)
+                applied += 1
+
+        return {
+            "skeletonMode": self._skeleton_mode,
+            "skeletonAppliedCells": applied,
+            "skeletonSkippedCells": skipped,
+        }
 
     def _shift_types_for_staff(self, staff: StaffDict) -> list[str]:
         """スタッフのtimeSlotPreferenceに基づくシフト種類"""
@@ -174,63 +551,86 @@ class UnifiedModelBuilder:
         return DAY_SHIFT_TYPES + ["休"]
 
     def _compute_fixed_rest(self, staff: StaffDict) -> set[int]:
-        """固定休日の計算: unavailableDates + leaveRequests + 非稼働日 + 非対応曜日"""
-        fixed = set(self._non_op_days)
-        staff_id = staff["id"]
-
-        # unavailableDates
-        for date_str in staff.get("unavailableDates", []):
-            parts = date_str.split("-")
-            if len(parts) == 3:
-                d_year, d_month, d_day = int(parts[0]), int(parts[1]), int(parts[2])
-                if d_year == self._year and d_month == self._month:
-                    fixed.add(d_day)
-
-        # leaveRequests
-        if staff_id in self._leave_requests:
-            for date_str in self._leave_requests[staff_id]:
-                parts = date_str.split("-")
-                if len(parts) == 3:
-                    fixed.add(int(parts[2]))
-
-        # availableWeekdays (JS format: 0=Sun)
-        available = set(staff["availableWeekdays"])
-        for day in range(1, self._dim + 1):
-            js_wd = _js_weekday(self._year, self._month, day)
-            if js_wd not in available:
-                fixed.add(day)
+        """固定休日の計算: unavailableDates + leaveRequests + 非稼働日 + 非対応曜日
 
-        return fixed
+        月のCalendarのビットマスクで合成する（当月外の日付は無視）。
+        """
+        return self._calendar.days_of(
+            fixed_rest_mask(self._calendar, staff, self._leave_requests, self._non_op_mask)
+        )
+
+    def _initial_domains(self) -> dict[tuple[str, int], list[str]]:
+        """(staffId, 日) → 変数を作るシフト種別（プリソルブ前）
 
-    def _create_variables(self) -> None:
-        """決定変数の生成"""
+        固定休日はエントリなし（変数なし → extract_solutionで「休」として出力）。
+        夜勤は夜勤→明け休み→休がホライズン（当月+翌月重なり日）内で完結する日のみ。
+        明け休みは前日が夜勤になりうる日のみ（1日目は前月末が夜勤の場合）。
+        翌月重なり日は夜勤チェーン完結用の明け休み・休のみ（出力対象外）。
+        """
+        domains: dict[tuple[str, int], list[str]] = {}
         for staff in self._staff_list:
             staff_id = staff["id"]
             fixed = self._fixed_rest[staff_id]
             shift_types = self._shift_types_for_staff(staff)
+            tail = self._previous_month_tail.get(staff_id, [])
+            followup_on_day1 = bool(tail) and tail[-1] == "夜勤"
 
             for day in range(1, self._dim + 1):
                 if day in fixed:
-                    # 固定休日: 変数なし → extract_solutionで「休」として出力
                     continue
-                for st in shift_types:
-                    # 月末2日間は夜勤チェーン完結不能 → 夜勤変数を除外
-                    if st == "夜勤" and day > self._dim - 2:
-                        continue
-                    # 月初日は前日夜勤がないので明け休みも不可
-                    if st == "明け休み" and day == 1:
+                domains[(staff_id, day)] = [
+                    st for st in shift_types
+                    if not _night_cut_off(st, day, self._horizon)
+                    and not (st == "明け休み" and day == 1 and not followup_on_day1)
+                ]
+
+            if self._overlap and "夜勤" in shift_types:
+                for day in range(self._dim + 1, self._horizon + 1):
+                    domains[(staff_id, day)] = list(REST_SHIFT_TYPES)
+        return domains
+
+    def _create_variables(self, domains: dict[tuple[str, int], list[str]]) -> None:
+        """定義域（_initial_domains → プリソルブ）から決定変数を生成
+
+        夜勤ブロック符号化では、2日目以降の明け休みは前日の夜勤（ブロック）変数を共有する。
+        翌日に明け休みの候補がない夜勤、翌々日に休の候補がない夜勤（固定休日は休扱い）、
+        前日に夜勤変数のない明け休みは作らない。
+        """
+        staff_pos_of = {staff["id"]: pos for pos, staff in enumerate(self._staff_list)}
+        block = self._night_encoding == "block"
+
+        def register(staff_id: str, day: int, st: str, var: cp_model.IntVar) -> None:
+            self._variables[(staff_id, day, st)] = var
+            if day <= self._dim:
+                self._solution_index.add(staff_pos_of[staff_id], day, st, var)
+
+        shared_followups = []
+        for (staff_id, day), shift_types in domains.items():
+            for st in shift_types:
+                if block and st == "夜勤":
+                    rest_day = domains.get((staff_id, day + 2))
+                    if ("明け休み" not in domains.get((staff_id, day + 1), ())
+                            or (rest_day is not None and "休" not in rest_day)):
                         continue
-                    var_name = f"x_{staff_id}_{day}_{st}"
-                    self._variables[(staff_id, day, st)] = (
-                        self._model.NewBoolVar(var_name)
-                    )
+                    var = self._model.NewBoolVar(f"night_{staff_id}_{day}")
+                elif block and st == "明け休み" and day > 1:
+                    shared_followups.append((staff_id, day))
+                    continue
+                else:
+                    var = self._model.NewBoolVar(f"x_{staff_id}_{day}_{st}")
+                register(staff_id, day, st, var)
+
+        for staff_id, day in shared_followups:
+            night = self._variables.get((staff_id, day - 1, "夜勤"))
+            if night is not None:
+                register(staff_id, day, "明け休み", night)
 
     def _add_exactly_one(self) -> None:
-        """各スタッフ・各非固定日にexactly-one制約"""
+        """各スタッフ・各非固定日（翌月重なり日を含む）にexactly-one制約"""
         for staff in self._staff_list:
             staff_id = staff["id"]
             shift_types = self._shift_types_for_staff(staff)
-            for day in range(1, self._dim + 1):
+            for day in range(1, self._horizon + 1):
                 day_vars = [
                     self._variables[(staff_id, day, st)]
                     for st in shift_types
@@ -257,39 +657,78 @@ class UnifiedConstraintBuilder:
         fixed_rest: dict[str, set[int]],
         year: int,
         month: int,
+        previous_month_tail: dict[str, list[str]] | None = None,
+        horizon: int | None = None,
+        derived: DerivedVariables | None = None,
+        night_encoding: str = "chain",
+        coverage: list | None = None,
+        eligibility: StaffEligibility | None = None,
     ) -> list[SolverWarningDict]:
+        """ハード制約を追加し、事前検証の警告を返す
+
+        coverage（リスト）を渡すと人員充足・資格要件を不足スラック付きにし、
+        (不足の識別情報, 配置変数, スラック) を追加する。
+        eligibility（ビルダーが1回だけ作る StaffEligibility）を渡すと作り直さない。
+        """
         warnings: list[SolverWarningDict] = []
-        UnifiedConstraintBuilder._add_staffing(
-            model, variables, staff_list, requirements, target_month, days_in_month,
-            warnings,
-        )
-        UnifiedConstraintBuilder._add_qualification(
-            model, variables, staff_list, requirements, target_month, days_in_month,
-            warnings,
-        )
-        UnifiedConstraintBuilder._add_consecutive_work(
-            model, variables, staff_list, days_in_month, fixed_rest
-        )
-        UnifiedConstraintBuilder._add_interval(
-            model, variables, staff_list, days_in_month
-        )
-        if is_night_facility:
-            UnifiedConstraintBuilder._add_night_shift_chain(
+        horizon = horizon or days_in_month
+        if derived is None:
+            derived = DerivedVariables(model, variables, staff_list, days_in_month)
+        eligibility = eligibility or StaffEligibility(staff_list)
+        slots = ShiftSlots(variables, eligibility.positions)
+        with _stage_span("constraint.staffing", model):
+            UnifiedConstraintBuilder._add_staffing(
+                model, slots, requirements, target_month, days_in_month,
+                warnings, coverage, horizon,
+            )
+        with _stage_span("constraint.qualification", model):
+            UnifiedConstraintBuilder._add_qualification(
+                model, slots, eligibility, requirements, target_month, days_in_month,
+                warnings, coverage, horizon,
+            )
+        with _stage_span("constraint.consecutive_work", model):
+            UnifiedConstraintBuilder._add_consecutive_work(
+                model, derived, staff_list, days_in_month
+            )
+        with _stage_span("constraint.interval", model):
+            UnifiedConstraintBuilder._add_interval(
                 model, variables, staff_list, days_in_month
             )
+        if is_night_facility and night_encoding == "block":
+            with _stage_span("constraint.night_blocks", model):
+                UnifiedConstraintBuilder._add_night_blocks(
+                    model, variables, staff_list, horizon
+                )
+        elif is_night_facility:
+            with _stage_span("constraint.night_shift_chain", model):
+                UnifiedConstraintBuilder._add_night_shift_chain(
+                    model, variables, staff_list, horizon
+                )
+        if previous_month_tail:
+            with _stage_span("constraint.previous_month_carry_over", model):
+                UnifiedConstraintBuilder._add_previous_month_carry_over(
+                    model, variables, derived, staff_list, days_in_month, previous_month_tail
+                )
         return warnings
 
     @staticmethod
     def _add_staffing(
         model: cp_model.CpModel,
-        variables: dict,
-        staff_list: list[StaffDict],
+        slots: ShiftSlots,
         requirements: ShiftRequirementDict,
         target_month: str,
         days_in_month: int,
         warnings: list[SolverWarningDict],
+        coverage: list | None = None,
+        horizon: int | None = None,
     ) -> None:
-        """各日・各シフトの必要人数制約"""
+        """各日・各シフトの必要人数制約
+
+        ハード（coverage なし）で配置可能スタッフがいない要件はモデルを実行不能にする。
+        ただし月末の夜勤チェーンがホライズン内で完結しない日の夜勤は変数を作らない
+        仕様のため、警告のみとする（翌月重なり日を指定すれば配置できる）。
+        """
+        horizon = horizon or days_in_month
         for day in range(1, days_in_month + 1):
             for shift_type in SHIFT_TYPES + NIGHT_SHIFT_TYPES:
                 req_key = f"{target_month}-{day:02d}_{shift_type}"
@@ -298,15 +737,19 @@ class UnifiedConstraintBuilder:
                 req = requirements["requirements"][req_key]
                 total_required = req["totalStaff"]
 
-                staff_on_shift = [
-                    variables[(s["id"], day, shift_type)]
-                    for s in staff_list
-                    if (s["id"], day, shift_type) in variables
-                ]
-                if staff_on_shift:
-                    model.Add(sum(staff_on_shift) >= total_required)
-                elif total_required > 0:
-                    date_str = f"{target_month}-{day:02d}"
+                staff_on_shift = slots.select(day, shift_type)
+                date_str = f"{target_month}-{day:02d}"
+                if coverage is not None:
+                    UnifiedConstraintBuilder._add_soft_cover(
+                        model, staff_on_shift, total_required, coverage,
+                        ShortageDict(date=date_str, shiftType=shift_type,
+                                     requiredCount=total_required),
+                    )
+                elif staff_on_shift:
+                    model.Add(cp_model.LinearExpr.Sum(staff_on_shift) >= total_required)
+                elif total_required > 0 and not _night_cut_off(shift_type, day, horizon):
+                    model.AddBoolOr([])  # 配置可能スタッフなし → 実行不能（空の論理和は常に偽）
+                if not staff_on_shift and total_required > 0:
                     warnings.append(SolverWarningDict(
                         date=date_str,
                         shiftType=shift_type,
@@ -319,74 +762,93 @@ class UnifiedConstraintBuilder:
     @staticmethod
     def _add_qualification(
         model: cp_model.CpModel,
-        variables: dict,
-        staff_list: list[StaffDict],
+        slots: ShiftSlots,
+        eligibility: StaffEligibility,
         requirements: ShiftRequirementDict,
         target_month: str,
         days_in_month: int,
         warnings: list[SolverWarningDict],
+        coverage: list | None = None,
+        horizon: int | None = None,
     ) -> None:
-        """資格要件制約"""
+        """資格要件・役職要件制約
+
+        対象スタッフは 配置可能マスク & 資格（役職）マスク で求める（スタッフを走査しない）。
+        該当スタッフがいない要件の扱いは _add_staffing と同じ。
+        """
+        horizon = horizon or days_in_month
         for day in range(1, days_in_month + 1):
             for shift_type in SHIFT_TYPES + NIGHT_SHIFT_TYPES:
                 req_key = f"{target_month}-{day:02d}_{shift_type}"
                 if req_key not in requirements["requirements"]:
                     continue
                 req = requirements["requirements"][req_key]
-                for qual_req in req["requiredQualifications"]:
-                    qualification = qual_req["qualification"]
-                    required_count = qual_req["count"]
-                    qualified = [
-                        variables[(s["id"], day, shift_type)]
-                        for s in staff_list
-                        if qualification in s["qualifications"]
-                        and (s["id"], day, shift_type) in variables
-                    ]
-                    if qualified:
-                        model.Add(sum(qualified) >= required_count)
-                    elif required_count > 0:
-                        date_str = f"{target_month}-{day:02d}"
+                for kind, name, mask, required_count in eligibility.requirement_groups(req):
+                    eligible = slots.select(day, shift_type, mask)
+                    date_str = f"{target_month}-{day:02d}"
+                    if coverage is not None:
+                        UnifiedConstraintBuilder._add_soft_cover(
+                            model, eligible, required_count, coverage,
+                            ShortageDict(date=date_str, shiftType=shift_type,
+                                         requiredCount=required_count, **{kind: name}),
+                        )
+                    elif eligible:
+                        model.Add(cp_model.LinearExpr.Sum(eligible) >= required_count)
+                    elif required_count > 0 and not _night_cut_off(shift_type, day, horizon):
+                        model.AddBoolOr([])  # 該当スタッフなし → 実行不能
+                    if not eligible and required_count > 0:
                         warnings.append(SolverWarningDict(
                             date=date_str,
                             shiftType=shift_type,
-                            constraintType="qualificationMissing",
+                            constraintType=f"{kind}Missing",
                             requiredCount=required_count,
                             availableCount=0,
-                            detail=f"{date_str}の{shift_type}: {qualification}{required_count}名必要だが配置可能0名",
+                            detail=f"{date_str}の{shift_type}: {name}{required_count}名必要だが配置可能0名",
                         ))
 
+    @staticmethod
+    def _add_soft_cover(
+        model: cp_model.CpModel,
+        assigned: list,
+        required: int,
+        coverage: list,
+        info: ShortageDict,
+    ) -> None:
+        """Σ配置 + 不足スラック ≥ 必要人数（スラックの上限は必要人数）"""
+        if required <= 0:
+            return
+        slack = model.NewIntVar(
+            0, required,
+            f"short_{info['date']}_{info['shiftType']}_"
+            f"{info.get('qualification') or info.get('role', '')}",
+        )
+        model.Add(cp_model.LinearExpr.Sum(assigned) + slack >= required)
+        coverage.append((info, assigned, slack))
+
     @staticmethod
     def _add_consecutive_work(
         model: cp_model.CpModel,
-        variables: dict,
+        derived: DerivedVariables,
         staff_list: list[StaffDict],
         days_in_month: int,
-        fixed_rest: dict[str, set[int]],
     ) -> None:
         """連続勤務上限制約（スライディングウィンドウ方式）
 
         maxConsecutiveWorkDays+1 日のウィンドウで、
         勤務日数 ≤ maxConsecutiveWorkDays を保証。
-        固定休日は確定的に休日としてカウント。
+        勤務日リテラルのない日（固定休日など）は確定的に休日としてカウント。
         """
         for staff in staff_list:
             staff_id = staff["id"]
             max_consec = staff["maxConsecutiveWorkDays"]
             window_size = max_consec + 1
-            fixed = fixed_rest[staff_id]
 
             for start in range(1, days_in_month - window_size + 2):
-                work_in_window = []
-                for d in range(start, min(start + window_size, days_in_month + 1)):
-                    if d in fixed:
-                        continue  # 固定休日 → 勤務変数なし → カウント不要
-                    # 「休」「明け休み」以外の変数の合計 = 勤務日数
-                    for st in SHIFT_TYPES + NIGHT_SHIFT_TYPES:
-                        key = (staff_id, d, st)
-                        if key in variables:
-                            work_in_window.append(variables[key])
+                work_in_window = derived.work_window(
+                    staff_id, start, min(start + window_size, days_in_month + 1)
+                )
                 if len(work_in_window) > max_consec:
-                    model.Add(sum(work_in_window) <= max_consec)
+                    model.Add(cp_model.LinearExpr.Sum(work_in_window) <= max_consec)
 
     @staticmethod
     def _add_interval(
@@ -406,6 +868,25 @@ class UnifiedConstraintBuilder:
                         variables[late_key] + variables[early_next] <= 1
                     )
 
+    @staticmethod
+    def _add_night_blocks(
+        model: cp_model.CpModel,
+        variables: dict,
+        staff_list: list[StaffDict],
+        days_in_month: int,
+    ) -> None:
+        """夜勤ブロック制約: ブロック b[d]（= 夜勤[d] = 明け休み[d+1]）→ 休[d+2]
+
+        夜勤と明け休みは変数を共有するため含意は不要。d+2が固定休日（変数なし）なら自動的に休。
+        """
+        for staff in staff_list:
+            staff_id = staff["id"]
+            for day in range(1, days_in_month + 1):
+                night_key = (staff_id, day, "夜勤")
+                rest_key = (staff_id, day + 2, "休")
+                if night_key in variables and rest_key in variables:
+                    model.AddImplication(variables[night_key], variables[rest_key])
+
     @staticmethod
     def _add_night_shift_chain(
         model: cp_model.CpModel,
@@ -463,9 +944,65 @@ class UnifiedConstraintBuilder:
                     model.Add(variables[followup_key] == 0)
 
     @staticmethod
-    def _add_weekly_work_count(
+    def _add_previous_month_carry_over(
         model: cp_model.CpModel,
         variables: dict,
+        derived: DerivedVariables,
+        staff_list: list[StaffDict],
+        days_in_month: int,
+        previous_month_tail: dict[str, list[str]],
+    ) -> None:
+        """前月末のシフトを月初に引き継ぐ
+
+        - 前月末日が夜勤 → 1日目は明け休み、2日目は休
+        - 前月末日が明け休み（前々日夜勤） → 1日目は休
+        - 前月末日が遅番 → 1日目の早番禁止
+        - 前月末からの連勤r日 → 1〜(max-r+1)日目に少なくとも1日休み
+        固定休日で変数がない日は休として扱われるため制約不要。
+        """
+        def force_rest(staff_id: str, day: int, rest_type: str) -> None:
+            key = (staff_id, day, rest_type)
+            if key in variables:
+                model.Add(variables[key] == 1)
+                return
+            work = derived.work(staff_id, day)
+            if work is not None:
+                model.Add(work == 0)
+
+        for staff in staff_list:
+            staff_id = staff["id"]
+            tail = previous_month_tail.get(staff_id, [])
+            if not tail:
+                continue
+
+            if tail[-1] == "夜勤":
+                force_rest(staff_id, 1, "明け休み")
+                force_rest(staff_id, 2, "休")
+            elif tail[-1] == "明け休み" and len(tail) >= 2 and tail[-2] == "夜勤":
+                force_rest(staff_id, 1, "休")
+
+            early_key = (staff_id, 1, "早番")
+            if tail[-1] == "遅番" and early_key in variables:
+                model.Add(variables[early_key] == 0)
+
+            run = 0
+            for st in reversed(tail):
+                if st not in WORK_SHIFT_TYPES:
+                    break
+                run += 1
+            if run == 0:
+                continue
+            max_consec = staff["maxConsecutiveWorkDays"]
+            span = min(max(1, max_consec - run + 1), days_in_month)
+            work_days = derived.work_window(staff_id, 1, span + 1)
+            # 期間内に勤務不可の日があれば自動的に充足
+            if len(work_days) == span:
+                model.Add(cp_model.LinearExpr.Sum(work_days) <= span - 1)
+
+    @staticmethod
+    def _add_weekly_work_count(
+        model: cp_model.CpModel,
+        derived: DerivedVariables,
         staff_list: list[StaffDict],
         days_in_month: int,
         fixed_rest: dict[str, set[int]],
@@ -487,21 +1024,17 @@ class UnifiedConstraintBuilder:
             workable_days = days_in_month - len(fixed)
             target_max = min(int(must * total_weeks + 2), workable_days)
 
-            work_vars = []
-            for day in range(1, days_in_month + 1):
-                if day in fixed:
-                    continue
-                for st in SHIFT_TYPES + NIGHT_SHIFT_TYPES:
-                    key = (staff_id, day, st)
-                    if key in variables:
-                        work_vars.append(variables[key])
-
-            if work_vars:
-                model.Add(sum(work_vars) <= target_max)
+            counts = derived.work_counts(staff_id)
+            if counts:
+                model.Add(cp_model.LinearExpr.Sum(counts) <= target_max)
 
 
 class UnifiedObjectiveBuilder:
-    """統合Solver用ソフト制約（目的関数）"""
+    """統合Solver用ソフト制約（目的関数）
+
+    各ステージの項は LinearExpr.WeightedSum で一括構築し、
+    ステージあたり1つの線形式として返す（Pythonの sum() による式のネストを避ける）。
+    """
 
     @staticmethod
     def add_all(
@@ -512,61 +1045,98 @@ class UnifiedObjectiveBuilder:
         days_in_month: int,
         is_night_facility: bool,
         fixed_rest: dict[str, set[int]],
-    ) -> None:
-        terms: list = []
-        UnifiedObjectiveBuilder._add_preference_bonus(
-            model, variables, staff_list, terms
-        )
-        UnifiedObjectiveBuilder._add_fairness(
-            model, variables, staff_list, days_in_month, terms
-        )
+        derived: DerivedVariables | None = None,
+        coverage: list | None = None,
+    ) -> dict[str, list]:
+        """全ソフト制約を重み付き和で目的関数に設定し、ステージ別の項を返す
+
+        返り値 {ステージ名: 項リスト} は辞書式（lexicographic）モードで使用する。
+        coverage（UnifiedConstraintBuilder.add_all が集めた不足スラック）を渡すと
+        先頭にステージ "coverage"（不足人数 × COVERAGE_SHORTAGE_WEIGHT の減点）を加える。
+        """
+        if derived is None:
+            derived = DerivedVariables(model, variables, staff_list, days_in_month)
+        stage_order = OBJECTIVE_STAGE_ORDER
+        if coverage is not None:
+            stage_order = [COVERAGE_STAGE] + OBJECTIVE_STAGE_ORDER
+        stages: dict[str, list] = {name: [] for name in stage_order}
+        if coverage:
+            slacks = [slack for _, _, slack in coverage]
+            stages[COVERAGE_STAGE].append(cp_model.LinearExpr.WeightedSum(
+                slacks, [-COVERAGE_SHORTAGE_WEIGHT] * len(slacks)
+            ))
+        with _stage_span("objective.preference", model):
+            UnifiedObjectiveBuilder._add_preference_bonus(
+                model, derived, staff_list, stages["preference"]
+            )
+        with _stage_span("objective.fairness", model):
+            UnifiedObjectiveBuilder._add_fairness(
+                model, derived, staff_list, days_in_month, stages["fairness"]
+            )
         if is_night_facility:
-            UnifiedObjectiveBuilder._add_night_shift_fairness(
-                model, variables, staff_list, days_in_month, terms
+            with _stage_span("objective.night_fairness", model):
+                UnifiedObjectiveBuilder._add_night_shift_fairness(
+                    model, derived, staff_list, days_in_month, stages["nightFairness"]
+                )
+        with _stage_span("objective.rest_spacing", model):
+            UnifiedObjectiveBuilder._add_rest_spacing(
+                model, derived, staff_list, days_in_month, stages["restSpacing"]
             )
-        UnifiedObjectiveBuilder._add_rest_spacing(
-            model, variables, staff_list, days_in_month, fixed_rest, terms
-        )
-        UnifiedObjectiveBuilder._add_work_count_target(
-            model, variables, staff_list, days_in_month, fixed_rest, terms
-        )
-        UnifiedObjectiveBuilder._add_consecutive_work_soft(
-            model, variables, staff_list, days_in_month, fixed_rest, terms
-        )
+        with _stage_span("objective.work_count", model):
+            UnifiedObjectiveBuilder._add_work_count_target(
+                model, derived, staff_list, days_in_month, stages["workCount"]
+            )
+        with _stage_span("objective.consecutive_soft", model):
+            UnifiedObjectiveBuilder._add_consecutive_work_soft(
+                model, derived, staff_list, days_in_month, stages["consecutiveSoft"]
+            )
+        terms = [t for name in stage_order for t in stages[name]]
         if terms:
-            model.Maximize(sum(terms))
+            model.Maximize(cp_model.LinearExpr.Sum(terms))
+        return stages
+
+    @staticmethod
+    def _slack_bonus(weight: int, upper: int, slack_vars: list) -> cp_model.LinearExprT:
+        """Σ weight * (upper - v) を1つの線形式で返す"""
+        return (
+            cp_model.LinearExpr.WeightedSum(slack_vars, [-weight] * len(slack_vars))
+            + weight * upper * len(slack_vars)
+        )
 
     @staticmethod
     def _add_preference_bonus(
         model: cp_model.CpModel,
-        variables: dict,
+        derived: DerivedVariables,
         staff_list: list[StaffDict],
         terms: list,
     ) -> None:
         """timeSlotPreference適合ボーナス（重み: 10）
 
         日勤のみ希望のスタッフは変数生成時にハード制約化済みだが、
-        追加のボーナスで安定化する。
+        追加のボーナスで安定化する（日勤回数 × 重み）。
         """
         weight = 10
+        counts = []
         for staff in staff_list:
-            staff_id = staff["id"]
-            pref = staff["timeSlotPreference"]
-            if pref == "日勤のみ":
-                for (sid, day, st), var in variables.items():
-                    if sid == staff_id and st == "日勤":
-                        terms.append(weight * var)
+            if staff["timeSlotPreference"] != "日勤のみ":
+                continue
+            count = derived.count(staff["id"], "日勤")
+            if count is not None:
+                counts.append(count)
+        if counts:
+            terms.append(cp_model.LinearExpr.WeightedSum(counts, [weight] * len(counts)))
 
     @staticmethod
     def _add_fairness(
         model: cp_model.CpModel,
-        variables: dict,
+        derived: DerivedVariables,
         staff_list: list[StaffDict],
         days_in_month: int,
         terms: list,
     ) -> None:
         """シフト種類の均等配分（重み: 5）"""
         weight = 5
+        diffs = []
         for staff in staff_list:
             staff_id = staff["id"]
             if staff["timeSlotPreference"] == "日勤のみ":
@@ -574,15 +1144,11 @@ class UnifiedObjectiveBuilder:
             if staff["timeSlotPreference"] == "夜勤のみ" or staff.get("isNightShiftOnly", False):
                 continue
 
-            shift_counts: dict[str, list] = {}
+            shift_counts: dict[str, cp_model.IntVar] = {}
             for shift_type in SHIFT_TYPES:
-                count_vars = [
-                    variables[(staff_id, day, shift_type)]
-                    for day in range(1, days_in_month + 1)
-                    if (staff_id, day, shift_type) in variables
-                ]
-                if count_vars:
-                    shift_counts[shift_type] = count_vars
+                count = derived.count(staff_id, shift_type)
+                if count is not None:
+                    shift_counts[shift_type] = count
 
             if len(shift_counts) < 2:
                 continue
@@ -590,20 +1156,22 @@ class UnifiedObjectiveBuilder:
             types_list = list(shift_counts.keys())
             for i in range(len(types_list)):
                 for j in range(i + 1, len(types_list)):
-                    c_i = sum(shift_counts[types_list[i]])
-                    c_j = sum(shift_counts[types_list[j]])
+                    c_i = shift_counts[types_list[i]]
+                    c_j = shift_counts[types_list[j]]
                     diff = model.NewIntVar(
                         0, days_in_month,
                         f"udiff_{staff_id}_{types_list[i]}_{types_list[j]}",
                     )
                     model.Add(diff >= c_i - c_j)
                     model.Add(diff >= c_j - c_i)
-                    terms.append(weight * (days_in_month - diff))
+                    diffs.append(diff)
+        if diffs:
+            terms.append(UnifiedObjectiveBuilder._slack_bonus(weight, days_in_month, diffs))
 
     @staticmethod
     def _add_night_shift_fairness(
         model: cp_model.CpModel,
-        variables: dict,
+        derived: DerivedVariables,
         staff_list: list[StaffDict],
         days_in_month: int,
         terms: list,
@@ -613,74 +1181,60 @@ class UnifiedObjectiveBuilder:
         夜勤可能スタッフ間で夜勤回数の差を最小化。
         """
         weight = 8
-        night_eligible: list[tuple[str, list]] = []
+        night_eligible: list[tuple[str, cp_model.IntVar]] = []
         for staff in staff_list:
             if staff["timeSlotPreference"] == "日勤のみ":
                 continue
             staff_id = staff["id"]
-            night_vars = [
-                variables[(staff_id, day, "夜勤")]
-                for day in range(1, days_in_month + 1)
-                if (staff_id, day, "夜勤") in variables
-            ]
-            if night_vars:
-                night_eligible.append((staff_id, night_vars))
+            night_count = derived.count(staff_id, "夜勤")
+            if night_count is not None:
+                night_eligible.append((staff_id, night_count))
 
+        diffs = []
         for i in range(len(night_eligible)):
             for j in range(i + 1, len(night_eligible)):
-                sid_i, vars_i = night_eligible[i]
-                sid_j, vars_j = night_eligible[j]
+                sid_i, count_i = night_eligible[i]
+                sid_j, count_j = night_eligible[j]
                 diff = model.NewIntVar(
                     0, days_in_month,
                     f"ndiff_{sid_i}_{sid_j}",
                 )
-                model.Add(diff >= sum(vars_i) - sum(vars_j))
-                model.Add(diff >= sum(vars_j) - sum(vars_i))
-                terms.append(weight * (days_in_month - diff))
+                model.Add(diff >= count_i - count_j)
+                model.Add(diff >= count_j - count_i)
+                diffs.append(diff)
+        if diffs:
+            terms.append(UnifiedObjectiveBuilder._slack_bonus(weight, days_in_month, diffs))
 
     @staticmethod
     def _add_rest_spacing(
         model: cp_model.CpModel,
-        variables: dict,
+        derived: DerivedVariables,
         staff_list: list[StaffDict],
         days_in_month: int,
-        fixed_rest: dict[str, set[int]],
         terms: list,
     ) -> None:
         """休日分散ボーナス（重み: 3）
 
-        週ごとに休日がある → ボーナス。
-        AddMaxEqualityの大量生成を避けた軽量版。
+        週ごと（7日の非重複ウィンドウ）の休日数にボーナス。
+        ウィンドウは月の各日をちょうど1回覆うため、合計は月間休日数
+        = 日数 - 勤務系シフト回数の和 となり、回数IntVarから一括で構築する。
         """
         weight = 3
+        counts = []
         for staff in staff_list:
-            staff_id = staff["id"]
-            fixed = fixed_rest[staff_id]
-
-            # 7日ウィンドウ（非重複）で休日をカウント
-            for week_start in range(1, days_in_month + 1, 7):
-                week_end = min(week_start + 7, days_in_month + 1)
-                rest_count = []
-                for d in range(week_start, week_end):
-                    if d in fixed:
-                        rest_count.append(1)  # 定数
-                    else:
-                        rest_key = (staff_id, d, "休")
-                        followup_key = (staff_id, d, "明け休み")
-                        if rest_key in variables:
-                            rest_count.append(variables[rest_key])
-                        if followup_key in variables:
-                            rest_count.append(variables[followup_key])
-                if rest_count:
-                    terms.append(weight * sum(rest_count))
+            counts.extend(derived.work_counts(staff["id"]))
+        if counts:
+            terms.append(
+                cp_model.LinearExpr.WeightedSum(counts, [-weight] * len(counts))
+                + weight * days_in_month * len(staff_list)
+            )
 
     @staticmethod
     def _add_work_count_target(
         model: cp_model.CpModel,
-        variables: dict,
+        derived: DerivedVariables,
         staff_list: list[StaffDict],
         days_in_month: int,
-        fixed_rest: dict[str, set[int]],
         terms: list,
     ) -> None:
         """月間勤務日数の目標近接ボーナス（重み: 7）
@@ -690,41 +1244,34 @@ class UnifiedObjectiveBuilder:
         """
         weight = 7
         total_weeks = days_in_month / 7.0
+        diffs = []
 
         for staff in staff_list:
             staff_id = staff["id"]
             must = staff["weeklyWorkCount"]["must"]
-            fixed = fixed_rest[staff_id]
             target = int(must * total_weeks)
 
-            work_vars = []
-            for day in range(1, days_in_month + 1):
-                if day in fixed:
-                    continue
-                for st in SHIFT_TYPES + NIGHT_SHIFT_TYPES:
-                    key = (staff_id, day, st)
-                    if key in variables:
-                        work_vars.append(variables[key])
-
-            if not work_vars:
+            counts = derived.work_counts(staff_id)
+            if not counts:
                 continue
 
             diff = model.NewIntVar(
                 0, days_in_month,
                 f"wdiff_{staff_id}",
             )
-            total_work = sum(work_vars)
+            total_work = cp_model.LinearExpr.Sum(counts)
             model.Add(diff >= total_work - target)
             model.Add(diff >= target - total_work)
-            terms.append(weight * (days_in_month - diff))
+            diffs.append(diff)
+        if diffs:
+            terms.append(UnifiedObjectiveBuilder._slack_bonus(weight, days_in_month, diffs))
 
     @staticmethod
     def _add_consecutive_work_soft(
         model: cp_model.CpModel,
-        variables: dict,
+        derived: DerivedVariables,
         staff_list: list[StaffDict],
         days_in_month: int,
-        fixed_rest: dict[str, set[int]],
         terms: list,
     ) -> None:
         """連勤最小化ソフト制約（重み: 4）
@@ -734,25 +1281,20 @@ class UnifiedObjectiveBuilder:
         余裕がある場合は Solver が連勤を分散させ、上限ギリギリの連勤を回避する。
 
         BoolVar exceeded = 1 iff ウィンドウ内勤務数 > soft_limit
-        目的: terms に weight * (1 - exceeded) を追加（超過しないほどボーナス）
+        目的: weight * (1 - exceeded) の和（超過しないほどボーナス）
         """
         weight = 4
+        exceeded_vars = []
         for staff in staff_list:
             staff_id = staff["id"]
             max_consec = staff["maxConsecutiveWorkDays"]
             soft_limit = max_consec - 1
             window_size = soft_limit + 1  # = max_consec
-            fixed = fixed_rest[staff_id]
 
             for start in range(1, days_in_month - window_size + 2):
-                work_in_window = []
-                for d in range(start, min(start + window_size, days_in_month + 1)):
-                    if d in fixed:
-                        continue
-                    for st in SHIFT_TYPES + NIGHT_SHIFT_TYPES:
-                        key = (staff_id, d, st)
-                        if key in variables:
-                            work_in_window.append(variables[key])
+                work_in_window = derived.work_window(
+                    staff_id, start, min(start + window_size, days_in_month + 1)
+                )
 
                 if len(work_in_window) <= soft_limit:
                     continue  # この窓では超過不可 → BoolVar不要
@@ -760,10 +1302,9 @@ class UnifiedObjectiveBuilder:
                 exceeded = model.NewBoolVar(
                     f"consec_soft_exceeded_{staff_id}_{start}"
                 )
-                model.Add(
-                    sum(work_in_window) >= soft_limit + 1
-                ).OnlyEnforceIf(exceeded)
-                model.Add(
-                    sum(work_in_window) <= soft_limit
-                ).OnlyEnforceIf(exceeded.Not())
-                terms.append(weight * (1 - exceeded))
+                window_work = cp_model.LinearExpr.Sum(work_in_window)
+                model.Add(window_work >= soft_limit + 1).OnlyEnforceIf(exceeded)
+                model.Add(window_work <= soft_limit).OnlyEnforceIf(exceeded.Not())
+                exceeded_vars.append(exceeded)
+        if exceeded_vars:
+            terms.append(UnifiedObjectiveBuilder._slack_bonus(weight, 1, exceeded_vars))
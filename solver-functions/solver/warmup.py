@@ -0,0 +1,77 @@
+"""
+インスタンス起動時のウォームアップ
+
+スケールアウト直後の初回リクエストが遅くなるのを防ぐため、
+ortools と両パイプラインを読み込み、極小モデルを1回ずつ構築・求解する。
+
+main.py で環境変数 SOLVER_WARMUP=1 のときにモジュール読み込み時に実行する。
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_WARMUP_MONTH = "2026-01"
+
+
+def _tiny_staff(staff_id: str) -> dict:
+    return {
+        "id": staff_id,
+        "name": staff_id,
+        "role": "介護職員",
+        "qualifications": [],
+        "weeklyWorkCount": {"hope": 5, "must": 5},
+        "maxConsecutiveWorkDays": 6,
+        "availableWeekdays": [0, 1, 2, 3, 4, 5, 6],
+        "timeSlotPreference": "いつでも可",
+        "isNightShiftOnly": False,
+        "unavailableDates": [],
+    }
+
+
+def _tiny_requirements() -> dict:
+    """月初3日間だけ稼働する極小要件（夜勤は明け休み・休が収まる1-2日目のみ）"""
+    req = {"totalStaff": 1, "requiredQualifications": [], "requiredRoles": []}
+    requirements = {f"{_WARMUP_MONTH}-{day:02d}_日勤": req for day in range(1, 4)}
+    requirements.update({f"{_WARMUP_MONTH}-{day:02d}_夜勤": req for day in range(1, 3)})
+    return {
+        "targetMonth": _WARMUP_MONTH,
+        "timeSlots": [],
+        "requirements": requirements,
+    }
+
+
+def warm_up() -> dict[str, int]:
+    """両パイプラインで極小モデルを求解し、各所要時間(ms)を返す"""
+    timings: dict[str, int] = {}
+
+    start = time.time()
+    from solver.service import SolverService, UnifiedSolverService
+    timings["importMs"] = int((time.time() - start) * 1000)
+
+    staff = [_tiny_staff(f"warmup{i}") for i in range(1, 5)]
+    requirements = _tiny_requirements()
+
+    start = time.time()
+    UnifiedSolverService.solve(staff, requirements, {})
+    timings["unifiedMs"] = int((time.time() - start) * 1000)
+
+    skeleton = {
+        "staffSchedules": [
+            {
+                "staffId": s["id"],
+                "staffName": s["name"],
+                "restDays": list(range(4, 32)),  # 非稼働日は休
+                "nightShiftDays": [],
+                "nightShiftFollowupDays": [],
+            }
+            for s in staff
+        ]
+    }
+    start = time.time()
+    SolverService.solve(staff, skeleton, requirements, {})
+    timings["skeletonMs"] = int((time.time() - start) * 1000)
+
+    logger.info("solver warm-up finished: %s", timings)
+    return timings
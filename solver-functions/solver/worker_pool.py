@@ -0,0 +1,191 @@
+"""
+求解ワーカープール: ローカルFlask版（solver/main.py）のプロセスプール実行モード
+
+オンプレミス運用で月末に求解リクエストが集中すると、インライン実行ではリクエストスレッドが
+1件の長い求解に占有され、後続がすべてその後ろに詰まる。プールモードでは:
+  - 起動時にワーカープロセスを事前起動し、ortools・サービスを読み込み済みにする（spawn）
+  - 実行中＋待機中の件数を workers + queue_size に制限し、超過分は即座に拒否（429）
+  - リクエストごとの期限（deadline）を過ぎたら待機をやめて 503（待機中なら取り消し、
+    期限後にワーカーへ渡ったものは求解せずに捨てる）
+  - キュー深さ・待ち時間を統計として公開（各レスポンスの solverStats と GET /solverPoolStats）
+
+環境変数 SOLVER_POOL_WORKERS が1以上のときだけ有効（未設定ならインライン実行）。
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from solver import tracing
+
+
+class PoolSaturatedError(Exception):
+    """実行中＋待機中が上限に達している（429）"""
+
+
+class PoolDeadlineError(Exception):
+    """期限内に求解が終わらなかった、またはプールが使えない（503）"""
+
+
+def _env_workers() -> int:
+    return int(os.environ.get("SOLVER_POOL_WORKERS", "0"))
+
+
+def _init_worker() -> None:
+    """ワーカー起動時: ortools とサービスを読み込んでおく（初回リクエストの遅延を避ける）"""
+    import solver.service  # noqa: F401
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _execute(
+    fn: Callable[..., dict], kwargs: dict, deadline_at: float, traceparent: str | None = None
+) -> tuple[float, dict | None]:
+    """ワーカー側: (開始時刻, 結果)。期限切れで受け取ったジョブは求解しない（結果 None）
+
+    traceparent で呼び出し元のスパンを親にし、ワーカー内のスパンを同じトレースに載せる。
+    """
+    started_at = time.time()
+    if started_at > deadline_at:
+        return started_at, None
+    with tracing.start_trace("worker.execute", traceparent, **{"solver.task": fn.__qualname__}):
+        return started_at, fn(**kwargs)
+
+
+class SolverPool:
+    """求解用プロセスプール（有界キュー・期限・統計付き）"""
+
+    def __init__(self, workers: int, queue_size: int, deadline_sec: float) -> None:
+        self.workers = workers
+        self.queue_size = queue_size
+        self.deadline_sec = deadline_sec
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._deadline_exceeded = 0
+        self._wait_total_ms = 0
+        self._wait_max_ms = 0
+        self._wait_last_ms = 0
+
+        # 事前起動: ワーカー数ぶんのジョブを同時に投げて全プロセスを立ち上げる
+        ready = [self._executor.submit(_ready) for _ in range(workers)]
+        for future in ready:
+            future.result()
+
+    @classmethod
+    def from_env(cls) -> "SolverPool | None":
+        """SOLVER_POOL_WORKERS / SOLVER_POOL_QUEUE_SIZE / SOLVER_POOL_DEADLINE_SEC から生成"""
+        workers = _env_workers()
+        if workers <= 0:
+            return None
+        queue_size = int(os.environ.get("SOLVER_POOL_QUEUE_SIZE", str(workers * 2)))
+        deadline_sec = float(os.environ.get("SOLVER_POOL_DEADLINE_SEC", "60"))
+        return cls(workers, queue_size, deadline_sec)
+
+    @staticmethod
+    def enabled_in_env() -> bool:
+        """SOLVER_POOL_WORKERS でプールが有効か（プールは生成しない）"""
+        return _env_workers() > 0
+
+    def run(
+        self, fn: Callable[..., dict], kwargs: dict, deadline_sec: float | None = None
+    ) -> dict:
+        """fn(**kwargs) をワーカーで実行して結果を返す
+
+        fn はモジュールレベルから参照できる関数（サービスの静的メソッド等、pickle可能なもの）。
+        上限超過は PoolSaturatedError、期限切れ・プール停止は PoolDeadlineError。
+        成功時、結果の solverStats に queueWaitMs・queueDepth を追加する。
+        """
+        deadline_sec = self.deadline_sec if deadline_sec is None else deadline_sec
+        submitted_at = time.time()
+        deadline_at = submitted_at + deadline_sec
+
+        with self._lock:
+            if self._in_flight >= self.workers + self.queue_size:
+                self._rejected += 1
+                raise PoolSaturatedError(
+                    f"求解キューが満杯です（実行中・待機中{self._in_flight}件）"
+                )
+            queue_depth = max(0, self._in_flight - self.workers)
+            self._in_flight += 1
+
+        try:
+            future = self._executor.submit(
+                _execute, fn, kwargs, deadline_at, tracing.current_traceparent()
+            )
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._finish()
+            raise PoolDeadlineError(f"求解ワーカーが利用できません: {e}") from e
+        future.add_done_callback(lambda f: self._on_done(f, submitted_at))
+
+        try:
+            started_at, result = future.result(timeout=deadline_sec)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self._deadline_exceeded += 1
+            raise PoolDeadlineError(f"期限{deadline_sec}秒以内に求解が完了しませんでした")
+        except BrokenProcessPool as e:
+            raise PoolDeadlineError(f"求解ワーカーが停止しました: {e}") from e
+
+        if result is None:
+            with self._lock:
+                self._deadline_exceeded += 1
+            raise PoolDeadlineError(f"期限{deadline_sec}秒を待機中に超過しました")
+        if "solverStats" in result:
+            result["solverStats"]["queueWaitMs"] = int((started_at - submitted_at) * 1000)
+            result["solverStats"]["queueDepth"] = queue_depth
+        return result
+
+    def _on_done(self, future: Future, submitted_at: float) -> None:
+        """完了・取り消し時に件数と待ち時間を更新（期限切れで呼び出し元が去った後も呼ばれる）"""
+        wait_ms = None
+        if not future.cancelled() and future.exception() is None:
+            started_at, result = future.result()
+            if result is not None:
+                wait_ms = int((started_at - submitted_at) * 1000)
+        self._finish(wait_ms)
+
+    def _finish(self, wait_ms: int | None = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if wait_ms is None:
+                return
+            self._completed += 1
+            self._wait_total_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+            self._wait_last_ms = wait_ms
+
+    def stats(self) -> dict:
+        """キュー深さ・待ち時間などの統計"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queueCapacity": self.queue_size,
+                "inFlight": self._in_flight,
+                "queueDepth": max(0, self._in_flight - self.workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "deadlineExceeded": self._deadline_exceeded,
+                "waitTimeMs": {
+                    "last": self._wait_last_ms,
+                    "max": self._wait_max_ms,
+                    "avg": self._wait_total_ms // self._completed if self._completed else 0,
+                },
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
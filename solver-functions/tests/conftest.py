@@ -11,6 +11,13 @@ from solver.types import (
 )
 
 
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: 時間のかかるテスト（-m 'not slow' で除外できる）")
+    config.addinivalue_line(
+        "markers", "benchmark: 壁時計の計測（SOLVER_BENCHMARK=1 のときのみ実行）",
+    )
+
+
 def make_staff(
     staff_id: str,
     name: str,
@@ -0,0 +1,102 @@
+"""コールドスタート計測: import時間プロファイルと遅延importの検証
+
+- main.py の読み込みで ortools・各パイプラインが読み込まれないこと
+- solver.service の読み込みでビルダーモジュールが読み込まれないこと
+- -X importtime による上位モジュールの累積import時間を出力
+- ウォームアップが両パイプラインで成功すること
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+SOLVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code: str, *args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env.pop("SOLVER_WARMUP", None)
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=SOLVER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _import_profile(module: str) -> list[tuple[int, str]]:
+    """-X importtime の出力から (累積μs, モジュール名) を抽出"""
+    result = _run(f"import {module}", "-X", "importtime")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+class TestLazyImports:
+
+    def test_main_does_not_import_ortools(self):
+        """main.py 読み込み時点では ortools を読み込まない（OPTIONS応答の高速化）"""
+        pytest.importorskip("firebase_functions")
+        result = _run(
+            "import sys, main; "
+            "print('ortools' in sys.modules, 'solver.service' in sys.modules)"
+        )
+        assert result.stdout.split() == ["False", "False"]
+
+    def test_service_does_not_import_builders(self):
+        """solver.service はビルダーモジュールを遅延importする"""
+        result = _run(
+            "import sys, solver.service; "
+            "print(sorted(m for m in sys.modules if m in ("
+            "'solver.skeleton_validation', 'solver.unified_builder')))"
+        )
+        assert result.stdout.strip() == "[]"
+
+
+class TestImportTimeProfile:
+
+    def test_import_time_profile(self):
+        """エントリポイント・各パイプラインのimport時間プロファイル"""
+        targets = ["solver.service", "solver.unified_builder", "solver.skeleton_validation"]
+        try:
+            import firebase_functions  # noqa: F401
+            targets.insert(0, "main")
+        except ImportError:
+            pass
+
+        print("\n" + "=" * 60)
+        print("  import時間プロファイル（累積ms, 上位5件）")
+        print("=" * 60)
+        for target in targets:
+            rows = _import_profile(target)
+            top = sorted(rows, reverse=True)[:5]
+            assert top, f"{target}: importtime出力なし"
+            print(f"  [{target}]")
+            for cumulative, name in top:
+                print(f"    {cumulative / 1000:8.1f}ms  {name}")
+        print("=" * 60)
+
+
+class TestWarmUp:
+
+    def test_warm_up_solves_both_pipelines(self):
+        """ウォームアップが両パイプラインの極小モデルを求解する"""
+        from solver.service import UnifiedSolverService
+        from solver.warmup import _tiny_requirements, _tiny_staff, warm_up
+
+        timings = warm_up()
+        assert set(timings) == {"importMs", "unifiedMs", "skeletonMs"}
+
+        staff = [_tiny_staff(f"w{i}") for i in range(1, 5)]
+        result = UnifiedSolverService.solve(staff, _tiny_requirements(), {})
+        assert result["success"] is True
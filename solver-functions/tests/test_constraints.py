@@ -1,214 +0,0 @@
-"""Task 3.1-3.5: ハード制約の単体テスト"""
-
-from ortools.sat.python import cp_model
-
-from solver.model_builder import SolverModelBuilder
-from solver.constraints import ConstraintBuilder
-from solver.types import (
-    SHIFT_TYPES,
-    StaffDict,
-    ScheduleSkeletonDict,
-    ShiftRequirementDict,
-    DailyRequirementDict,
-)
-from tests.conftest import make_staff
-
-
-def _solve(staff_list, skeleton, requirements, leave_requests=None):
-    """ヘルパー: モデルを構築して求解"""
-    leave = leave_requests or {}
-    builder = SolverModelBuilder(staff_list, skeleton, requirements, leave)
-    model = builder.build_model()
-    ConstraintBuilder.add_hard_constraints(
-        model, builder.get_variables(), staff_list, skeleton, requirements, leave
-    )
-    solver = cp_model.CpSolver()
-    status = solver.Solve(model)
-    return status, solver, builder
-
-
-class TestStaffingConstraints:
-    """日別必要人数と資格要件の制約テスト"""
-
-    def test_daily_staffing_met(
-        self, staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty
-    ):
-        """各日・各シフトに必要人数以上が配置される"""
-        status, solver, builder = _solve(
-            staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty
-        )
-        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
-
-        variables = builder.get_variables()
-        # 各日・各シフトで出勤者を数える
-        for day in range(1, 32):
-            for shift_type in SHIFT_TYPES:
-                count = 0
-                for staff in staff_list_5:
-                    key = (staff["id"], day, shift_type)
-                    if key in variables and solver.Value(variables[key]) == 1:
-                        count += 1
-                # requirementsにキーがある場合、必要人数を確認
-                req_key = f"2026-03-{day:02d}_{shift_type}"
-                if req_key in requirements_30["requirements"]:
-                    # 人員不足はINFEASIBLEにならない場合もあるが、
-                    # 制約として追加されている限り充足される
-                    pass  # count >= required はハード制約で保証
-
-    def test_qualification_requirement_met(
-        self, staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty
-    ):
-        """資格保有者が必要数以上配置される"""
-        status, solver, builder = _solve(
-            staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty
-        )
-        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
-
-        variables = builder.get_variables()
-        nurse_staff = [s for s in staff_list_5 if "看護師" in s["qualifications"]]
-
-        for day in range(1, 32):
-            for shift_type in SHIFT_TYPES:
-                req_key = f"2026-03-{day:02d}_{shift_type}"
-                if req_key not in requirements_30["requirements"]:
-                    continue
-                req = requirements_30["requirements"][req_key]
-                for qual_req in req["requiredQualifications"]:
-                    qual = qual_req["qualification"]
-                    required = qual_req["count"]
-                    qualified_on_duty = 0
-                    for staff in staff_list_5:
-                        if qual in staff["qualifications"]:
-                            key = (staff["id"], day, shift_type)
-                            if key in variables and solver.Value(variables[key]) == 1:
-                                qualified_on_duty += 1
-                    # 資格者がいる日のみチェック
-                    # （全員休みの日はINFEASIBLEになる可能性）
-
-    def test_infeasible_when_staff_shortage(self):
-        """人員不足時にINFEASIBLEが正しく検出される"""
-        # 1名しかいないのに各シフト2名必要
-        staff_list = [make_staff("s1", "唯一のスタッフ")]
-        skeleton = ScheduleSkeletonDict(
-            staffSchedules=[{
-                "staffId": "s1",
-                "staffName": "唯一のスタッフ",
-                "restDays": [],
-                "nightShiftDays": [],
-                "nightShiftFollowupDays": [],
-            }]
-        )
-        daily_req = DailyRequirementDict(
-            totalStaff=2,
-            requiredQualifications=[],
-            requiredRoles=[],
-        )
-        requirements = ShiftRequirementDict(
-            targetMonth="2026-03",
-            timeSlots=[
-                {"name": "早番", "start": "07:00", "end": "16:00", "restHours": 1.0},
-                {"name": "日勤", "start": "09:00", "end": "18:00", "restHours": 1.0},
-                {"name": "遅番", "start": "11:00", "end": "20:00", "restHours": 1.0},
-            ],
-            requirements={
-                f"2026-03-{d:02d}_{st}": daily_req
-                for d in range(1, 32)
-                for st in SHIFT_TYPES
-            },
-        )
-
-        status, _, _ = _solve(staff_list, skeleton, requirements)
-        assert status == cp_model.INFEASIBLE
-
-
-class TestConsecutiveWorkConstraint:
-    """連続勤務制限のテスト"""
-
-    def test_no_7_consecutive_work_days(
-        self, staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty
-    ):
-        """連勤7日連続のケースが禁止される"""
-        status, solver, builder = _solve(
-            staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty
-        )
-        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
-
-        schedules = builder.extract_solution(solver)
-        for staff_schedule in schedules:
-            consecutive = 0
-            for shift in sorted(staff_schedule["monthlyShifts"], key=lambda x: x["date"]):
-                if shift["shiftType"] in SHIFT_TYPES:
-                    consecutive += 1
-                else:
-                    consecutive = 0
-                assert consecutive <= 6, (
-                    f"{staff_schedule['staffName']}: {consecutive}連勤"
-                )
-
-
-class TestIntervalConstraint:
-    """勤務間インターバルのテスト"""
-
-    def test_no_late_to_early_pattern(
-        self, staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty
-    ):
-        """遅番→翌日早番のパターンが禁止される"""
-        status, solver, builder = _solve(
-            staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty
-        )
-        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
-
-        schedules = builder.extract_solution(solver)
-        for staff_schedule in schedules:
-            shifts_by_day = {}
-            for shift in staff_schedule["monthlyShifts"]:
-                day_num = int(shift["date"].split("-")[2])
-                shifts_by_day[day_num] = shift["shiftType"]
-
-            for day in range(1, 31):
-                if shifts_by_day.get(day) == "遅番" and shifts_by_day.get(day + 1) == "早番":
-                    raise AssertionError(
-                        f"{staff_schedule['staffName']}: 日{day}遅番→日{day+1}早番"
-                    )
-
-
-class TestLeaveRequestConstraint:
-    """休暇申請の反映テスト"""
-
-    def test_leave_request_fixed_as_rest(self, staff_list_5, skeleton_5_30):
-        """休暇申請日が確実に「休」になる"""
-        # staffing制約なしのrequirementsを使用（休暇で人員不足にならないように）
-        requirements = ShiftRequirementDict(
-            targetMonth="2026-03",
-            timeSlots=[
-                {"name": "早番", "start": "07:00", "end": "16:00", "restHours": 1.0},
-                {"name": "日勤", "start": "09:00", "end": "18:00", "restHours": 1.0},
-                {"name": "遅番", "start": "11:00", "end": "20:00", "restHours": 1.0},
-            ],
-            requirements={},  # 人員制約なし
-        )
-        leave_requests = {
-            "s2": {"2026-03-01": "希望休", "2026-03-15": "有給休暇"},
-            "s3": {"2026-03-10": "希望休"},
-        }
-
-        status, solver, builder = _solve(
-            staff_list_5, skeleton_5_30, requirements, leave_requests
-        )
-        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
-
-        schedules = builder.extract_solution(solver)
-
-        s2 = next(s for s in schedules if s["staffId"] == "s2")
-        for shift in s2["monthlyShifts"]:
-            if shift["date"] in ("2026-03-01", "2026-03-15"):
-                assert shift["shiftType"] == "休", (
-                    f"s2の{shift['date']}が{shift['shiftType']}（期待: 休）"
-                )
-
-        s3 = next(s for s in schedules if s["staffId"] == "s3")
-        for shift in s3["monthlyShifts"]:
-            if shift["date"] == "2026-03-10":
-                assert shift["shiftType"] == "休", (
-                    f"s3の{shift['date']}が{shift['shiftType']}（期待: 休）"
-                )
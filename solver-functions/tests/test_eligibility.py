@@ -0,0 +1,174 @@
+"""配置可能性のビットセット（solver.eligibility）と役職要件のテスト"""
+
+import copy
+
+from solver.eligibility import ROLE, QUALIFICATION, ShiftSlots, StaffEligibility, iter_bits
+from solver.presolve import presolve
+from solver.service import UnifiedSolverService
+from solver.skeleton_validation import validate_skeleton
+from solver.types import DailyRequirementDict
+from solver.unified_builder import UnifiedModelBuilder
+from tests.conftest import make_staff
+
+_MONTH = "2026-03"
+
+
+def _req(total=1, quals=None, roles=None) -> DailyRequirementDict:
+    return DailyRequirementDict(
+        totalStaff=total, requiredQualifications=quals or [], requiredRoles=roles or [],
+    )
+
+
+def _with_role_requirement(requirements_30, role="看護職員", count=1, shift_type="日勤"):
+    reqs = copy.deepcopy(requirements_30)
+    for key in reqs["requirements"]:
+        if key.endswith(f"_{shift_type}"):
+            reqs["requirements"][key] = _req(roles=[{"role": role, "count": count}])
+    return reqs
+
+
+class TestBitsets:
+
+    def test_iter_bits(self):
+        assert list(iter_bits(0)) == []
+        assert list(iter_bits(0b101001)) == [0, 3, 5]
+
+    def test_staff_masks(self, staff_list_5):
+        eligibility = StaffEligibility(staff_list_5)
+        assert eligibility.mask(QUALIFICATION, "介護福祉士") == 0b00110
+        assert eligibility.mask(ROLE, "看護職員") == 0b00001
+        assert eligibility.mask(ROLE, "介護職員") == 0b11110
+        assert eligibility.mask(ROLE, "ケアマネージャー") == 0
+        groups = eligibility.requirement_groups(_req(
+            quals=[{"qualification": "看護師", "count": 1}],
+            roles=[{"role": "介護職員", "count": 2}],
+        ))
+        assert groups == [(QUALIFICATION, "看護師", 0b1, 1), (ROLE, "介護職員", 0b11110, 2)]
+
+    def test_shift_slots_select(self, staff_list_5):
+        eligibility = StaffEligibility(staff_list_5)
+        variables = {
+            ("s4", 1, "日勤"): "v4", ("s2", 1, "日勤"): "v2", ("s1", 1, "日勤"): "v1",
+            ("s1", 1, "休"): "rest", ("s3", 2, "日勤"): "v3",
+        }
+        slots = ShiftSlots(variables, eligibility.positions)
+        # staff_list 順
+        assert slots.select(1, "日勤") == ["v1", "v2", "v4"]
+        assert slots.select(1, "日勤", eligibility.mask(ROLE, "介護職員")) == ["v2", "v4"]
+        assert slots.select(1, "休") == []
+        assert slots.mask(2, "日勤") == 0b00100
+
+
+class TestSharedEligibility:
+
+    def _grouped_requirements(self, requirements_30):
+        reqs = copy.deepcopy(requirements_30)
+        grouped = _req(
+            quals=[{"qualification": "看護師", "count": 1},
+                   {"qualification": "介護福祉士", "count": 1}],
+            roles=[{"role": "看護職員", "count": 1}, {"role": "介護職員", "count": 1}],
+        )
+        reqs["requirements"] = {key: grouped for key in reqs["requirements"]}
+        return reqs
+
+    def test_built_once_per_model(self, staff_list_5, requirements_30, monkeypatch):
+        """日×シフト×要件の数によらず、マスク・スロット表はモデルごとに1回だけ作る"""
+        counts = {"eligibility": 0, "slots": 0, "masks": None}
+        real_eligibility, real_slots = StaffEligibility.__init__, ShiftSlots.__init__
+
+        def eligibility_init(self, staff_list):
+            counts["eligibility"] += 1
+            real_eligibility(self, staff_list)
+            counts["masks"] = len(self._masks)
+
+        def slots_init(self, *args, **kwargs):
+            counts["slots"] += 1
+            real_slots(self, *args, **kwargs)
+
+        monkeypatch.setattr(StaffEligibility, "__init__", eligibility_init)
+        monkeypatch.setattr(ShiftSlots, "__init__", slots_init)
+        UnifiedModelBuilder(
+            staff_list_5, self._grouped_requirements(requirements_30), {},
+        ).build()
+        assert counts["eligibility"] == 1
+        assert counts["slots"] == 1
+        # 資格2種（看護師・介護福祉士）＋役職2種（看護職員・介護職員）
+        assert counts["masks"] == 4
+
+    def test_group_constraints_one_per_requirement(self, staff_list_5, requirements_30):
+        """資格・役職要件は 日×シフト×要件 ごとに線形制約1本"""
+        plain = UnifiedModelBuilder(staff_list_5, requirements_30, {}, presolve=False)
+        grouped = UnifiedModelBuilder(
+            staff_list_5, self._grouped_requirements(requirements_30), {}, presolve=False,
+        )
+        n_plain = len(plain.build().Proto().constraints)
+        n_grouped = len(grouped.build().Proto().constraints)
+        assert n_grouped - n_plain == 93 * 4
+
+
+class TestRoleRequirements:
+
+    def test_role_minimum_enforced(self, staff_list_5, requirements_30):
+        """毎日の日勤に看護職員以外（介護職員）が1名以上"""
+        reqs = _with_role_requirement(requirements_30, role="介護職員")
+        result = UnifiedSolverService.solve(staff_list_5, reqs, {})
+        assert result["success"] is True
+        for day in range(31):
+            on_day_shift = [
+                s["staffId"] for s in result["schedule"]
+                if s["monthlyShifts"][day]["shiftType"] == "日勤"
+            ]
+            assert set(on_day_shift) - {"s1"}
+
+    def test_role_infeasible_in_hard_mode(self, staff_list_5, requirements_30):
+        """看護職員1名では毎日の日勤を埋められない（連勤上限）"""
+        reqs = _with_role_requirement(requirements_30)
+        result = UnifiedSolverService.solve(staff_list_5, reqs, {})
+        assert result["success"] is False
+        assert result["errorType"] == "INFEASIBLE"
+
+    def test_role_shortage_in_soft_mode(self, staff_list_5, requirements_30):
+        reqs = _with_role_requirement(requirements_30)
+        result = UnifiedSolverService.solve(staff_list_5, reqs, {}, coverage_mode="soft")
+        assert result["success"] is True
+        role_shortages = [s for s in result["shortages"] if "role" in s]
+        assert role_shortages
+        assert all(s["role"] == "看護職員" and s["shiftType"] == "日勤" for s in role_shortages)
+        # 看護職員は s1 のみ → s1 が日勤でない日が役職要件の不足
+        s1 = next(s for s in result["schedule"] if s["staffId"] == "s1")
+        s1_off = {x["date"] for x in s1["monthlyShifts"] if x["shiftType"] != "日勤"}
+        assert {s["date"] for s in role_shortages} == s1_off
+
+    def test_role_missing_warning(self, staff_list_5, requirements_30):
+        reqs = _with_role_requirement(requirements_30, role="ケアマネージャー", count=0)
+        reqs["requirements"]["2026-03-02_日勤"] = _req(
+            roles=[{"role": "ケアマネージャー", "count": 1}],
+        )
+        result = UnifiedSolverService.solve(staff_list_5, reqs, {})
+        # 該当者のいない役職要件は制約を省かず実行不能にする（原因は警告で返す）
+        assert result["success"] is False
+        assert result["errorType"] == "INFEASIBLE"
+        assert [(w["date"], w["constraintType"]) for w in result["warnings"]] == [
+            ("2026-03-02", "roleMissing"),
+        ]
+
+    def test_presolve_forces_role_cover(self):
+        staff = [make_staff("s1", "A", role="ケアマネージャー"), make_staff("s2", "B")]
+        domains = {("s1", 1): ["日勤", "休"], ("s2", 1): ["日勤", "休"]}
+        reqs = {f"{_MONTH}-01_日勤": _req(1, roles=[{"role": "ケアマネージャー", "count": 1}])}
+        stats = presolve(domains, staff, reqs, _MONTH, 31)
+        assert domains[("s1", 1)] == ["日勤"]
+        assert domains[("s2", 1)] == ["日勤", "休"]
+        assert stats["presolveForcedAssignments"] == 1
+
+    def test_skeleton_validation_role_shortage(
+        self, staff_list_5, skeleton_5_30, requirements_30
+    ):
+        reqs = copy.deepcopy(requirements_30)
+        reqs["requirements"]["2026-03-02_早番"] = _req(
+            roles=[{"role": "介護職員", "count": 5}],
+        )
+        errors = validate_skeleton(staff_list_5, skeleton_5_30, reqs, {})
+        assert [e["constraintType"] for e in errors] == ["roleMissing"]
+        assert errors[0]["role"] == "介護職員"
+        assert errors[0]["requiredCount"] == 5
@@ -115,3 +115,63 @@ class TestSolverEndpoint:
         data = response.get_json()
         assert data["success"] is False
         assert data["errorType"] == "INFEASIBLE"
+
+
+class TestCompactScheduleFormat:
+    """scheduleFormat="compact" のテスト"""
+
+    def test_compact_matches_default(
+        self, staff_list_5, skeleton_5_30, requirements_30, leave_requests_empty, client
+    ):
+        """コンパクト形式を展開すると標準形式と一致"""
+        from solver.solution import compact_to_schedules
+
+        body = {
+            "staffList": staff_list_5,
+            "skeleton": skeleton_5_30,
+            "requirements": requirements_30,
+            "leaveRequests": leave_requests_empty,
+        }
+        default = client.post(
+            "/solverGenerateShift", data=json.dumps(body), content_type="application/json",
+        ).get_json()
+        body["scheduleFormat"] = "compact"
+        response = client.post(
+            "/solverGenerateShift", data=json.dumps(body), content_type="application/json",
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert "schedule" not in data
+        compact = data["compactSchedule"]
+        assert compact["startDate"] == "2026-03-01"
+        assert compact["endDate"] == "2026-03-31"
+        assert compact["legend"] == ["早番", "日勤", "遅番", "夜勤", "休", "明け休み"]
+        assert all(len(s["shifts"]) == 31 for s in compact["staffSchedules"])
+        assert compact_to_schedules(compact) == default["schedule"]
+
+    def test_unified_compact(self, requirements_30, client):
+        """統合エンドポイントでもコンパクト形式を選択できる"""
+        staff = [make_staff(f"s{i}", f"スタッフ{i}") for i in range(1, 6)]
+        body = {
+            "staffList": staff,
+            "requirements": requirements_30,
+            "scheduleFormat": "compact",
+        }
+        response = client.post(
+            "/solverUnifiedGenerate", data=json.dumps(body), content_type="application/json",
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [s["staffId"] for s in data["compactSchedule"]["staffSchedules"]] == [
+            s["id"] for s in staff
+        ]
+
+    def test_invalid_format_returns_400(self, client):
+        """未知のscheduleFormatで400エラー"""
+        body = {"staffList": [], "requirements": {}, "scheduleFormat": "xml"}
+        response = client.post(
+            "/solverUnifiedGenerate", data=json.dumps(body), content_type="application/json",
+        )
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data["errorType"] == "VALIDATION_ERROR"
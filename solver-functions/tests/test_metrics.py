@@ -0,0 +1,117 @@
+"""メトリクス（solver.metrics）のテスト"""
+
+from __future__ import annotations
+
+import copy
+
+import pytest
+
+from solver import metrics
+from solver.metrics import Counter, Histogram, Registry
+from solver.types import DailyRequirementDict
+
+
+class TestRegistry:
+
+    def test_counter_and_histogram_text_format(self):
+        registry = Registry()
+        counter = registry.register(Counter("c_total", "help c", ("status",)))
+        hist = registry.register(Histogram("h_seconds", "help h", ("size",), buckets=(0.1, 1.0)))
+        counter.inc(status="OPTIMAL")
+        counter.inc(2, status='a"b')
+        hist.observe(0.05, size="s")
+        hist.observe(0.5, size="s")
+        hist.observe(5.0, size="s")
+
+        text = registry.render()
+        assert "# TYPE c_total counter" in text
+        assert 'c_total{status="OPTIMAL"} 1' in text
+        assert 'c_total{status="a\\"b"} 2' in text
+        assert "# TYPE h_seconds histogram" in text
+        # バケットは累積
+        assert 'h_seconds_bucket{size="s",le="0.1"} 1' in text
+        assert 'h_seconds_bucket{size="s",le="1.0"} 2' in text
+        assert 'h_seconds_bucket{size="s",le="+Inf"} 3' in text
+        assert 'h_seconds_sum{size="s"} 5.55' in text
+        assert 'h_seconds_count{size="s"} 3' in text
+        assert text.endswith("\n")
+
+    def test_staff_bucket(self):
+        assert metrics.staff_bucket(5) == "1-10"
+        assert metrics.staff_bucket(30) == "11-30"
+        assert metrics.staff_bucket(100) == "51-100"
+        assert metrics.staff_bucket(500) == "201+"
+
+    def test_base_metric_is_abstract(self):
+        with pytest.raises(TypeError):
+            metrics._Metric("x", "help")
+
+
+class TestRecordResult:
+
+    def test_success_records_size_labels(self, staff_list_5, requirements_30):
+        labels = {"endpoint": "test", "staff": "1-10", "facility": "day"}
+        before = metrics.SOLVE_SECONDS.count(**labels)
+        result = {
+            "success": True,
+            "solverStats": {
+                "status": "OPTIMAL", "solveTimeMs": 120, "buildTimeMs": 30,
+                "numVariables": 400, "numConstraints": 900,
+            },
+            "warnings": [{"constraintType": "staffShortage"}] * 2,
+        }
+        request = {"staffList": staff_list_5, "requirements": requirements_30}
+        ok = metrics.REQUESTS_TOTAL.get(endpoint="test", status="OPTIMAL")
+        shortage = metrics.WARNINGS_TOTAL.get(endpoint="test", constraint_type="staffShortage")
+
+        metrics.record_result("test", request, result)
+        assert metrics.SOLVE_SECONDS.count(**labels) == before + 1
+        assert metrics.BUILD_SECONDS.count(**labels) >= 1
+        assert metrics.REQUESTS_TOTAL.get(endpoint="test", status="OPTIMAL") == ok + 1
+        assert metrics.WARNINGS_TOTAL.get(
+            endpoint="test", constraint_type="staffShortage") == shortage + 2
+        assert metrics.MODEL_VARIABLES.get(**labels) == 400
+
+    def test_failure_uses_error_type(self, staff_list_5, requirements_30):
+        reqs = copy.deepcopy(requirements_30)
+        reqs["requirements"]["2026-03-01_夜勤"] = reqs["requirements"]["2026-03-01_日勤"]
+        request = {"staffList": staff_list_5, "requirements": reqs}
+        before = metrics.SOLVE_SECONDS.count(endpoint="test", staff="1-10", facility="night")
+        metrics.record_result("test", request, {
+            "success": False, "errorType": "INFEASIBLE",
+            "details": {"status": "INFEASIBLE", "solveTimeMs": 10, "buildTimeMs": 5},
+        })
+        assert metrics.REQUESTS_TOTAL.get(endpoint="test", status="INFEASIBLE") >= 1
+        assert metrics.SOLVE_SECONDS.count(
+            endpoint="test", staff="1-10", facility="night") == before + 1
+
+
+class TestMetricsEndpoint:
+
+    def test_solve_is_exported(self, staff_list_5, requirements_30, client):
+        response = client.post("/solverUnifiedGenerate", json={
+            "staffList": staff_list_5, "requirements": requirements_30,
+        })
+        assert response.status_code == 200
+        reqs = copy.deepcopy(requirements_30)
+        # 資格者のいない要件 → 実行不能（警告も失敗した求解も計測される）
+        reqs["requirements"]["2026-03-02_日勤"] = DailyRequirementDict(
+            totalStaff=1,
+            requiredQualifications=[{"qualification": "理学療法士", "count": 1}],
+            requiredRoles=[],
+        )
+        response = client.post("/solverUnifiedGenerate", json={
+            "staffList": staff_list_5, "requirements": reqs,
+        })
+        assert response.status_code == 422
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        text = response.get_data(as_text=True)
+        assert 'solver_solve_seconds_count{endpoint="solverUnifiedGenerate",staff="1-10",facility="day"}' in text
+        assert 'solver_build_seconds_bucket{endpoint="solverUnifiedGenerate"' in text
+        assert 'solver_requests_total{endpoint="solverUnifiedGenerate",status="' in text
+        assert ('solver_warnings_total{endpoint="solverUnifiedGenerate",'
+                'constraint_type="qualificationMissing"}') in text
+        assert 'solver_model_variables{endpoint="solverUnifiedGenerate"' in text
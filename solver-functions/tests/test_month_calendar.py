@@ -0,0 +1,73 @@
+"""月カレンダー（solver.month_calendar）のテスト"""
+
+import datetime
+
+from solver.month_calendar import Calendar, get_calendar
+from solver.unified_builder import UnifiedModelBuilder
+from tests.conftest import make_staff
+
+
+class TestCalendar:
+
+    def test_weekdays_match_datetime(self):
+        """曜日配列がdatetimeのJS曜日と一致（閏年2月・12月を含む）"""
+        for target_month in ("2026-03", "2028-02", "2026-12"):
+            cal = Calendar(target_month)
+            year, month = map(int, target_month.split("-"))
+            for day in range(1, cal.days_in_month + 1):
+                expected = (datetime.date(year, month, day).weekday() + 1) % 7
+                assert cal.weekdays[day - 1] == expected
+        assert Calendar("2028-02").days_in_month == 29
+        assert Calendar("2026-12").days_in_month == 31
+
+    def test_weekday_masks_partition_month(self):
+        cal = Calendar("2026-03")
+        combined = 0
+        for mask in cal.weekday_masks:
+            assert combined & mask == 0
+            combined |= mask
+        assert combined == cal.all_days_mask
+        # 2026-03-01 は日曜
+        assert 1 in Calendar.days_of(cal.weekday_masks[0])
+
+    def test_day_for(self):
+        cal = Calendar("2026-03")
+        assert cal.day_for("2026-03-05") == 5
+        assert cal.day_for("2026-3-5") == 5
+        assert cal.day_for("2026-04-05") is None
+        assert cal.day_for("2026-03-32") is None
+        assert cal.day_for("invalid") is None
+
+    def test_mask_roundtrip(self):
+        cal = Calendar("2026-03")
+        mask = cal.mask_for_dates(["2026-03-01", "2026-03-31", "2026-02-10"])
+        assert Calendar.days_of(mask) == {1, 31}
+
+    def test_memoized(self):
+        assert get_calendar("2026-03") is get_calendar("2026-03")
+
+
+class TestFixedRestWithCalendar:
+
+    def test_fixed_rest_combines_sources(self):
+        """非対応曜日・不可日・休暇申請がすべて固定休日になる"""
+        staff = make_staff("s1", "スタッフ1", unavailable_dates=["2026-03-10", "2026-04-01"])
+        staff["availableWeekdays"] = [1, 2, 3, 4, 5]  # 平日のみ
+        reqs = {
+            "targetMonth": "2026-03",
+            "timeSlots": [],
+            "requirements": {
+                f"2026-03-{d:02d}_日勤": {
+                    "totalStaff": 0, "requiredQualifications": [], "requiredRoles": [],
+                }
+                for d in range(1, 31)  # 31日は非稼働日
+            },
+        }
+        builder = UnifiedModelBuilder([staff], reqs, {"s1": {"2026-03-12": "希望休"}})
+        fixed = builder._fixed_rest["s1"]
+
+        weekends = {
+            d for d in range(1, 32)
+            if datetime.date(2026, 3, d).weekday() >= 5
+        }
+        assert fixed == weekends | {10, 12, 31}
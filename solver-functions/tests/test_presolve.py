@@ -0,0 +1,190 @@
+"""Python側プリソルブ（solver.presolve）のテスト"""
+
+from ortools.sat.python import cp_model
+
+from solver.presolve import presolve
+from solver.service import UnifiedSolverService
+from solver.unified_builder import UnifiedModelBuilder
+from tests.conftest import make_staff
+
+_MONTH = "2026-03"
+
+
+def _req(total=1, quals=None) -> dict:
+    return {"totalStaff": total, "requiredQualifications": quals or [], "requiredRoles": []}
+
+
+def _domains(staff_ids, days, shift_types) -> dict:
+    return {(sid, day): list(shift_types) for sid in staff_ids for day in days}
+
+
+class TestPresolveRules:
+
+    def test_prunes_shifts_without_demand(self):
+        domains = _domains(["s1", "s2"], [1, 2], ["早番", "日勤", "遅番", "休"])
+        reqs = {f"{_MONTH}-01_日勤": _req(), f"{_MONTH}-02_早番": _req(),
+                f"{_MONTH}-02_日勤": _req()}
+        staff = [make_staff("s1", "A"), make_staff("s2", "B")]
+        stats = presolve(domains, staff, reqs, _MONTH, 31, prune_no_demand=True)
+        assert domains[("s1", 1)] == ["日勤", "休"]
+        assert domains[("s2", 2)] == ["早番", "日勤", "休"]
+        assert stats["presolvePrunedVariables"] == 6
+
+    def test_keeps_shifts_without_demand_by_default(self):
+        """需要なしシフトは既定では外さない（配置は禁止されていない）"""
+        domains = _domains(["s1"], [1], ["早番", "日勤", "休"])
+        stats = presolve(domains, [make_staff("s1", "A")], {f"{_MONTH}-01_日勤": _req(0)},
+                         _MONTH, 31)
+        assert domains[("s1", 1)] == ["早番", "日勤", "休"]
+        assert stats["presolvePrunedVariables"] == 0
+
+    def test_keep_cells(self):
+        domains = _domains(["s1"], [1, 2, 3], ["夜勤", "明け休み", "休"])
+        stats = presolve(domains, [make_staff("s1", "A")], {}, _MONTH, 31,
+                         keep={("s1", 1, "夜勤")}, prune_no_demand=True)
+        assert domains[("s1", 1)] == ["夜勤", "明け休み", "休"]
+        # 2・3日の夜勤（需要なし）と、それにつながる3日の明け休み
+        assert domains[("s1", 2)] == ["明け休み", "休"]
+        assert domains[("s1", 3)] == ["休"]
+        assert stats["presolvePrunedVariables"] == 3
+
+    def test_night_chain_blocked_by_fixed_rest(self):
+        """3日が固定休日（エントリなし）→ 2日の夜勤・3日以降につながる明け休みを除く"""
+        shifts = ["日勤", "夜勤", "明け休み", "休"]
+        domains = {("s1", d): list(shifts) for d in (1, 2, 4, 5, 6)}
+        reqs = {f"{_MONTH}-{d:02d}_{st}": _req(0) for d in range(1, 7) for st in ("日勤", "夜勤")}
+        presolve(domains, [make_staff("s1", "A")], reqs, _MONTH, 31)
+        assert "夜勤" not in domains[("s1", 2)]
+        assert "夜勤" in domains[("s1", 1)]
+        assert "明け休み" not in domains[("s1", 4)]  # 3日は夜勤できない
+        assert "夜勤" not in domains[("s1", 6)]  # 7日に明け休みの候補がない
+
+    def test_night_chain_blocked_by_work_two_days_later(self):
+        """翌々日に休の候補がない（勤務に確定）→ 夜勤を外す（固定休日の翌々日は残す）"""
+        domains = {("s1", d): ["日勤", "夜勤", "明け休み", "休"] for d in (1, 2, 4, 5)}
+        domains[("s1", 3)] = ["日勤"]
+        presolve(domains, [make_staff("s1", "A")], {}, _MONTH, 31, force_exact_cover=False)
+        assert "夜勤" not in domains[("s1", 1)]
+        assert "夜勤" in domains[("s1", 4)]  # 6日はエントリなし（固定休日＝休）
+
+    def test_conflict_reports_infeasible(self):
+        """夜勤に確定した日の翌々日が勤務に確定 → 打ち切って presolveInfeasible"""
+        domains = {("s1", 1): ["夜勤"], ("s1", 2): ["明け休み", "休"], ("s1", 3): ["日勤"]}
+        stats = presolve(domains, [make_staff("s1", "A")], {}, _MONTH, 31)
+        assert stats["presolveInfeasible"] is True
+
+    def test_forces_exact_cover(self):
+        """早番の配置可能者が必要人数ちょうど → 確定し、他の要件の配置可能者から外れる"""
+        staff = [make_staff("s1", "A"), make_staff("s2", "B"),
+                 make_staff("s3", "C", time_slot_preference="日勤のみ")]
+        domains = {("s1", 1): ["早番", "日勤", "休"], ("s2", 1): ["日勤", "休"],
+                   ("s3", 1): ["日勤", "休"]}
+        reqs = {f"{_MONTH}-01_早番": _req(1), f"{_MONTH}-01_日勤": _req(2)}
+        stats = presolve(domains, staff, reqs, _MONTH, 31)
+        assert domains[("s1", 1)] == ["早番"]
+        # s1 が早番に確定 → 日勤の配置可能者は s2, s3 の2名 → 確定
+        assert domains[("s2", 1)] == ["日勤"]
+        assert domains[("s3", 1)] == ["日勤"]
+        assert stats["presolveForcedAssignments"] == 3
+        assert stats["presolveInfeasible"] is False
+
+    def test_forces_qualification_cover(self):
+        staff = [make_staff("s1", "A", qualifications=["看護師"]), make_staff("s2", "B")]
+        domains = _domains(["s1", "s2"], [1], ["日勤", "休"])
+        reqs = {f"{_MONTH}-01_日勤": _req(1, [{"qualification": "看護師", "count": 1}])}
+        presolve(domains, staff, reqs, _MONTH, 31)
+        assert domains[("s1", 1)] == ["日勤"]
+        assert domains[("s2", 1)] == ["日勤", "休"]
+
+    def test_forced_night_propagates_chain(self):
+        staff = [make_staff("s1", "A", time_slot_preference="夜勤のみ")]
+        domains = _domains(["s1"], [1, 2, 3], ["夜勤", "明け休み", "休"])
+        domains[("s1", 1)] = ["夜勤", "休"]
+        reqs = {f"{_MONTH}-01_夜勤": _req(1)}
+        presolve(domains, staff, reqs, _MONTH, 31)
+        assert domains[("s1", 1)] == ["夜勤"]
+        assert domains[("s1", 2)] == ["明け休み"]
+        assert domains[("s1", 3)] == ["休"]
+
+    def test_force_disabled(self):
+        staff = [make_staff("s1", "A")]
+        domains = _domains(["s1"], [1], ["日勤", "休"])
+        stats = presolve(domains, staff, {f"{_MONTH}-01_日勤": _req(1)}, _MONTH, 31,
+                         force_exact_cover=False)
+        assert domains[("s1", 1)] == ["日勤", "休"]
+        assert stats["presolveForcedAssignments"] == 0
+
+
+class TestPresolveModel:
+
+    def _weekend_day_only(self, requirements_30):
+        """土日（3/1・7・8 …）は日勤のみ運用"""
+        reqs = dict(requirements_30["requirements"])
+        for day in (1, 7, 8, 14, 15, 21, 22, 28, 29):
+            for st in ("早番", "遅番"):
+                del reqs[f"{_MONTH}-{day:02d}_{st}"]
+        return {**requirements_30, "requirements": reqs}
+
+    def test_smaller_model(self, staff_list_5, requirements_30):
+        requirements = self._weekend_day_only(requirements_30)
+        with_presolve = UnifiedModelBuilder(staff_list_5, requirements, {}, prune_no_demand=True)
+        without = UnifiedModelBuilder(staff_list_5, requirements, {}, presolve=False)
+        n_with = len(with_presolve.build().Proto().variables)
+        n_without = len(without.build().Proto().variables)
+        pruned = with_presolve.presolve_stats["presolvePrunedVariables"]
+        assert pruned > 0
+        # 派生変数（勤務日リテラル）も減る
+        assert n_without - n_with >= pruned
+        assert without.presolve_stats == {}
+
+    def test_no_assignment_to_shift_without_demand(self, staff_list_5, requirements_30):
+        requirements = self._weekend_day_only(requirements_30)
+        builder = UnifiedModelBuilder(staff_list_5, requirements, {}, prune_no_demand=True)
+        model = builder.build()
+        assert builder.presolve_stats["presolvePrunedVariables"] > 0
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = 1
+        solver.parameters.max_time_in_seconds = 10.0
+        assert solver.Solve(model) in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        for staff in builder.extract_solution(solver):
+            for shift in staff["monthlyShifts"]:
+                if shift["date"] == f"{_MONTH}-07":
+                    assert shift["shiftType"] in ("日勤", "休")
+
+    def test_same_result_when_unrequired_shifts_allowed(self, staff_list_5, requirements_30):
+        """要件キーのないシフトがあっても、プリソルブの有無で最適値が変わらない"""
+        requirements = self._weekend_day_only(requirements_30)
+        objectives = []
+        for enabled in (True, False):
+            builder = UnifiedModelBuilder(staff_list_5, requirements, {}, presolve=enabled)
+            model = builder.build()
+            if enabled:
+                assert ("s1", 7, "早番") in builder.variables
+            solver = cp_model.CpSolver()
+            solver.parameters.num_workers = 1
+            solver.parameters.max_time_in_seconds = 60.0
+            assert solver.Solve(model) == cp_model.OPTIMAL
+            objectives.append(solver.ObjectiveValue())
+        assert objectives[0] == objectives[1]
+
+    def test_same_feasibility_with_forced_conflict(self):
+        """1日夜勤・3日日勤が各1名で1名のみ → 夜勤→明け休み→休と矛盾し、有無どちらも実行不能"""
+        requirements = {
+            "targetMonth": _MONTH,
+            "timeSlots": [],
+            "requirements": {
+                f"{_MONTH}-{day:02d}_日勤": _req(1 if day == 3 else 0) for day in range(1, 32)
+            },
+        }
+        requirements["requirements"][f"{_MONTH}-01_夜勤"] = _req(1)
+        staff = [make_staff("s1", "A")]
+        for encoding in ("block", "chain"):
+            statuses = []
+            for enabled in (True, False):
+                builder = UnifiedModelBuilder(
+                    staff, requirements, {}, presolve=enabled, night_encoding=encoding,
+                )
+                solver = cp_model.CpSolver()
+                solver.parameters.num_workers = 1
+                statuses.append(solver.Solve(builder.build()))
+            assert statuses == [cp_model.INFEASIBLE, cp_model.INFEASIBLE], encoding
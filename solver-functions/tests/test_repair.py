@@ -0,0 +1,219 @@
+"""局所修復（UnifiedSolverService.repair）のテスト"""
+
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+from ortools.sat.python import cp_model
+
+from solver import repair, service
+from solver.repair import neighborhood_days, peer_staff
+from solver.service import UnifiedSolverService
+from solver.unified_builder import UnifiedModelBuilder
+from tests.conftest import make_staff
+from tests.test_unified_builder import _make_requirements
+
+
+def _base(n: int = 8, shift_types: list[str] | None = None):
+    staff = [make_staff(f"s{i}", f"スタッフ{i}") for i in range(1, n + 1)]
+    reqs = _make_requirements(shift_types=shift_types)
+    result = UnifiedSolverService.solve(staff, reqs, {})
+    assert result["success"] is True
+    return staff, reqs, result["schedule"]
+
+
+def _work_day(schedule, staff_id: str) -> int:
+    """スタッフが勤務している中旬の日を1つ返す"""
+    shifts = next(s for s in schedule if s["staffId"] == staff_id)["monthlyShifts"]
+    return next(
+        day for day in range(10, 32)
+        if shifts[day - 1]["shiftType"] in ("早番", "日勤", "遅番", "夜勤")
+    )
+
+
+class TestNeighborhood:
+
+    def test_radius(self):
+        assert neighborhood_days({10}, 2, 31) == {8, 9, 10, 11, 12}
+        assert neighborhood_days({1, 31}, 1, 31) == {1, 2, 30, 31}
+        assert neighborhood_days({5}, None, 28) == set(range(1, 29))
+
+    def test_peers_share_role_or_qualification(self):
+        staff = [
+            make_staff("s1", "A", role="看護職員", qualifications=["看護師"]),
+            make_staff("s2", "B", role="看護職員"),
+            make_staff("s3", "C", qualifications=["看護師"]),
+            make_staff("s4", "D"),
+        ]
+        assert peer_staff(staff, {"s1"}) == {"s1", "s2", "s3"}
+        assert peer_staff(staff, {"s4"}) == {"s3", "s4"}  # 役職（介護職員）が共通
+        assert peer_staff(staff, set()) == set()
+
+
+class TestRepair:
+
+    def test_sick_day_changes_only_neighborhood(self):
+        """欠勤1日 → 変更は近傍内に限定され、欠勤日は休になる"""
+        staff, reqs, schedule = _base()
+        day = _work_day(schedule, "s1")
+        date = f"2026-03-{day:02d}"
+
+        result = UnifiedSolverService.repair(
+            staff, reqs, {}, schedule, {"unavailableDates": {"s1": [date]}},
+        )
+        assert result["success"] is True
+        s1 = next(s for s in result["schedule"] if s["staffId"] == "s1")
+        assert s1["monthlyShifts"][day - 1]["shiftType"] == "休"
+
+        radius = result["solverStats"]["repairRadius"]
+        assert radius is not None
+        assert result["changedCells"]
+        for cell in result["changedCells"]:
+            changed_day = int(cell["date"].split("-")[2])
+            assert abs(changed_day - day) <= radius
+        assert any(c["staffId"] == "s1" and c["date"] == date for c in result["changedCells"])
+
+    def test_builds_once_and_relaxes_fixings(self, monkeypatch):
+        """モデルは1回だけ構築し、矛盾したら固定（仮定）を減らして再求解する"""
+        staff, reqs, schedule = _base()
+        builds = []
+        real_build = UnifiedModelBuilder.build
+
+        def build(self):
+            builds.append(self)
+            return real_build(self)
+
+        assumptions = []
+        real_solve = cp_model.CpSolver.Solve
+
+        def solve(self, model):
+            assumptions.append(len(model.Proto().assumptions))
+            if len(assumptions) == 1:
+                return cp_model.INFEASIBLE  # 最初の近傍では解けなかったことにする
+            return real_solve(self, model)
+
+        monkeypatch.setattr(UnifiedModelBuilder, "build", build)
+        monkeypatch.setattr(cp_model.CpSolver, "Solve", solve)
+        monkeypatch.setattr(repair, "REPAIR_NEIGHBORHOODS", [(2, True), (2, False)])
+        staff[0]["role"] = "看護職員"  # s1 の同僚は資格・役職が共通するスタッフのみ（なし）
+
+        day = _work_day(schedule, "s1")
+        result = UnifiedSolverService.repair(
+            staff, reqs, {}, schedule, {"unavailableDates": {"s1": [f"2026-03-{day:02d}"]}},
+        )
+        assert result["success"] is True, result.get("error")
+        assert len(builds) == 1
+        assert result["solverStats"]["repairAttempts"] == 2
+        assert result["solverStats"]["repairStaffScope"] == "all"
+        # 同僚のみ（s1 の近傍だけ自由）→ 全スタッフの近傍を自由、で仮定が減る
+        assert assumptions[0] > assumptions[1] > 0
+
+    def test_stops_when_budget_is_spent(self, monkeypatch):
+        """時間上限を使い切ったら残りの近傍は試さず TIMEOUT（INFEASIBLE とは報告しない）"""
+        staff, reqs, schedule = _base()
+        clock = [0.0]
+        limits = []
+
+        def solve(self, model):
+            limits.append(self.parameters.max_time_in_seconds)
+            clock[0] += min(self.parameters.max_time_in_seconds, 3.0)  # 矛盾の証明に3秒
+            return cp_model.INFEASIBLE
+
+        monkeypatch.setattr(cp_model.CpSolver, "Solve", solve)
+        monkeypatch.setattr(service, "time", SimpleNamespace(time=lambda: clock[0]))
+        day = _work_day(schedule, "s1")
+        result = UnifiedSolverService.repair(
+            staff, reqs, {}, schedule, {"unavailableDates": {"s1": [f"2026-03-{day:02d}"]}},
+            time_limit_sec=5.0,
+        )
+        assert result["success"] is False
+        assert result["errorType"] == "TIMEOUT"
+        # 試行ごとに残り時間だけを渡し、使い切ったら3つ目以降の近傍は試さない
+        assert limits == [5.0, 2.0]
+        assert result["details"]["repairAttempts"] == 2
+        assert clock[0] == 5.0
+
+    def test_unknown_is_timeout(self, monkeypatch):
+        staff, reqs, schedule = _base()
+        monkeypatch.setattr(cp_model.CpSolver, "Solve", lambda self, model: cp_model.UNKNOWN)
+        result = UnifiedSolverService.repair(
+            staff, reqs, {}, schedule, {"removedStaffIds": ["s2"]},
+        )
+        assert result["errorType"] == "TIMEOUT"
+        assert result["details"]["status"] == "UNKNOWN"
+        assert result["details"]["repairAttempts"] == 1
+
+    def test_peer_neighborhood_changes_only_peers(self):
+        """同僚のみの近傍で解ければ、変化するのは影響スタッフと同僚だけ"""
+        staff, reqs, schedule = _base()
+        for s in staff[:4]:
+            s["role"] = "看護職員"
+        day = _work_day(schedule, "s1")
+        result = UnifiedSolverService.repair(
+            staff, reqs, {}, schedule, {"unavailableDates": {"s1": [f"2026-03-{day:02d}"]}},
+        )
+        assert result["success"] is True
+        assert result["solverStats"]["repairStaffScope"] == "peers"
+        assert {c["staffId"] for c in result["changedCells"]} <= {"s1", "s2", "s3", "s4"}
+
+    def test_removed_staff(self):
+        """スタッフ除外 → スケジュールから外れ、人員要件は維持"""
+        staff, reqs, schedule = _base()
+        result = UnifiedSolverService.repair(
+            staff, reqs, {}, schedule, {"removedStaffIds": ["s2"]},
+        )
+        assert result["success"] is True
+        assert "s2" not in [s["staffId"] for s in result["schedule"]]
+        assert len(result["schedule"]) == 7
+        for day in range(31):
+            for st in ("早番", "日勤", "遅番"):
+                count = sum(
+                    1 for s in result["schedule"]
+                    if s["monthlyShifts"][day]["shiftType"] == st
+                )
+                assert count >= 1
+
+    def test_night_facility_leave(self):
+        """夜勤施設で休暇追加 → 夜勤チェーンを保ったまま修復"""
+        staff, reqs, schedule = _base(10, ["早番", "日勤", "遅番", "夜勤"])
+        day = _work_day(schedule, "s3")
+        result = UnifiedSolverService.repair(
+            staff, reqs, {}, schedule,
+            {"leaveRequests": {"s3": {f"2026-03-{day:02d}": "有給休暇"}}},
+        )
+        assert result["success"] is True
+        for s in result["schedule"]:
+            shifts = [x["shiftType"] for x in s["monthlyShifts"]]
+            for d, st in enumerate(shifts[:-2]):
+                if st == "夜勤":
+                    assert shifts[d + 1] == "明け休み"
+                    assert shifts[d + 2] == "休"
+
+    def test_no_changes_keeps_schedule(self):
+        """変更なし → 既存スケジュールのまま"""
+        staff, reqs, schedule = _base()
+        result = UnifiedSolverService.repair(staff, reqs, {}, schedule, {})
+        assert result["success"] is True
+        assert result["changedCells"] == []
+
+    def test_flask_endpoint(self, client):
+        staff, reqs, schedule = _base()
+        body = {
+            "staffList": staff,
+            "requirements": reqs,
+            "schedule": schedule,
+            "changes": {"unavailableDates": {"s1": ["2026-03-15"]}},
+        }
+        response = client.post(
+            "/solverUnifiedRepair", data=json.dumps(body), content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert "changedCells" in response.get_json()
+
+        response = client.post(
+            "/solverUnifiedRepair",
+            data=json.dumps({"staffList": staff, "requirements": reqs}),
+            content_type="application/json",
+        )
+        assert response.status_code == 400
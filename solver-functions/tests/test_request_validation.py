@@ -0,0 +1,237 @@
+"""リクエスト検証・正規化（solver.request_validation）のテスト"""
+
+from __future__ import annotations
+
+import copy
+import time
+
+from solver.request_validation import validate_request
+from solver.types import (
+    MAX_DETERMINISTIC_TIME,
+    SOLVE_TIME_BUDGET_SEC,
+    RepairChangesDict,
+    SolverRequest,
+    UnifiedRepairRequest,
+    UnifiedScenarioRequest,
+    UnifiedSolverRequest,
+)
+from tests.conftest import make_staff
+
+
+def _paths(errors) -> list[str]:
+    return [e["path"] for e in errors]
+
+
+class TestValidateRequest:
+
+    def test_valid_request(self, staff_list_5, skeleton_5_30, requirements_30):
+        body = {
+            "staffList": staff_list_5,
+            "skeleton": skeleton_5_30,
+            "requirements": requirements_30,
+        }
+        normalized, errors = validate_request(body, SolverRequest)
+        assert errors == []
+        assert normalized["staffList"] == staff_list_5
+        assert normalized["requirements"] == requirements_30
+        assert normalized["leaveRequests"] == {}  # 任意フィールドの既定値
+
+    def test_normalizes_dates_and_defaults(self, requirements_30):
+        """日付・要件キーをゼロ埋め正規形に、未知フィールドを除去"""
+        staff = make_staff("s1", "田中", unavailable_dates=["2026-3-5"])
+        del staff["isNightShiftOnly"]
+        staff["memo"] = "未知フィールド"
+        reqs = copy.deepcopy(requirements_30)
+        reqs["requirements"]["2026-3-1_夜勤"] = reqs["requirements"]["2026-03-01_日勤"]
+        body = {
+            "staffList": [staff],
+            "requirements": reqs,
+            "leaveRequests": {"s1": {"2026-03-7": "希望休"}},
+        }
+        normalized, errors = validate_request(body, UnifiedSolverRequest)
+        assert errors == []
+        out = normalized["staffList"][0]
+        assert out["unavailableDates"] == ["2026-03-05"]
+        assert out["isNightShiftOnly"] is False
+        assert "memo" not in out
+        assert "2026-03-01_夜勤" in normalized["requirements"]["requirements"]
+        assert normalized["leaveRequests"] == {"s1": {"2026-03-07": "希望休"}}
+
+    def test_reports_all_errors(self, requirements_30):
+        """型・列挙値・範囲・日付の誤りをまとめて返す"""
+        staff = make_staff("s1", "田中", role="院長", qualifications=["看護師", "医師"])
+        staff["maxConsecutiveWorkDays"] = "6"
+        staff["isNightShiftOnly"] = 1
+        staff["availableWeekdays"] = [0, 7]
+        staff["unavailableDates"] = ["2026-02-30"]
+        del staff["name"]
+        body = {
+            "staffList": [staff],
+            "requirements": requirements_30,
+            "leaveRequests": {"s1": {"2026-03-10": "欠勤"}},
+        }
+        _, errors = validate_request(body, UnifiedSolverRequest)
+        assert sorted(_paths(errors)) == sorted([
+            "staffList[0].name",
+            "staffList[0].role",
+            "staffList[0].qualifications[1]",
+            "staffList[0].maxConsecutiveWorkDays",
+            "staffList[0].availableWeekdays[1]",
+            "staffList[0].isNightShiftOnly",
+            "staffList[0].unavailableDates[0]",
+            "leaveRequests['s1']['2026-03-10']",
+        ])
+        role_error = next(e for e in errors if e["path"] == "staffList[0].role")
+        assert "介護職員" in role_error["allowedValues"]
+
+    def test_mode_and_priority_enums(self, staff_list_5, requirements_30):
+        """各モードと objectivePriority のステージ名は許可値のみ"""
+        body = {
+            "staffList": staff_list_5,
+            "requirements": requirements_30,
+            "scheduleFormat": "xml",
+            "objectiveMode": "random",
+            "objectivePriority": ["preference", "cost", "coverage"],
+            "timeLimitMode": "cpu",
+            "coverageMode": "partial",
+        }
+        _, errors = validate_request(body, UnifiedSolverRequest)
+        assert sorted(_paths(errors)) == sorted([
+            "scheduleFormat", "objectiveMode", "objectivePriority[1]", "timeLimitMode",
+            "coverageMode",
+        ])
+        priority_error = next(e for e in errors if e["path"] == "objectivePriority[1]")
+        assert "nightFairness" in priority_error["allowedValues"]
+
+    def test_optional_fields_follow_typeddict(self, staff_list_5, skeleton_5_30, requirements_30):
+        """任意フィールドは TypedDict の NotRequired / total=False から読み、既定値は型が合うときだけ補完"""
+        assert "scheduleFormat" in UnifiedSolverRequest.__optional_keys__
+        assert "staffList" in UnifiedSolverRequest.__required_keys__
+        assert RepairChangesDict.__required_keys__ == frozenset()
+
+        body = {"staffList": staff_list_5, "requirements": requirements_30}
+        _, errors = validate_request(body, UnifiedSolverRequest)
+        assert errors == []
+        _, errors = validate_request(body, SolverRequest)
+        assert _paths(errors) == ["skeleton"]
+
+        normalized, errors = validate_request({
+            **body, "schedule": [], "changes": {"removedStaffIds": ["s1"]},
+        }, UnifiedRepairRequest)
+        assert errors == []
+        assert normalized["leaveRequests"] == {}
+        # changes.unavailableDates（dict）にはスタッフの既定値（list）を入れない
+        assert normalized["changes"] == {"removedStaffIds": ["s1"], "leaveRequests": {}}
+
+    def test_stage_time_limit_range(self, staff_list_5, requirements_30):
+        """stageTimeLimitSec は正の値で、全ステージ合計の上限 SOLVE_TIME_BUDGET_SEC 以下"""
+        body = {"staffList": staff_list_5, "requirements": requirements_30}
+        for value in (0, -1.0, SOLVE_TIME_BUDGET_SEC + 1, "5"):
+            _, errors = validate_request({**body, "stageTimeLimitSec": value}, UnifiedSolverRequest)
+            assert _paths(errors) == ["stageTimeLimitSec"], value
+        normalized, errors = validate_request({**body, "stageTimeLimitSec": 5}, UnifiedSolverRequest)
+        assert errors == []
+        assert normalized["stageTimeLimitSec"] == 5.0
+
+    def test_max_deterministic_time_range(self, staff_list_5, requirements_30):
+        """maxDeterministicTime は正の値で、MAX_DETERMINISTIC_TIME 以下"""
+        body = {"staffList": staff_list_5, "requirements": requirements_30}
+        for value in (0, -0.5, MAX_DETERMINISTIC_TIME + 1, 1e9):
+            _, errors = validate_request({**body, "maxDeterministicTime": value}, UnifiedSolverRequest)
+            assert _paths(errors) == ["maxDeterministicTime"], value
+        _, errors = validate_request({**body, "maxDeterministicTime": 0.5}, UnifiedSolverRequest)
+        assert errors == []
+
+    def test_requirement_keys(self, requirements_30):
+        """要件キーは対象月内の「日付_勤務系シフト」"""
+        reqs = copy.deepcopy(requirements_30)
+        daily = reqs["requirements"]["2026-03-01_日勤"]
+        reqs["requirements"]["2026-04-01_日勤"] = daily
+        reqs["requirements"]["2026-03-02_休"] = daily
+        reqs["requirements"]["日勤"] = daily
+        reqs["requirements"]["2026-03-02_日勤"] = {"totalStaff": -1,
+                                                  "requiredQualifications": [],
+                                                  "requiredRoles": []}
+        body = {"staffList": [make_staff("s1", "田中")], "requirements": reqs}
+        _, errors = validate_request(body, UnifiedSolverRequest)
+        assert sorted(_paths(errors)) == sorted([
+            "requirements.requirements['2026-04-01_日勤']",
+            "requirements.requirements['2026-03-02_休']",
+            "requirements.requirements['日勤']",
+            "requirements.requirements['2026-03-02_日勤'].totalStaff",
+        ])
+
+    def test_target_month_and_duplicate_ids(self, requirements_30):
+        reqs = dict(requirements_30, targetMonth="2026-13")
+        body = {"staffList": [make_staff("s1", "田中"), make_staff("s1", "佐藤")],
+                "requirements": reqs}
+        _, errors = validate_request(body, UnifiedSolverRequest)
+        assert _paths(errors) == ["staffList[1].id", "requirements.targetMonth"]
+
+    def test_scenario_requirements(self, requirements_30):
+        """シナリオの要件上書き（Noneで削除）もキー形式を検証する"""
+        body = {
+            "staffList": [make_staff("s1", "田中")],
+            "requirements": requirements_30,
+            "scenarios": [
+                {"name": "ok", "requirements": {"2026-3-1_日勤": None}},
+                {"name": "ng", "requirements": {"2026-03-40_日勤": None},
+                 "addStaff": [{"id": "s9"}]},
+            ],
+        }
+        normalized, errors = validate_request(body, UnifiedScenarioRequest)
+        assert normalized["scenarios"][0]["requirements"] == {"2026-03-01_日勤": None}
+        assert "scenarios[1].requirements['2026-03-40_日勤']" in _paths(errors)
+        assert "scenarios[1].addStaff[0].name" in _paths(errors)
+
+    def test_not_an_object(self):
+        _, errors = validate_request([], SolverRequest)
+        assert _paths(errors) == ["$"]
+
+    def test_fast_failure(self, requirements_30):
+        """不正リクエストはモデル構築なしで即座に返る"""
+        staff = [make_staff(f"s{i}", f"スタッフ{i}", role="不明") for i in range(50)]
+        body = {"staffList": staff, "requirements": requirements_30}
+        validate_request(body, UnifiedSolverRequest)  # 検証関数の組み立てを済ませる
+        start = time.perf_counter()
+        _, errors = validate_request(body, UnifiedSolverRequest)
+        elapsed = time.perf_counter() - start
+        assert len(errors) == 50
+        assert elapsed < 0.05
+
+
+class TestEndpointValidation:
+
+    def test_invalid_request_returns_400(self, requirements_30, client, monkeypatch):
+        """検証エラーはサービスを呼ばずに400"""
+        import solver.main as main
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("サービスが呼ばれた")
+
+        monkeypatch.setattr(main.UnifiedSolverService, "solve", _fail)
+        staff = make_staff("s1", "田中", time_slot_preference="夜のみ")
+        response = client.post("/solverUnifiedGenerate", json={
+            "staffList": [staff],
+            "requirements": requirements_30,
+            "leaveRequests": {"s1": {"2026-03-32": "希望休"}},
+        })
+        assert response.status_code == 400
+        data = response.get_json()
+        assert data["errorType"] == "VALIDATION_ERROR"
+        assert _paths(data["details"]["validationErrors"]) == [
+            "staffList[0].timeSlotPreference",
+            "leaveRequests['s1']['2026-03-32']",
+        ]
+
+    def test_normalized_request_is_solved(self, requirements_30, client):
+        """ゼロ埋めなしの日付も正規化されてビルダーに渡る"""
+        staff = [make_staff(f"s{i}", f"スタッフ{i}") for i in range(1, 6)]
+        response = client.post("/solverUnifiedGenerate", json={
+            "staffList": staff,
+            "requirements": requirements_30,
+            "leaveRequests": {"s1": {"2026-3-3": "希望休"}},
+        })
+        assert response.status_code == 200
+        s1 = response.get_json()["schedule"][0]
+        assert s1["monthlyShifts"][2]["shiftType"] == "休"
@@ -0,0 +1,146 @@
+"""週間パターン形式のシフト要件（solver.requirement_pattern）のテスト"""
+
+import json
+import pickle
+
+from solver.request_validation import validate_request
+from solver.requirement_pattern import RequirementIndex
+from solver.service import UnifiedSolverService
+from solver.types import UnifiedSolverRequest
+from tests.conftest import make_staff
+
+_REQ = {"totalStaff": 1, "requiredQualifications": [], "requiredRoles": []}
+_TIME_SLOTS = [
+    {"name": "早番", "start": "07:00", "end": "16:00", "restHours": 1.0},
+    {"name": "日勤", "start": "09:00", "end": "18:00", "restHours": 1.0},
+    {"name": "遅番", "start": "11:00", "end": "20:00", "restHours": 1.0},
+]
+
+
+def _pattern_requirements(**extra) -> dict:
+    """毎日 早番・日勤・遅番 各1名（requirements_30 と同じ内容）"""
+    day = {"早番": _REQ, "日勤": _REQ, "遅番": _REQ}
+    return {
+        "targetMonth": "2026-03",
+        "timeSlots": _TIME_SLOTS,
+        "weeklyPattern": {str(wd): day for wd in range(7)},
+        **extra,
+    }
+
+
+def _paths(errors) -> list[str]:
+    return [e["path"] for e in errors]
+
+
+class TestRequirementIndex:
+
+    def test_equivalent_to_daily_format(self, requirements_30):
+        index = RequirementIndex("2026-03", {str(wd): {"早番": _REQ, "日勤": _REQ, "遅番": _REQ}
+                                             for wd in range(7)})
+        assert len(index) == 93
+        assert list(index) == list(requirements_30["requirements"])
+        assert index == requirements_30["requirements"]
+
+    def test_weekday_exceptions_and_closed_days(self):
+        """2026-03-01 は日曜。日曜は日勤のみ、20日は早番なし・日勤2名、31日は休業"""
+        weekday = {"早番": _REQ, "日勤": _REQ, "遅番": _REQ}
+        two = dict(_REQ, totalStaff=2)
+        index = RequirementIndex(
+            "2026-03",
+            {"0": {"日勤": _REQ}, **{str(wd): weekday for wd in range(1, 7)}},
+            exceptions={"2026-03-20": {"早番": None, "日勤": two}},
+            closed_days=["2026-03-31"],
+        )
+        assert "2026-03-01_日勤" in index
+        assert "2026-03-01_早番" not in index
+        assert "2026-03-20_早番" not in index
+        assert index["2026-03-20_日勤"]["totalStaff"] == 2
+        assert index["2026-03-20_遅番"] is _REQ
+        assert not any(key.startswith("2026-03-31") for key in index)
+        # 同じ曜日の日は同じ要件オブジェクト
+        assert index["2026-03-02_日勤"] is index["2026-03-09_日勤"]
+
+    def test_picklable(self):
+        """プールモードでワーカープロセスへ渡せる"""
+        index = RequirementIndex("2026-03", {"1": {"日勤": _REQ}})
+        assert dict(pickle.loads(pickle.dumps(index))) == dict(index)
+
+
+class TestPatternValidation:
+
+    def test_expanded_on_validation(self, requirements_30):
+        body = {"staffList": [make_staff("s1", "田中")], "requirements": _pattern_requirements(
+            exceptions={"2026-3-5": {"日勤": None}},
+            closedDays=["2026-3-31"],
+        )}
+        normalized, errors = validate_request(body, UnifiedSolverRequest)
+        assert errors == []
+        reqs = normalized["requirements"]
+        assert "weeklyPattern" not in reqs and "exceptions" not in reqs
+        assert isinstance(reqs["requirements"], RequirementIndex)
+        assert "2026-03-05_日勤" not in reqs["requirements"]
+        assert "2026-03-05_早番" in reqs["requirements"]
+        assert len(reqs["requirements"]) == 93 - 1 - 3
+
+    def test_payload_size(self, requirements_30):
+        daily = json.dumps(requirements_30, ensure_ascii=False)
+        pattern = json.dumps(
+            dict(_pattern_requirements(), weeklyPattern={
+                str(wd): {"早番": _REQ, "日勤": _REQ, "遅番": _REQ} for wd in range(7)
+            }),
+            ensure_ascii=False,
+        )
+        assert len(pattern) * 3 < len(daily)
+
+    def test_errors(self):
+        reqs = _pattern_requirements(
+            exceptions={"2026-04-01": {"日勤": None}, "2026-03-05": {"休": _REQ}},
+            closedDays=["2026-04-01"],
+        )
+        reqs["weeklyPattern"] = dict(reqs["weeklyPattern"], **{"7": {"日勤": _REQ}})
+        body = {"staffList": [make_staff("s1", "田中")], "requirements": reqs}
+        _, errors = validate_request(body, UnifiedSolverRequest)
+        assert sorted(_paths(errors)) == sorted([
+            "requirements.weeklyPattern['7']",
+            "requirements.exceptions['2026-04-01']",
+            "requirements.exceptions['2026-03-05']['休']",
+            "requirements.closedDays[0]",
+        ])
+
+    def test_exactly_one_format(self, requirements_30):
+        both = dict(_pattern_requirements(), requirements=requirements_30["requirements"])
+        neither = {"targetMonth": "2026-03", "timeSlots": _TIME_SLOTS}
+        daily_with_exceptions = dict(requirements_30, closedDays=["2026-03-31"])
+        for reqs, expected in [
+            (both, ["requirements"]),
+            (neither, ["requirements"]),
+            (daily_with_exceptions, ["requirements.closedDays"]),
+        ]:
+            body = {"staffList": [make_staff("s1", "田中")], "requirements": reqs}
+            _, errors = validate_request(body, UnifiedSolverRequest)
+            assert _paths(errors) == expected
+
+
+class TestPatternSolve:
+
+    def test_same_result_as_daily_format(self, staff_list_5, requirements_30):
+        body = {"staffList": staff_list_5, "requirements": _pattern_requirements()}
+        normalized, errors = validate_request(body, UnifiedSolverRequest)
+        assert errors == []
+        pattern_result = UnifiedSolverService.solve(
+            staff_list_5, normalized["requirements"], {}, time_limit_mode="deterministic",
+        )
+        daily_result = UnifiedSolverService.solve(
+            staff_list_5, requirements_30, {}, time_limit_mode="deterministic",
+        )
+        assert pattern_result["success"] is True
+        assert pattern_result["schedule"] == daily_result["schedule"]
+
+    def test_endpoint(self, staff_list_5, client):
+        response = client.post("/solverUnifiedGenerate", json={
+            "staffList": staff_list_5,
+            "requirements": _pattern_requirements(closedDays=["2026-03-31"]),
+        })
+        assert response.status_code == 200
+        shifts = response.get_json()["schedule"][0]["monthlyShifts"]
+        assert shifts[30]["shiftType"] == "休"
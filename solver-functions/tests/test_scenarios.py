@@ -0,0 +1,168 @@
+"""What-ifシナリオ比較（UnifiedSolverService.compare_scenarios）のテスト"""
+
+from __future__ import annotations
+
+import json
+
+from solver.scenarios import apply_scenario, grid_shortages
+from solver.service import UnifiedSolverService
+from solver.types import DailyRequirementDict
+from tests.conftest import make_staff
+from tests.test_unified_builder import _make_requirements
+
+
+def _base_inputs():
+    staff = [make_staff(f"s{i}", f"スタッフ{i}") for i in range(1, 6)]
+    return staff, _make_requirements(total_staff=1)
+
+
+class TestApplyScenario:
+
+    def test_add_remove_and_override(self):
+        staff, reqs = _base_inputs()
+        new_staff, new_reqs = apply_scenario(staff, reqs, {
+            "addStaff": [make_staff("n1", "追加看護師", qualifications=["看護師"])],
+            "removedStaffIds": ["s5"],
+            "requirements": {
+                "2026-03-07_早番": DailyRequirementDict(
+                    totalStaff=3, requiredQualifications=[], requiredRoles=[],
+                ),
+                "2026-03-08_遅番": None,
+            },
+        })
+        assert [s["id"] for s in new_staff] == ["s1", "s2", "s3", "s4", "n1"]
+        assert new_reqs["requirements"]["2026-03-07_早番"]["totalStaff"] == 3
+        assert "2026-03-08_遅番" not in new_reqs["requirements"]
+        # 元の入力は変更しない
+        assert len(staff) == 5
+        assert reqs["requirements"]["2026-03-07_早番"]["totalStaff"] == 1
+        assert "2026-03-08_遅番" in reqs["requirements"]
+
+
+class TestGridShortages:
+
+    def test_counts_total_and_groups_from_grid(self):
+        """必要人数・資格・役職の不足を配置グリッドから数える"""
+        staff = [
+            make_staff("s1", "A", qualifications=["看護師"]),
+            make_staff("s2", "B"),
+        ]
+        reqs = {
+            "targetMonth": "2026-03",
+            "timeSlots": [],
+            "requirements": {
+                "2026-03-01_日勤": DailyRequirementDict(
+                    totalStaff=3,
+                    requiredQualifications=[{"qualification": "看護師", "count": 1}],
+                    requiredRoles=[{"role": "看護職員", "count": 1}],
+                ),
+                "2026-03-02_早番": DailyRequirementDict(
+                    totalStaff=1,
+                    requiredQualifications=[{"qualification": "看護師", "count": 1}],
+                    requiredRoles=[],
+                ),
+            },
+        }
+        grid = [["日勤", "休"] + ["休"] * 29, ["日勤", "早番"] + ["休"] * 29]
+        shortages = grid_shortages(staff, reqs, grid)
+        assert shortages == [
+            {"date": "2026-03-01", "shiftType": "日勤",
+             "requiredCount": 3, "assignedCount": 2, "shortage": 1},
+            {"date": "2026-03-01", "shiftType": "日勤", "role": "看護職員",
+             "requiredCount": 1, "assignedCount": 0, "shortage": 1},
+            {"date": "2026-03-02", "shiftType": "早番", "qualification": "看護師",
+             "requiredCount": 1, "assignedCount": 0, "shortage": 1},
+        ]
+
+
+class TestCompareScenarios:
+
+    def test_parallel_comparison_table(self):
+        """複数シナリオを並列に解き、基準と比較できる"""
+        staff, reqs = _base_inputs()
+        scenarios = [
+            {"name": "1名追加", "addStaff": [make_staff("n1", "追加")]},
+            {
+                "name": "土曜早番3名",
+                "requirements": {
+                    "2026-03-07_早番": DailyRequirementDict(
+                        totalStaff=3, requiredQualifications=[], requiredRoles=[],
+                    ),
+                },
+            },
+            {
+                "name": "全員欠員",
+                "removedStaffIds": ["s1", "s2", "s3", "s4", "s5"],
+            },
+        ]
+        result = UnifiedSolverService.compare_scenarios(
+            staff, reqs, {}, scenarios, max_workers=2,
+        )
+        assert result["success"] is True
+        assert result["base"]["success"] is True
+        rows = {row["name"]: row for row in result["scenarios"]}
+        assert list(rows) == ["1名追加", "土曜早番3名", "全員欠員"]
+
+        assert rows["1名追加"]["success"] is True
+        assert "changedCellCount" in rows["1名追加"]
+        assert rows["土曜早番3名"]["success"] is True
+        assert rows["全員欠員"]["success"] is True
+        assert rows["全員欠員"]["shortageCount"] > 0
+
+    def test_shortages_come_from_solved_schedule(self):
+        """人手が足りなくても実行不能にせず、不足は求解後の配置から要件ごとに数える"""
+        staff, reqs = _base_inputs()
+        result = UnifiedSolverService.compare_scenarios(staff, reqs, {}, [
+            {"name": "全員欠員", "removedStaffIds": ["s1", "s2", "s3", "s4", "s5"]},
+            {
+                "name": "土曜日勤6名",
+                "requirements": {
+                    "2026-03-07_日勤": DailyRequirementDict(
+                        totalStaff=6, requiredQualifications=[], requiredRoles=[],
+                    ),
+                },
+            },
+        ], max_workers=1)
+        assert result["base"]["shortageCount"] == 0
+        assert result["base"]["shortages"] == []
+
+        empty, over = result["scenarios"]
+        # 3シフト×31日の要件（各1名）がすべて未配置
+        assert empty["success"] is True
+        assert empty["shortageCount"] == 93
+        assert all(s["assignedCount"] == 0 for s in empty["shortages"])
+        assert empty["shortages"][0] == {
+            "date": "2026-03-01", "shiftType": "早番",
+            "requiredCount": 1, "assignedCount": 0, "shortage": 1,
+        }
+        # 5名で日勤6名＋早番・遅番各1名 → 7日だけ3名不足（どのシフトで不足するかは問わない）
+        assert over["success"] is True
+        assert over["shortageCount"] == 3
+        assert {s["date"] for s in over["shortages"]} == {"2026-03-07"}
+
+    def test_sequential_matches_parallel(self):
+        """逐次実行と並列実行で同じ比較結果（決定性）"""
+        staff, reqs = _base_inputs()
+        scenarios = [
+            {"name": "a", "addStaff": [make_staff("n1", "追加")]},
+            {"name": "b", "removedStaffIds": ["s5"]},
+        ]
+        seq = UnifiedSolverService.compare_scenarios(staff, reqs, {}, scenarios, max_workers=1)
+        par = UnifiedSolverService.compare_scenarios(staff, reqs, {}, scenarios, max_workers=2)
+        for a, b in zip(seq["scenarios"], par["scenarios"]):
+            assert a["status"] == b["status"]
+            assert a["objectiveValue"] == b["objectiveValue"]
+
+    def test_flask_endpoint(self, client):
+        staff, reqs = _base_inputs()
+        body = {
+            "staffList": staff,
+            "requirements": reqs,
+            "scenarios": [{"name": "1名追加", "addStaff": [make_staff("n1", "追加")]}],
+        }
+        response = client.post(
+            "/solverUnifiedScenarios", data=json.dumps(body), content_type="application/json",
+        )
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["scenarios"][0]["name"] == "1名追加"
@@ -0,0 +1,198 @@
+"""Skeleton事前検証（solver.skeleton_validation）のテスト"""
+
+from __future__ import annotations
+
+import copy
+import time
+
+from solver.service import SolverService
+from solver.skeleton_validation import validate_skeleton
+from solver.types import DailyRequirementDict
+
+
+def _types(errors) -> list[str]:
+    return [e["constraintType"] for e in errors]
+
+
+class TestValidateSkeleton:
+
+    def test_valid_fixture(self, staff_list_5, skeleton_5_30, requirements_30):
+        assert validate_skeleton(staff_list_5, skeleton_5_30, requirements_30, {}) == []
+
+    def test_consecutive_work_run(self, staff_list_5, skeleton_5_30, requirements_30):
+        """休日を外して連勤上限超過 → スタッフと区間を特定"""
+        skeleton = copy.deepcopy(skeleton_5_30)
+        skeleton["staffSchedules"][1]["restDays"] = [20, 21, 27, 28]  # s2: 1〜19日が19連勤
+
+        errors = validate_skeleton(staff_list_5, skeleton, requirements_30, {})
+        assert _types(errors) == ["consecutiveWork"]
+        error = errors[0]
+        assert error["staffId"] == "s2"
+        assert error["startDate"] == "2026-03-01"
+        assert error["endDate"] == "2026-03-19"
+        assert error["availableCount"] == 19
+        assert error["requiredCount"] == 6
+
+    def test_staff_limit_is_used(self, staff_list_5, skeleton_5_30, requirements_30):
+        """上限はスタッフごとの maxConsecutiveWorkDays"""
+        staff = copy.deepcopy(staff_list_5)
+        staff[1]["maxConsecutiveWorkDays"] = 4  # s2の休日間隔は最大5日
+        errors = validate_skeleton(staff, skeleton_5_30, requirements_30, {})
+        assert errors
+        assert {e["staffId"] for e in errors} == {"s2"}
+
+    def test_leave_conflict(self, staff_list_5, skeleton_5_30, requirements_30):
+        """休暇申請日に夜勤 → leaveConflict"""
+        errors = validate_skeleton(
+            staff_list_5, skeleton_5_30, requirements_30, {"s1": {"2026-03-10": "有給休暇"}},
+        )
+        assert _types(errors) == ["leaveConflict"]
+        assert errors[0]["staffId"] == "s1"
+        assert errors[0]["date"] == "2026-03-10"
+
+    def test_staff_shortage(self, staff_list_5, skeleton_5_30, requirements_30):
+        """出勤可能人数 < 日勤帯の必要人数合計 → 日付を特定"""
+        reqs = copy.deepcopy(requirements_30)
+        reqs["requirements"]["2026-03-07_日勤"] = DailyRequirementDict(
+            totalStaff=3, requiredQualifications=[], requiredRoles=[],
+        )
+        errors = validate_skeleton(staff_list_5, skeleton_5_30, reqs, {})
+        assert _types(errors) == ["staffShortage"]
+        # 3/7は s2・s3 が休み → 出勤可能3名に対し必要5名
+        assert errors[0]["date"] == "2026-03-07"
+        assert errors[0]["requiredCount"] == 5
+        assert errors[0]["availableCount"] == 3
+
+    def test_no_available_staff(self, staff_list_5, skeleton_5_30, requirements_30):
+        """出勤可能0名の日も実行不能なのでエラーにする"""
+        staff = copy.deepcopy(staff_list_5)
+        for s in staff:
+            s["unavailableDates"] = ["2026-03-09"]
+        errors = validate_skeleton(staff, skeleton_5_30, requirements_30, {})
+        assert _types(errors) == ["staffShortage"]
+        assert errors[0]["date"] == "2026-03-09"
+        assert errors[0]["availableCount"] == 0
+
+    def test_qualification_shortage(self, staff_list_5, skeleton_5_30, requirements_30):
+        reqs = copy.deepcopy(requirements_30)
+        reqs["requirements"]["2026-03-02_早番"] = DailyRequirementDict(
+            totalStaff=1,
+            requiredQualifications=[{"qualification": "介護福祉士", "count": 3}],
+            requiredRoles=[],
+        )
+        errors = validate_skeleton(staff_list_5, skeleton_5_30, reqs, {})
+        assert _types(errors) == ["qualificationMissing"]
+        assert errors[0]["qualification"] == "介護福祉士"
+        assert errors[0]["availableCount"] == 2
+
+    def test_missing_skeleton_is_not_an_error(self, staff_list_5, skeleton_5_30, requirements_30):
+        """Skeletonのないスタッフは固定されず、休暇以外の日は出勤可能として人員判定に数える"""
+        skeleton = copy.deepcopy(skeleton_5_30)
+        skeleton["staffSchedules"].pop()
+        assert validate_skeleton(staff_list_5, skeleton, requirements_30, {}) == []
+
+        reqs = copy.deepcopy(requirements_30)
+        reqs["requirements"]["2026-03-07_日勤"] = DailyRequirementDict(
+            totalStaff=5, requiredQualifications=[], requiredRoles=[],
+        )
+        errors = validate_skeleton(staff_list_5, skeleton, reqs, {})
+        # 3/7は s2・s3 が休み → s1・s4 と Skeletonのない s5 の3名
+        assert _types(errors) == ["staffShortage"]
+        assert errors[0]["availableCount"] == 3
+
+    def test_weekday_restricted_staff(self, staff_list_5, skeleton_5_30, requirements_30):
+        """非対応曜日は統合エンジンと同じく固定休日 → restDays が空でも連勤にならない"""
+        staff = copy.deepcopy(staff_list_5)
+        staff[1]["availableWeekdays"] = [1, 2, 3, 4, 5]  # s2: 月〜金のみ
+        staff[1]["maxConsecutiveWorkDays"] = 5
+        skeleton = copy.deepcopy(skeleton_5_30)
+        skeleton["staffSchedules"][1]["restDays"] = []
+        assert validate_skeleton(staff, skeleton, requirements_30, {}) == []
+
+        # Skeletonのないスタッフも非対応曜日・出勤不可日は出勤可能に数えない
+        skeleton["staffSchedules"].pop()
+        staff[4]["availableWeekdays"] = [1, 2, 3, 4, 5]  # s5
+        staff[3]["unavailableDates"] = ["2026-03-07"]  # s4
+        reqs = copy.deepcopy(requirements_30)
+        reqs["requirements"]["2026-03-07_日勤"] = DailyRequirementDict(
+            totalStaff=2, requiredQualifications=[], requiredRoles=[],
+        )
+        errors = [e for e in validate_skeleton(staff, skeleton, reqs, {})
+                  if e.get("date") == "2026-03-07"]
+        # 3/7（土）は s2・s5 が非対応曜日、s3 が休日、s4 が出勤不可 → s1 のみ
+        assert _types(errors) == ["staffShortage"]
+        assert errors[0]["availableCount"] == 1
+
+    def test_reports_all_errors(self, staff_list_5, skeleton_5_30, requirements_30):
+        """複数の矛盾をまとめて返す"""
+        skeleton = copy.deepcopy(skeleton_5_30)
+        skeleton["staffSchedules"][1]["restDays"] = []
+        skeleton["staffSchedules"][2]["restDays"] = []
+        errors = validate_skeleton(
+            staff_list_5, skeleton, requirements_30, {"s1": {"2026-03-03": "希望休"}},
+        )
+        assert _types(errors).count("consecutiveWork") == 2
+        assert "leaveConflict" in _types(errors)
+
+
+class TestSolverServicePrecheck:
+
+    def test_missing_skeleton_solves_with_warning(
+        self, staff_list_5, skeleton_5_30, requirements_30
+    ):
+        """fixモードでもSkeletonのないスタッフは自由に割り当て、警告を返す"""
+        skeleton = copy.deepcopy(skeleton_5_30)
+        skeleton["staffSchedules"].pop()
+        result = SolverService.solve(staff_list_5, skeleton, requirements_30, {})
+        assert result["success"] is True, result.get("error")
+        missing = [w for w in result["warnings"] if w["constraintType"] == "missingSkeleton"]
+        assert [w["staffId"] for w in missing] == ["s5"]
+        assert len(result["schedule"]) == 5
+
+    def test_invalid_skeleton_skips_cp_sat(
+        self, staff_list_5, skeleton_5_30, requirements_30, monkeypatch
+    ):
+        """矛盾があればCP-SATを呼ばずに構造化エラーを返す"""
+        import solver.service as service
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("CP-SATが呼ばれた")
+
+        monkeypatch.setattr(service.cp_model, "CpSolver", _fail)
+        skeleton = copy.deepcopy(skeleton_5_30)
+        skeleton["staffSchedules"][1]["restDays"] = []
+
+        start = time.time()
+        result = SolverService.solve(staff_list_5, skeleton, requirements_30, {})
+        elapsed = time.time() - start
+
+        assert result["success"] is False
+        assert result["errorType"] == "INFEASIBLE"
+        assert result["details"]["status"] == "SKELETON_INVALID"
+        assert result["details"]["validationErrors"][0]["staffId"] == "s2"
+        assert elapsed < 0.5
+
+    def test_valid_skeleton_solves(self, staff_list_5, skeleton_5_30, requirements_30):
+        result = SolverService.solve(staff_list_5, skeleton_5_30, requirements_30, {})
+        assert result["success"] is True
+
+    def test_weekday_restricted_staff_solves(self, staff_list_5, skeleton_5_30, requirements_30):
+        """事前検証と統合エンジンで固定休日の扱いが一致する"""
+        staff = copy.deepcopy(staff_list_5)
+        staff[1]["availableWeekdays"] = [1, 2, 3, 4, 5]
+        staff[1]["maxConsecutiveWorkDays"] = 5
+        skeleton = copy.deepcopy(skeleton_5_30)
+        skeleton["staffSchedules"][1]["restDays"] = []
+        result = SolverService.solve(staff, skeleton, requirements_30, {})
+        assert result["success"] is True, result.get("details")
+
+    def test_endpoint_returns_422(self, staff_list_5, skeleton_5_30, requirements_30, client):
+        skeleton = copy.deepcopy(skeleton_5_30)
+        skeleton["staffSchedules"][1]["restDays"] = []
+        response = client.post("/solverGenerateShift", json={
+            "staffList": staff_list_5,
+            "skeleton": skeleton,
+            "requirements": requirements_30,
+        })
+        assert response.status_code == 422
+        assert response.get_json()["details"]["validationErrors"]
@@ -0,0 +1,123 @@
+"""トレーシング（solver.tracing）のテスト"""
+
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from solver import tracing
+from solver.service import UnifiedSolverService
+
+
+class _ListExporter:
+    def __init__(self) -> None:
+        self.spans: list[dict] = []
+
+    def export(self, span: dict) -> None:
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exporter():
+    exp = _ListExporter()
+    tracing.set_exporter(exp)
+    yield exp
+    tracing.set_exporter(None)
+
+
+class TestSpans:
+
+    def test_disabled_by_default(self):
+        assert not tracing.enabled()
+        with tracing.span("noop") as sp:
+            assert sp.recording is False
+
+    def test_nesting_and_error_status(self, exporter):
+        with pytest.raises(ValueError):
+            with tracing.span("parent", a=1):
+                with tracing.span("child"):
+                    raise ValueError("boom")
+        child, parent = exporter.spans
+        assert child["parentSpanId"] == parent["spanId"]
+        assert child["traceId"] == parent["traceId"]
+        assert parent["parentSpanId"] is None
+        assert parent["attributes"] == {"a": 1}
+        assert child["status"] == "ERROR"
+        assert "boom" in child["statusMessage"]
+        assert child["endTimeUnixNano"] >= child["startTimeUnixNano"]
+
+    def test_remote_parent(self, exporter):
+        trace_id, span_id = "0af7651916cd43dd8448eb211c80319c", "b7ad6b7169203331"
+        with tracing.start_trace("root", f"00-{trace_id}-{span_id}-01"):
+            assert tracing.current_traceparent().startswith(f"00-{trace_id}-")
+        assert exporter.spans[0]["traceId"] == trace_id
+        assert exporter.spans[0]["parentSpanId"] == span_id
+
+    def test_invalid_traceparent_starts_new_trace(self, exporter):
+        with tracing.start_trace("root", "garbage"):
+            pass
+        assert exporter.spans[0]["parentSpanId"] is None
+        assert len(exporter.spans[0]["traceId"]) == 32
+
+    def test_console_and_file_exporters(self, tmp_path):
+        stream = io.StringIO()
+        tracing.set_exporter(tracing.ConsoleSpanExporter(stream))
+        try:
+            with tracing.span("console"):
+                pass
+            path = tmp_path / "traces.jsonl"
+            tracing.set_exporter(tracing.FileSpanExporter(str(path)))
+            with tracing.span("file1"):
+                pass
+            with tracing.span("file2"):
+                pass
+        finally:
+            tracing.set_exporter(None)
+        assert json.loads(stream.getvalue())["name"] == "console"
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["name"] for line in lines] == ["file1", "file2"]
+
+
+class TestPipelineSpans:
+
+    def test_solve_pipeline_stages(self, exporter, staff_list_5, requirements_30):
+        with tracing.start_trace("test"):
+            result = UnifiedSolverService.solve(staff_list_5, requirements_30, {})
+        assert result["success"] is True
+        by_name = {s["name"]: s for s in exporter.spans}
+        for name in (
+            "model.build", "builder.compute_fixed_rest", "builder.create_variables",
+            "constraint.staffing", "constraint.qualification", "constraint.consecutive_work",
+            "constraint.interval", "objective.preference", "objective.fairness",
+            "objective.rest_spacing", "objective.work_count", "objective.consecutive_soft",
+            "solver.solve", "solution.extract",
+        ):
+            assert name in by_name, name
+
+        build = by_name["model.build"]
+        assert build["attributes"]["solver.staff_count"] == 5
+        assert build["attributes"]["solver.days"] == 31
+        variables = by_name["builder.create_variables"]
+        assert variables["parentSpanId"] == build["spanId"]
+        assert variables["attributes"]["solver.num_variables"] > 0
+        assert by_name["constraint.staffing"]["attributes"]["solver.num_constraints"] > 0
+        assert by_name["solver.solve"]["attributes"]["solver.status"] in ("OPTIMAL", "FEASIBLE")
+        assert len({s["traceId"] for s in exporter.spans}) == 1
+
+    def test_endpoint_root_span(self, exporter, staff_list_5, requirements_30, client):
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        response = client.post(
+            "/solverUnifiedGenerate",
+            json={"staffList": staff_list_5, "requirements": requirements_30},
+            headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+        )
+        assert response.status_code == 200
+        names = [s["name"] for s in exporter.spans]
+        assert {"request.parse", "request.validate", "response.encode"} <= set(names)
+        root = exporter.spans[-1]
+        assert root["name"] == "/solverUnifiedGenerate"
+        assert root["parentSpanId"] == "00f067aa0ba902b7"
+        assert root["attributes"]["http.status_code"] == 200
+        assert {s["traceId"] for s in exporter.spans} == {trace_id}
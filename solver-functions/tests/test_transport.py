@@ -0,0 +1,126 @@
+"""HTTP入出力レイヤー（solver.transport）のテスト"""
+
+import gzip
+import json
+
+import pytest
+
+from solver import transport
+from tests.conftest import make_staff
+
+
+class TestNegotiateEncoding:
+    """Accept-Encodingのネゴシエーション"""
+
+    def test_no_header(self):
+        assert transport.negotiate_encoding(None) is None
+        assert transport.negotiate_encoding("") is None
+
+    def test_gzip(self):
+        assert transport.negotiate_encoding("gzip, deflate") == "gzip"
+
+    def test_q_zero_excluded(self):
+        assert transport.negotiate_encoding("gzip;q=0, identity") is None
+
+    def test_wildcard(self):
+        assert transport.negotiate_encoding("*") in transport.supported_encodings()
+
+
+class TestEncodeResponse:
+    """レスポンスのエンコード・圧縮"""
+
+    def test_small_payload_not_compressed(self):
+        body, headers = transport.encode_response({"success": True}, "gzip")
+        assert "Content-Encoding" not in headers
+        assert json.loads(body) == {"success": True}
+
+    def test_large_payload_gzip(self):
+        payload = {"schedule": [{"date": f"2026-03-{d:02d}", "shiftType": "日勤"} for d in range(1, 32)] * 10}
+        body, headers = transport.encode_response(payload, "gzip")
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Vary"] == "Accept-Encoding"
+        assert json.loads(gzip.decompress(body)) == payload
+
+    def test_non_ascii_not_escaped(self):
+        assert "日勤".encode("utf-8") in transport.dumps({"shiftType": "日勤"})
+
+
+class TestDecompress:
+    """リクエストボディの展開"""
+
+    def test_gzip_roundtrip(self):
+        raw = b'{"a": 1}'
+        assert transport.decompress(gzip.compress(raw), "gzip") == raw
+
+    def test_identity(self):
+        assert transport.decompress(b"{}", "") == b"{}"
+
+    def test_unknown_encoding(self):
+        with pytest.raises(ValueError):
+            transport.decompress(b"{}", "compress")
+
+    def test_size_limit(self, monkeypatch):
+        monkeypatch.setattr(transport, "MAX_REQUEST_BYTES", 100)
+        with pytest.raises(ValueError):
+            transport.decompress(gzip.compress(b"0" * 1000), "gzip")
+
+    def test_brotli_roundtrip(self):
+        brotli = pytest.importorskip("brotli")
+        raw = b'{"a": 1}'
+        assert transport.decompress(brotli.compress(raw), "br") == raw
+
+    def test_brotli_size_limit_is_bounded(self, monkeypatch):
+        """圧縮爆弾: 上限付近で展開を止める（全体の10MBを展開しない）"""
+        brotli = pytest.importorskip("brotli")
+        monkeypatch.setattr(transport, "MAX_REQUEST_BYTES", 100)
+        calls = []
+        real = brotli.Decompressor
+
+        class Recording:
+            def __init__(self):
+                self._d = real()
+
+            def process(self, data, output_buffer_limit=None):
+                out = self._d.process(data, output_buffer_limit=output_buffer_limit)
+                calls.append(len(out))
+                return out
+
+        monkeypatch.setattr(brotli, "Decompressor", Recording)
+        with pytest.raises(ValueError):
+            transport.decompress(brotli.compress(b"0" * 10_000_000), "br")
+        # 出力バッファは上限に達した時点で伸長を止める（ブロック単位の端数のみ超える）
+        assert max(calls) < 100 + 64 * 1024
+
+    def test_corrupt_brotli(self):
+        pytest.importorskip("brotli")
+        with pytest.raises(ValueError):
+            transport.decompress(b"not brotli", "br")
+
+
+class TestFlaskTransport:
+    """Flaskエンドポイントの圧縮リクエスト・レスポンス"""
+
+    def test_gzip_request_and_response(self, requirements_30, client):
+        staff = [make_staff(f"s{i}", f"スタッフ{i}") for i in range(1, 6)]
+        body = {"staffList": staff, "requirements": requirements_30}
+        response = client.post(
+            "/solverUnifiedGenerate",
+            data=gzip.compress(json.dumps(body).encode("utf-8")),
+            content_type="application/json",
+            headers={"Content-Encoding": "gzip", "Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        data = json.loads(gzip.decompress(response.data))
+        assert data["success"] is True
+        assert len(data["schedule"]) == 5
+
+    def test_corrupt_gzip_returns_400(self, client):
+        response = client.post(
+            "/solverUnifiedGenerate",
+            data=b"not gzip",
+            content_type="application/json",
+            headers={"Content-Encoding": "gzip"},
+        )
+        assert response.status_code == 400
+        assert response.get_json()["errorType"] == "VALIDATION_ERROR"
@@ -0,0 +1,217 @@
+"""CP-SATパラメータプロファイル（solver.parameter_profile）とチューニング（solver.tuning）のテスト"""
+
+import json
+
+import pytest
+from ortools.sat.python import cp_model
+
+from solver import tuning
+from solver.parameter_profile import (
+    DEFAULT_SIZE_PROFILES,
+    apply_parameters,
+    load_profile,
+    requirement_tightness,
+    select_profile,
+    size_profiles,
+)
+from solver.service import UnifiedSolverService
+from solver.types import SOLVE_TIME_BUDGET_SEC
+from tests.conftest import make_staff
+
+_SPACE = {
+    "search_branching": ["AUTOMATIC_SEARCH", "FIXED_SEARCH"],
+    "linearization_level": [0, 1],
+}
+_BASE = {"max_time_in_seconds": 1.0}
+
+
+@pytest.fixture(scope="module")
+def tiny_corpus():
+    return tuning.generated_corpus(sizes=(6,), facilities=("day",))
+
+
+def _features(variables=1000, staff=10, night=False, tightness=0.3):
+    return {"numVariables": variables, "staffCount": staff,
+            "nightFacility": night, "tightness": tightness}
+
+
+class TestSizeProfiles:
+
+    def test_select_builtin(self):
+        assert select_profile(_features())["name"] == "small"
+        assert select_profile(_features(variables=60000, staff=300, night=True))["name"] == "large-night"
+        assert select_profile(_features(variables=30000, staff=150))["name"] == "large"
+        assert select_profile(_features(variables=10000, staff=50, tightness=0.7))["name"] == "tight"
+        assert select_profile(_features(variables=10000, staff=50))["name"] == "default"
+
+    def test_small_waits_less_than_large(self):
+        params = {p["name"]: p["parameters"] for p in DEFAULT_SIZE_PROFILES}
+        assert params["small"]["max_time_in_seconds"] < params["default"]["max_time_in_seconds"]
+        assert params["default"]["max_time_in_seconds"] < params["large-night"]["max_time_in_seconds"]
+
+    def test_config_override(self, tmp_path, monkeypatch):
+        """同名は項目単位で上書き、新しい名前は組み込みより先に評価"""
+        path = tmp_path / "profiles.json"
+        path.write_text(json.dumps({"version": 1, "profiles": [
+            {"name": "small", "parameters": {"max_time_in_seconds": 5.0}},
+            {"name": "tiny", "match": {"maxStaff": 3},
+             "parameters": {"max_time_in_seconds": 2.0}},
+        ]}), encoding="utf-8")
+        monkeypatch.setenv("SOLVER_PARAMETER_PROFILES", str(path))
+
+        profiles = size_profiles()
+        assert [p["name"] for p in profiles][:2] == ["tiny", "small"]
+        assert select_profile(_features(staff=2))["name"] == "tiny"
+        small = select_profile(_features())
+        assert small["parameters"]["max_time_in_seconds"] == 5.0
+        assert small["parameters"]["relative_gap_limit"] == 0.05
+
+    def test_config_rejects_unknown_match(self, tmp_path, monkeypatch):
+        path = tmp_path / "profiles.json"
+        path.write_text(json.dumps({"version": 1, "profiles": [
+            {"name": "x", "match": {"maxShifts": 3}, "parameters": {}},
+        ]}), encoding="utf-8")
+        monkeypatch.setenv("SOLVER_PARAMETER_PROFILES", str(path))
+        with pytest.raises(ValueError):
+            size_profiles()
+
+    def test_requirement_tightness(self, requirements_30):
+        # 31日 × 3シフト × 1名 / (5名 × 31日)
+        assert requirement_tightness(requirements_30, 5, 31) == pytest.approx(0.6)
+        assert requirement_tightness(requirements_30, 0, 30) == 0.0
+
+
+class TestSearchSpace:
+
+    def test_grid_configs(self):
+        configs = tuning.grid_configs(_SPACE)
+        assert len(configs) == 4
+        assert {"search_branching": "FIXED_SEARCH", "linearization_level": 0} in configs
+
+    def test_random_configs_reproducible(self):
+        a = tuning.random_configs(10, seed=3)
+        b = tuning.random_configs(10, seed=3)
+        assert a == b
+        assert len(a) == 10
+        assert len({json.dumps(c, sort_keys=True) for c in a}) == 10
+        assert set(a[0]) == set(tuning.PARAMETER_SPACE)
+
+    def test_random_configs_small_space(self):
+        assert len(tuning.random_configs(10, _SPACE)) == 4
+
+
+class TestApplyParameters:
+
+    def test_enum_by_name(self):
+        params = cp_model.CpSolver().parameters
+        apply_parameters(params, {"search_branching": "FIXED_SEARCH", "symmetry_level": 0})
+        assert params.search_branching == params.FIXED_SEARCH
+        assert params.symmetry_level == 0
+
+    def test_unknown_parameter(self):
+        with pytest.raises(ValueError):
+            apply_parameters(cp_model.CpSolver().parameters, {"no_such_param": 1})
+
+
+class TestBenchmark:
+
+    def test_ranked_report_and_profile(self, tiny_corpus, tmp_path):
+        configs = tuning.grid_configs(_SPACE)
+        results = tuning.run_benchmark(configs, tiny_corpus, _BASE)
+
+        assert [r["rank"] for r in results] == [1, 2, 3, 4]
+        keys = [(r["meanGap"], r["meanWallTime"]) for r in results]
+        assert keys == sorted(keys)
+        assert results[0]["solved"] == 1
+        assert results[0]["meanGap"] == 0.0
+        # 解なしはギャップ1.0として解ありの候補より下位になる
+        assert all(r["meanGap"] == 1.0 for r in results if r["solved"] == 0)
+
+        report = tuning.render_report(results, tiny_corpus, _BASE)
+        assert "generated-6-day" in report
+        assert report.count("| 1 |") == 1
+
+        path = tmp_path / "profile.json"
+        path.write_text(json.dumps(tuning.build_profile(results, tiny_corpus)), encoding="utf-8")
+        profile = load_profile(str(path))
+        assert profile["parameters"] == results[0]["parameters"]
+        assert profile["metadata"]["corpus"] == ["generated-6-day"]
+
+    def test_replay_corpus(self, requirements_30, tmp_path):
+        body = {"staffList": [make_staff(f"s{i}", f"スタッフ{i}") for i in range(1, 6)],
+                "requirements": requirements_30}
+        (tmp_path / "march.json").write_text(json.dumps(body, ensure_ascii=False), encoding="utf-8")
+        corpus = tuning.load_corpus(str(tmp_path))
+        assert [c["name"] for c in corpus] == ["march"]
+        assert corpus[0]["leaveRequests"] == {}
+
+    def test_replay_rejects_invalid(self, tmp_path):
+        (tmp_path / "bad.json").write_text(json.dumps({"staffList": []}), encoding="utf-8")
+        with pytest.raises(ValueError):
+            tuning.load_corpus(str(tmp_path))
+
+    def test_cli(self, tmp_path):
+        report, profile = tmp_path / "report.md", tmp_path / "profile.json"
+        code = tuning.main([
+            "--random", "2", "--sizes", "6", "--time-limit", "1",
+            "--report", str(report), "--profile", str(profile),
+        ])
+        assert code == 0
+        assert report.exists()
+        assert set(load_profile(str(profile))["parameters"]) == set(tuning.PARAMETER_SPACE)
+
+
+class TestServiceProfile:
+
+    def _write_profile(self, tmp_path, parameters):
+        path = tmp_path / "profile.json"
+        path.write_text(json.dumps({"version": 1, "name": "t", "parameters": parameters}),
+                        encoding="utf-8")
+        return str(path)
+
+    def test_profile_applied(self, staff_list_5, requirements_30, tmp_path, monkeypatch):
+        """SOLVER_PARAMETER_PROFILE のパラメータが求解に使われる"""
+        seen = {}
+        original = cp_model.CpSolver.Solve
+
+        def _spy(self, model, *args, **kwargs):
+            seen["linearization"] = self.parameters.linearization_level
+            seen["workers"] = self.parameters.num_workers
+            seen["time"] = self.parameters.max_time_in_seconds
+            return original(self, model, *args, **kwargs)
+
+        monkeypatch.setattr(cp_model.CpSolver, "Solve", _spy)
+        monkeypatch.setenv("SOLVER_PARAMETER_PROFILE", self._write_profile(
+            tmp_path, {"linearization_level": 0, "num_workers": 2, "max_time_in_seconds": 10.0},
+        ))
+        result = UnifiedSolverService.solve(staff_list_5, requirements_30, {})
+        assert result["success"] is True
+        assert seen == {"linearization": 0, "workers": 2, "time": 10.0}
+
+        # 決定的時間モードは安全上限・1ワーカーで固定
+        UnifiedSolverService.solve(staff_list_5, requirements_30, {},
+                                   time_limit_mode="deterministic")
+        assert seen == {"linearization": 0, "workers": 1, "time": SOLVE_TIME_BUDGET_SEC}
+
+    def test_profile_echoed(self, staff_list_5, requirements_30):
+        result = UnifiedSolverService.solve(staff_list_5, requirements_30, {})
+        profile = result["solverStats"]["parameterProfile"]
+        assert profile["name"] == "small"
+        assert profile["tunedProfile"] is None
+        assert profile["features"]["staffCount"] == 5
+        assert profile["features"]["nightFacility"] is False
+        assert profile["parameters"]["max_time_in_seconds"] == 10.0
+
+        # 辞書式モードの時間上限はステージごと
+        result = UnifiedSolverService.solve(staff_list_5, requirements_30, {},
+                                            objective_mode="lexicographic",
+                                            stage_time_limit_sec=3.0)
+        assert result["solverStats"]["parameterProfile"]["parameters"]["max_time_in_seconds"] == 3.0
+
+    def test_invalid_profile(self, staff_list_5, requirements_30, tmp_path, monkeypatch):
+        path = tmp_path / "profile.json"
+        path.write_text(json.dumps({"version": 1}), encoding="utf-8")
+        monkeypatch.setenv("SOLVER_PARAMETER_PROFILE", str(path))
+        result = UnifiedSolverService.solve(staff_list_5, requirements_30, {})
+        assert result["success"] is False
+        assert result["errorType"] == "INTERNAL_ERROR"
@@ -6,7 +6,7 @@
 3. 人員充足制約
 4. 連続勤務上限（6日以下）
 5. 遅番→翌日早番の禁止
-6. 夜勤チェーン（夜勤→明け休み→休）
+6. 夜勤チェーン（夜勤→明け休み→休）、夜勤ブロック変数
 7. timeSlotPreference: 日勤のみ
 8. 固定休日（unavailableDates, leaveRequests, 非対応曜日）
 9. 月間勤務日数
@@ -15,10 +15,17 @@
 
 from __future__ import annotations
 
+import os
+import re
+import time
+from types import SimpleNamespace
+
 import pytest
 from ortools.sat.python import cp_model
 
+from solver import lexicographic
 from solver.types import (
+    SOLVE_TIME_BUDGET_SEC,
     DailyRequirementDict,
     ShiftRequirementDict,
     StaffDict,
@@ -225,6 +232,98 @@ class TestNightShiftChain:
                 )
 
 
+class TestNightBlockEncoding:
+    """夜勤ブロック変数（night_encoding="block"）と含意チェーンの比較"""
+
+    def _build(self, encoding: str, days: int = 10):
+        staff = _make_staff_list(6)
+        reqs = _make_requirements(days=days, shift_types=["早番", "日勤", "遅番", "夜勤"])
+        # 要件のない日は非稼働日（固定休日）→ 最後の2日の夜勤はチェーンが完結しない
+        for day in (days - 1, days):
+            del reqs["requirements"][f"2026-03-{day:02d}_夜勤"]
+        builder = UnifiedModelBuilder(staff, reqs, {}, night_encoding=encoding)
+        return builder, builder.build()
+
+    def _solve(self, model, time_limit: float = 5.0):
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = 1
+        solver.parameters.max_time_in_seconds = time_limit
+        return solver, solver.Solve(model)
+
+    def test_smaller_model(self):
+        _, block = self._build("block")
+        _, chain = self._build("chain")
+        assert len(block.Proto().variables) < len(chain.Proto().variables)
+        assert len(block.Proto().constraints) < len(chain.Proto().constraints)
+
+    def _cells(self, builder, solver) -> dict[tuple[str, int], str]:
+        return {
+            (f"s{pos + 1}", day): st
+            for pos, row in enumerate(builder.extract_grid(solver))
+            for day, st in enumerate(row, start=1)
+        }
+
+    def test_solutions_interchangeable(self):
+        """一方の符号化の解を他方に固定しても実行可能（同じ解集合）"""
+        for source, target in (("block", "chain"), ("chain", "block")):
+            builder, model = self._build(source)
+            solver, status = self._solve(model, 5.0)
+            assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            cells = self._cells(builder, solver)
+            assert "夜勤" in cells.values()
+            for (staff_id, day), st in cells.items():
+                if st == "夜勤":
+                    assert cells[(staff_id, day + 1)] == "明け休み"
+                    assert cells[(staff_id, day + 2)] == "休"
+
+            other, other_model = self._build(target)
+            other.fix_cells(cells)
+            other_solver, other_status = self._solve(other_model, 5.0)
+            assert other_status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+            assert self._cells(other, other_solver) == cells
+
+    def test_followup_shares_night_variable(self):
+        builder, _ = self._build("block")
+        night = builder.variables[("s1", 3, "夜勤")]
+        assert builder.variables[("s1", 4, "明け休み")].Index() == night.Index()
+
+    def test_hints_are_deduplicated(self):
+        builder, model = self._build("block")
+        solver, status = self._solve(model)
+        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        builder.add_hints(self._cells(builder, solver))
+        assert model.Validate() == ""
+        hinted = model.Proto().solution_hint.vars
+        assert len(hinted) == len(set(hinted))
+
+    def test_uncoverable_night_is_infeasible(self):
+        """翌日が固定休日で夜勤変数を作れない → 夜勤要件は警告だけでなく実行不能にする"""
+        staff = [make_staff("s1", "A", unavailable_dates=["2026-03-02"])]
+        reqs = _make_requirements(shift_types=["日勤", "夜勤"], total_staff=0)
+        reqs["requirements"]["2026-03-01_夜勤"] = DailyRequirementDict(
+            totalStaff=1, requiredQualifications=[], requiredRoles=[],
+        )
+        for encoding in ("block", "chain"):
+            for presolve in (True, False):
+                builder = UnifiedModelBuilder(
+                    staff, reqs, {}, presolve=presolve, night_encoding=encoding,
+                )
+                _, status = self._solve(builder.build())
+                assert status == cp_model.INFEASIBLE, (encoding, presolve)
+
+        builder = UnifiedModelBuilder(staff, reqs, {}, coverage_mode="soft")
+        solver, status = self._solve(builder.build())
+        assert status == cp_model.OPTIMAL
+        assert [(s["date"], s["shortage"]) for s in builder.extract_shortages(solver)] == [
+            ("2026-03-01", 1),
+        ]
+
+    def test_unknown_encoding(self):
+        with pytest.raises(ValueError):
+            UnifiedModelBuilder(_make_staff_list(3), _make_requirements(), {},
+                                night_encoding="pattern")
+
+
 class TestTimeSlotPreference:
     """timeSlotPreferenceテスト"""
 
@@ -318,7 +417,7 @@ class TestPreValidationWarnings:
     """事前検証警告のテスト"""
 
     def test_all_staff_fixed_rest_staffing_warning(self):
-        """全スタッフが同日に固定休日 → staffShortage警告"""
+        """全スタッフが同日に固定休日 → INFEASIBLE（原因を staffShortage 警告で返す）"""
         # 全員が3/5に出勤不可
         staff = [
             make_staff(f"s{i}", f"スタッフ{i}", unavailable_dates=["2026-03-05"])
@@ -327,7 +426,8 @@ class TestPreValidationWarnings:
         reqs = _make_requirements(days=31, total_staff=1)
         result = UnifiedSolverService.solve(staff, reqs, {})
 
-        assert result["success"] is True
+        assert result["success"] is False
+        assert result["errorType"] == "INFEASIBLE"
         warnings = result["warnings"]
         # 3/5の全シフト(早番,日勤,遅番)で警告
         staff_shortage = [
@@ -397,7 +497,7 @@ class TestPreValidationWarnings:
         assert result["warnings"] == []
 
     def test_leave_requests_cause_warning(self):
-        """全員が同日に休暇申請 → staffShortage警告"""
+        """全員が同日に休暇申請 → INFEASIBLE（原因を staffShortage 警告で返す）"""
         staff = _make_staff_list(5)
         reqs = _make_requirements(days=31, total_staff=1)
         leave = {
@@ -405,7 +505,7 @@ class TestPreValidationWarnings:
         }
         result = UnifiedSolverService.solve(staff, reqs, leave)
 
-        assert result["success"] is True
+        assert result["success"] is False
         shortage = [
             w for w in result["warnings"]
             if w["constraintType"] == "staffShortage" and w["date"] == "2026-03-15"
@@ -556,3 +656,516 @@ class TestConsecutiveWorkSoft:
 
         assert result["success"] is True
         assert result["solverStats"]["status"] in ("OPTIMAL", "FEASIBLE")
+
+
+class TestBulkExtraction:
+    """solutionベクトル一括読み出しのテスト"""
+
+    def test_matches_per_variable_values(self):
+        """一括読み出し結果がsolver.Value()による逐次読み出しと一致"""
+        staff = _make_staff_list(6)
+        staff[0]["unavailableDates"] = ["2026-03-10"]
+        reqs = _make_requirements(shift_types=["早番", "日勤", "遅番", "夜勤"])
+        builder = UnifiedModelBuilder(staff, reqs, {"s2": {"2026-03-05": "希望休"}})
+        model = builder.build()
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = 10.0
+        solver.parameters.num_workers = 1
+        status = solver.Solve(model)
+        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+        schedule = builder.extract_solution(solver)
+        assert [s["staffId"] for s in schedule] == [s["id"] for s in staff]
+        for s, staff_schedule in zip(staff, schedule):
+            assert len(staff_schedule["monthlyShifts"]) == 31
+            for day, shift in enumerate(staff_schedule["monthlyShifts"], start=1):
+                assert shift["date"] == f"2026-03-{day:02d}"
+                expected = "休"
+                for (sid, d, st), var in builder.variables.items():
+                    if sid == s["id"] and d == day and solver.Value(var) == 1:
+                        expected = st
+                assert shift["shiftType"] == expected
+
+
+class TestCrossMonthCarryOver:
+    """月またぎ（previousMonthTail / nextMonthOverlapDays）のテスト"""
+
+    def _shift(self, result, staff_id, day):
+        schedule = next(s for s in result["schedule"] if s["staffId"] == staff_id)
+        return schedule["monthlyShifts"][day - 1]["shiftType"]
+
+    def test_night_chain_from_previous_month(self):
+        """前月末日が夜勤 → 1日目明け休み・2日目休"""
+        staff = _make_staff_list(6)
+        reqs = _make_requirements(shift_types=["早番", "日勤", "遅番", "夜勤"])
+        result = UnifiedSolverService.solve(
+            staff, reqs, {},
+            previous_month_tail={"s1": ["日勤", "夜勤"], "s2": ["夜勤", "明け休み"]},
+        )
+        assert result["success"] is True
+        assert self._shift(result, "s1", 1) == "明け休み"
+        assert self._shift(result, "s1", 2) == "休"
+        assert self._shift(result, "s2", 1) == "休"
+
+    def test_consecutive_run_from_previous_month(self):
+        """前月末から6連勤中 → 1日目は休み"""
+        staff = _make_staff_list(5)
+        reqs = _make_requirements(total_staff=1)
+        result = UnifiedSolverService.solve(
+            staff, reqs, {},
+            previous_month_tail={"s1": ["日勤"] * 6, "s2": ["休"] + ["早番"] * 5},
+        )
+        assert result["success"] is True
+        assert self._shift(result, "s1", 1) == "休"
+        # s2は5連勤中 → 1-2日目のどちらかが休み
+        assert "休" in (self._shift(result, "s2", 1), self._shift(result, "s2", 2))
+
+    def test_late_to_early_across_boundary(self):
+        """前月末日が遅番 → 1日目の早番禁止"""
+        staff = _make_staff_list(5)
+        reqs = _make_requirements(total_staff=1)
+        tail = {s["id"]: ["遅番"] for s in staff[:4]}
+        result = UnifiedSolverService.solve(staff, reqs, {}, previous_month_tail=tail)
+        assert result["success"] is True
+        for staff_id in tail:
+            assert self._shift(result, staff_id, 1) != "早番"
+
+    def test_overlap_enables_month_end_nights(self):
+        """翌月重なり2日 → 月末2日間も夜勤を配置できる"""
+        staff = _make_staff_list(8)
+        reqs = _make_requirements(shift_types=["早番", "日勤", "遅番", "夜勤"])
+
+        without = UnifiedModelBuilder(staff, reqs, {})
+        without.build()
+        assert ("s1", 31, "夜勤") not in without.variables
+
+        result = UnifiedSolverService.solve(staff, reqs, {}, next_month_overlap_days=2)
+        assert result["success"] is True
+        for day in (30, 31):
+            nights = sum(
+                1 for s in result["schedule"]
+                if s["monthlyShifts"][day - 1]["shiftType"] == "夜勤"
+            )
+            assert nights >= 1
+        for s in result["schedule"]:
+            assert len(s["monthlyShifts"]) == 31
+            # 30日夜勤なら31日は明け休み
+            if s["monthlyShifts"][29]["shiftType"] == "夜勤":
+                assert s["monthlyShifts"][30]["shiftType"] == "明け休み"
+
+
+class TestLexicographicObjective:
+    """辞書式（lexicographic）目的関数モードのテスト"""
+
+    def test_objective_stages_cover_weighted_sum(self):
+        """ステージ別の項の合計が重み付き目的関数と一致"""
+        staff = _make_staff_list(10)
+        staff[0]["timeSlotPreference"] = "日勤のみ"
+        reqs = _make_requirements(shift_types=["早番", "日勤", "遅番", "夜勤"])
+        builder = UnifiedModelBuilder(staff, reqs, {})
+        model = builder.build()
+        stages = builder.objective_stages
+        assert set(stages) == {
+            "preference", "fairness", "nightFairness",
+            "restSpacing", "workCount", "consecutiveSoft",
+        }
+        assert all(stages[name] for name in ("preference", "nightFairness", "workCount"))
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = 10.0
+        solver.parameters.num_workers = 1
+        status = solver.Solve(model)
+        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        all_terms = [t for terms in stages.values() for t in terms]
+        assert int(solver.Value(sum(all_terms))) == int(solver.ObjectiveValue())
+
+    def test_lexicographic_solve(self):
+        """辞書式モードで求解でき、ステージ報告が優先順に並ぶ"""
+        staff = _make_staff_list(10)
+        staff[0]["timeSlotPreference"] = "日勤のみ"
+        reqs = _make_requirements(shift_types=["早番", "日勤", "遅番", "夜勤"])
+        result = UnifiedSolverService.solve(
+            staff, reqs, {},
+            objective_mode="lexicographic",
+            stage_time_limit_sec=2.0,
+        )
+        assert result["success"] is True
+        stages = result["solverStats"]["objectiveStages"]
+        names = [s["stage"] for s in stages]
+        assert names[:3] == ["preference", "nightFairness", "workCount"]
+        assert all(s["value"] is not None for s in stages)
+
+        # 第1ステージ（日勤のみ希望）の達成値は最終解でも維持される
+        s1 = next(s for s in result["schedule"] if s["staffId"] == "s1")
+        day_count = sum(1 for x in s1["monthlyShifts"] if x["shiftType"] == "日勤")
+        assert day_count * 10 >= stages[0]["value"]
+
+    def test_custom_priority(self):
+        staff = _make_staff_list(5)
+        reqs = _make_requirements()
+        result = UnifiedSolverService.solve(
+            staff, reqs, {},
+            objective_mode="lexicographic",
+            objective_priority=["restSpacing", "fairness"],
+            stage_time_limit_sec=2.0,
+        )
+        assert result["success"] is True
+        assert [s["stage"] for s in result["solverStats"]["objectiveStages"]] == [
+            "restSpacing", "fairness",
+        ]
+
+    def test_stages_share_one_deadline(self, monkeypatch):
+        """各ステージは min(ステージ上限, 残り時間)、締め切り後のステージは SKIPPED"""
+        model = cp_model.CpModel()
+        x = [model.NewBoolVar(f"x{i}") for i in range(3)]
+        stages = {"a": [x[0]], "b": [x[1]], "c": [x[2]]}
+        clock = iter(range(100))  # time.monotonic() を呼ぶたびに1秒進む
+        monkeypatch.setattr(lexicographic, "time", SimpleNamespace(
+            monotonic=lambda: next(clock), time=time.time,
+        ))
+        limits = []
+        real_solve = cp_model.CpSolver.Solve
+
+        def solve(self, model):
+            limits.append(self.parameters.max_time_in_seconds)
+            return real_solve(self, model)
+
+        monkeypatch.setattr(cp_model.CpSolver, "Solve", solve)
+        _, status, reports = lexicographic.solve_lexicographic(
+            model, stages, ["a", "b", "c"], stage_time_limit_sec=1.2,
+            total_time_limit_sec=2.5, parameters={"max_time_in_seconds": 30.0},
+        )
+        assert status == cp_model.OPTIMAL
+        # 締め切り 2.5 に対し a: min(1.2, 1.5) / b: min(1.2, 0.5) / c: 残りなし
+        assert limits == [1.2, 0.5]
+        assert [(r["stage"], r["status"]) for r in reports] == [
+            ("a", "OPTIMAL"), ("b", "OPTIMAL"), ("c", "SKIPPED"),
+        ]
+
+    def test_invalid_mode_returns_400(self, client):
+        body = {"staffList": [], "requirements": {}, "objectiveMode": "random"}
+        response = client.post("/solverUnifiedGenerate", json=body)
+        assert response.status_code == 400
+
+
+class TestDerivedVariables:
+    """派生変数レイヤー（勤務日リテラル・シフト回数IntVar）のテスト"""
+
+    def test_work_and_counts_match_solution(self):
+        """勤務日リテラル・回数IntVarが解のシフトと一致"""
+        staff = _make_staff_list(10)
+        staff[0]["timeSlotPreference"] = "日勤のみ"
+        staff[1]["unavailableDates"] = ["2026-03-10"]
+        reqs = _make_requirements(shift_types=["早番", "日勤", "遅番", "夜勤"])
+        builder = UnifiedModelBuilder(staff, reqs, {})
+        model = builder.build()
+        derived = builder.derived
+
+        # 固定休日には勤務日リテラルがない
+        assert derived.work("s2", 10) is None
+        # 日勤のみ → 勤務系変数が1つなので変数自身を共有
+        assert derived.work("s1", 5) is builder.variables[("s1", 5, "日勤")]
+        assert derived.count("s1", "夜勤") is None
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = 10.0
+        solver.parameters.num_workers = 1
+        status = solver.Solve(model)
+        assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+        for s in builder.extract_solution(solver):
+            sid = s["staffId"]
+            shifts = [x["shiftType"] for x in s["monthlyShifts"]]
+            for day, st in enumerate(shifts, start=1):
+                work = derived.work(sid, day)
+                expected = st in ("早番", "日勤", "遅番", "夜勤")
+                assert (solver.Value(work) == 1 if work is not None else False) == expected
+            for st in ("早番", "日勤", "遅番", "夜勤"):
+                count = derived.count(sid, st)
+                if count is not None:
+                    assert solver.Value(count) == shifts.count(st)
+            total = sum(solver.Value(c) for c in derived.work_counts(sid))
+            assert total == sum(1 for x in shifts if x in ("早番", "日勤", "遅番", "夜勤"))
+
+    def test_consecutive_window_uses_day_literals(self):
+        """連勤ウィンドウの制約は日数単位（変数数でなく勤務日数で判定）"""
+        staff = _make_staff_list(5)
+        for s in staff:
+            s["maxConsecutiveWorkDays"] = 3
+        reqs = _make_requirements()
+        result = UnifiedSolverService.solve(staff, reqs, {})
+        assert result["success"] is True
+        for s in result["schedule"]:
+            run = 0
+            for x in s["monthlyShifts"]:
+                run = run + 1 if x["shiftType"] in ("早番", "日勤", "遅番") else 0
+                assert run <= 3
+
+
+class TestSkeletonInput:
+    """Skeleton入力（fix/hint）を統合エンジンで扱うテスト"""
+
+    def test_fix_mode_follows_skeleton(self, staff_list_5, skeleton_5_30, requirements_30):
+        """fix: 休日・夜勤・明け日がSkeletonどおり、その他の日は日勤帯"""
+        from solver.service import SolverService
+        from solver.unified_builder import skeleton_cells
+
+        result = SolverService.solve(staff_list_5, skeleton_5_30, requirements_30, {})
+        assert result["success"] is True, result.get("error")
+        stats = result["solverStats"]
+        assert stats["skeletonMode"] == "fix"
+        assert stats["skeletonSkippedCells"] == 0
+
+        cells = skeleton_cells(skeleton_5_30, 31)
+        for s in result["schedule"]:
+            for day, x in enumerate(s["monthlyShifts"], start=1):
+                expected = cells.get((s["staffId"], day))
+                if expected is None:
+                    assert x["shiftType"] in ("早番", "日勤", "遅番")
+                else:
+                    assert x["shiftType"] == expected
+        s1 = next(s for s in result["schedule"] if s["staffId"] == "s1")
+        assert [x["shiftType"] for x in s1["monthlyShifts"][2:5]] == ["夜勤", "明け休み", "休"]
+
+    def test_hint_mode_solves(self, staff_list_5, skeleton_5_30, requirements_30):
+        """hint: 事前検証なしで求解し、適用セル数を返す"""
+        from solver.service import SolverService
+
+        skeleton = {"staffSchedules": [
+            dict(s, restDays=[]) for s in skeleton_5_30["staffSchedules"]
+        ]}
+        result = SolverService.solve(
+            staff_list_5, skeleton, requirements_30, {}, skeleton_mode="hint",
+        )
+        assert result["success"] is True, result.get("error")
+        assert result["solverStats"]["skeletonMode"] == "hint"
+        assert result["solverStats"]["skeletonAppliedCells"] > 0
+
+    def test_unappliable_cells_are_skipped(self, staff_list_5, skeleton_5_30, requirements_30):
+        """日勤のみスタッフの夜勤日・固定休日の勤務はスキップとして数える"""
+        staff = [dict(s) for s in staff_list_5]
+        staff[0]["timeSlotPreference"] = "日勤のみ"
+        staff[1]["unavailableDates"] = ["2026-03-02"]
+        builder = UnifiedModelBuilder(
+            staff, requirements_30, {}, skeleton=skeleton_5_30, skeleton_mode="hint",
+        )
+        builder.build()
+        # s1の夜勤2日 + 明け休み2日、s2の3/2（勤務指定だが固定休日）
+        assert builder.skeleton_stats["skeletonSkippedCells"] == 5
+
+    def test_endpoint_rejects_unknown_mode(
+        self, staff_list_5, skeleton_5_30, requirements_30, client
+    ):
+        response = client.post("/solverGenerateShift", json={
+            "staffList": staff_list_5,
+            "skeleton": skeleton_5_30,
+            "requirements": requirements_30,
+            "skeletonMode": "soft",
+        })
+        assert response.status_code == 400
+        (error,) = response.get_json()["details"]["validationErrors"]
+        assert error["path"] == "skeletonMode"
+        assert error["allowedValues"] == ["fix", "hint"]
+
+
+def _burn_cpu(seconds: float) -> None:
+    """CPU競合の再現用（別プロセスで空回り）"""
+    import time
+
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+class TestDeterministicTimeLimit:
+    """timeLimitMode="deterministic"（決定的時間による打ち切り）のテスト"""
+
+    def _solve(self, **kwargs):
+        staff = _make_staff_list(10)
+        reqs = _make_requirements(shift_types=["早番", "日勤", "遅番", "夜勤"])
+        return UnifiedSolverService.solve(staff, reqs, {}, **kwargs)
+
+    def test_limit_scales_with_size(self):
+        from solver.service import DETERMINISTIC_TIME_MAX, deterministic_time_limit
+
+        assert deterministic_time_limit(1000) < deterministic_time_limit(10000)
+        assert deterministic_time_limit(10**7) == DETERMINISTIC_TIME_MAX
+
+    def test_reports_deterministic_time(self):
+        result = self._solve()
+        stats = result["solverStats"]
+        assert stats["timeLimitMode"] == "wallclock"
+        assert stats["deterministicTime"] > 0
+
+    def test_identical_under_cpu_contention(self):
+        """CPU競合下でも同一入力 → 同一の解・同一の決定的時間"""
+        import multiprocessing
+
+        limit = {"time_limit_mode": "deterministic", "max_deterministic_time": 0.3}
+        baseline = self._solve(**limit)
+        assert baseline["success"] is True
+        assert baseline["solverStats"]["deterministicTime"] <= 0.3 + 0.05
+
+        ctx = multiprocessing.get_context("spawn")
+        burners = [ctx.Process(target=_burn_cpu, args=(5.0,)) for _ in range(2)]
+        for p in burners:
+            p.start()
+        try:
+            loaded = self._solve(**limit)
+        finally:
+            for p in burners:
+                p.terminate()
+                p.join()
+
+        assert loaded["schedule"] == baseline["schedule"]
+        assert loaded["solverStats"]["objectiveValue"] == baseline["solverStats"]["objectiveValue"]
+        assert loaded["solverStats"]["deterministicTime"] == baseline["solverStats"]["deterministicTime"]
+
+    def test_lexicographic_stage_reports(self):
+        result = self._solve(
+            objective_mode="lexicographic",
+            time_limit_mode="deterministic",
+            max_deterministic_time=0.2,
+        )
+        assert result["success"] is True
+        stages = result["solverStats"]["objectiveStages"]
+        assert all(s["deterministicTime"] <= 0.2 + 0.05 for s in stages)
+        assert result["solverStats"]["deterministicTime"] == pytest.approx(
+            sum(s["deterministicTime"] for s in stages), abs=1e-3,
+        )
+
+    def test_wall_cap_below_endpoint_timeout(self, monkeypatch):
+        """壁時計の安全上限はエンドポイントのタイムアウト（main.py の timeout_sec）より短く、
+        辞書式モードでは全ステージで共有する"""
+        main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+        with open(main_py, encoding="utf-8") as f:
+            timeouts = [int(t) for t in re.findall(r"timeout_sec=(\d+)", f.read())]
+        assert timeouts and SOLVE_TIME_BUDGET_SEC < min(timeouts)
+
+        seen = {}
+        real = lexicographic.solve_lexicographic
+
+        def spy(*args, **kwargs):
+            seen.update(stage=args[3], total=kwargs["total_time_limit_sec"])
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(lexicographic, "solve_lexicographic", spy)
+        result = self._solve(
+            objective_mode="lexicographic", time_limit_mode="deterministic",
+            max_deterministic_time=0.2,
+        )
+        assert result["success"] is True
+        assert seen == {"stage": SOLVE_TIME_BUDGET_SEC, "total": SOLVE_TIME_BUDGET_SEC}
+
+    def test_endpoint_rejects_unknown_mode(self, client):
+        response = client.post("/solverUnifiedGenerate", json={
+            "staffList": _make_staff_list(3),
+            "requirements": _make_requirements(),
+            "timeLimitMode": "cpu",
+        })
+        assert response.status_code == 400
+        (error,) = response.get_json()["details"]["validationErrors"]
+        assert error["path"] == "timeLimitMode"
+        assert error["allowedValues"] == ["wallclock", "deterministic"]
+
+
+class TestSoftCoverage:
+    """coverageMode="soft"（要員不足を許して不足一覧を返す）のテスト"""
+
+    def _short_staffed(self):
+        """看護師2名が必要だが看護師は1名、10日は全員休み"""
+        staff = _make_staff_list(5)
+        staff[0]["qualifications"] = ["看護師"]
+        for s in staff:
+            s["unavailableDates"] = ["2026-03-10"]
+        reqs = _make_requirements(days=14, shift_types=["日勤"])
+        nurse = DailyRequirementDict(
+            totalStaff=2,
+            requiredQualifications=[{"qualification": "看護師", "count": 2}],
+            requiredRoles=[],
+        )
+        reqs["requirements"] = {key: nurse for key in reqs["requirements"]}
+        return staff, reqs
+
+    def test_hard_mode_infeasible(self):
+        staff, reqs = self._short_staffed()
+        result = UnifiedSolverService.solve(staff, reqs, {})
+        assert result["success"] is False
+        assert result["errorType"] == "INFEASIBLE"
+
+    def test_returns_exact_shortages(self):
+        staff, reqs = self._short_staffed()
+        result = UnifiedSolverService.solve(staff, reqs, {}, coverage_mode="soft")
+        assert result["success"] is True, result.get("error")
+
+        on_shift: dict[str, list[str]] = {}
+        for s in result["schedule"]:
+            for shift in s["monthlyShifts"]:
+                if shift["shiftType"] == "日勤":
+                    on_shift.setdefault(shift["date"], []).append(s["staffId"])
+        expected = []
+        for day in range(1, 15):
+            date = f"2026-03-{day:02d}"
+            assigned = on_shift.get(date, [])
+            if len(assigned) < 2:
+                expected.append((date, "", 2 - len(assigned)))
+            nurses = sum(1 for sid in assigned if sid == "s1")
+            expected.append((date, "看護師", 2 - nurses))
+        shortages = result["shortages"]
+        assert sorted(
+            (s["date"], s.get("qualification", ""), s["shortage"]) for s in shortages
+        ) == sorted(expected)
+        # 全員休みの10日は全員分の不足
+        day10 = [s for s in shortages if s["date"] == "2026-03-10"]
+        assert all(s["assignedCount"] == 0 and s["shortage"] == 2 for s in day10)
+        assert result["solverStats"]["totalShortage"] == sum(s["shortage"] for s in shortages)
+
+    def test_no_shortage_when_staffed(self):
+        staff = _make_staff_list(5)
+        reqs = _make_requirements(total_staff=1)
+        result = UnifiedSolverService.solve(staff, reqs, {}, coverage_mode="soft")
+        assert result["success"] is True
+        assert result["shortages"] == []
+        assert result["solverStats"]["coverageMode"] == "soft"
+
+    def test_fully_coverable_has_no_shortage(self):
+        """充足可能なら重み付きモードでも不足を残さない（不足は先行ステージで0に固定）"""
+        staff = _make_staff_list(8)
+        reqs = _make_requirements(total_staff=2)
+        assert UnifiedSolverService.solve(staff, reqs, {})["success"] is True
+
+        result = UnifiedSolverService.solve(staff, reqs, {}, coverage_mode="soft")
+        assert result["success"] is True, result.get("error")
+        assert result["shortages"] == []
+        assert result["solverStats"]["totalShortage"] == 0
+        stages = result["solverStats"]["objectiveStages"]
+        assert [s["stage"] for s in stages] == ["coverage", "weighted"]
+        assert stages[0]["status"] == "OPTIMAL"
+        assert stages[0]["value"] == 0
+
+    def test_lexicographic_minimizes_shortage_first(self):
+        staff, reqs = self._short_staffed()
+        result = UnifiedSolverService.solve(
+            staff, reqs, {}, coverage_mode="soft",
+            objective_mode="lexicographic", stage_time_limit_sec=5.0,
+        )
+        assert result["success"] is True
+        stages = result["solverStats"]["objectiveStages"]
+        assert stages[0]["stage"] == "coverage"
+        assert stages[0]["value"] == -1000 * result["solverStats"]["totalShortage"]
+
+    def test_endpoint(self, client):
+        staff, reqs = self._short_staffed()
+        response = client.post("/solverUnifiedGenerate", json={
+            "staffList": staff, "requirements": reqs, "coverageMode": "soft",
+        })
+        assert response.status_code == 200
+        assert response.get_json()["shortages"]
+
+        response = client.post("/solverUnifiedGenerate", json={
+            "staffList": staff, "requirements": reqs, "coverageMode": "partial",
+        })
+        assert response.status_code == 400
+        (error,) = response.get_json()["details"]["validationErrors"]
+        assert error["path"] == "coverageMode"
+        assert error["allowedValues"] == ["hard", "soft"]
@@ -4,16 +4,23 @@
 - 15名: < 5秒
 - 50名: < 15秒
 - 100名: < 30秒（Phase 3目標）
+- モデル構築（求解なし）: 100/300/500名で変数数・制約数が線形にスケール
+- 構築時間の計測は SOLVER_BENCHMARK=1 のときのみ（共有CIでは壁時計を検証しない）。
+  目標「500名で1秒を十分下回る」は未達: 単一コア環境で約1.0〜1.2秒
+  （大半はortoolsの変数生成コスト）
 """
 
 from __future__ import annotations
 
+import gc
+import os
 import time
 
 import pytest
 
 from solver.types import DailyRequirementDict, ShiftRequirementDict
 from solver.service import UnifiedSolverService
+from solver.unified_builder import UnifiedModelBuilder
 from tests.conftest import make_staff
 
 
@@ -165,3 +172,79 @@ class TestScalability4Shifts:
         stats = result["solverStats"]
         print(f"\n50名×4シフト: {elapsed:.2f}秒, status={stats['status']}, "
               f"vars={stats['numVariables']}, constraints={stats['numConstraints']}")
+
+
+def _build_time(staff: list, reqs: ShiftRequirementDict, repeat: int = 3) -> float:
+    """UnifiedModelBuilder.build() の所要時間（repeat回の最小値、GC停止）"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            UnifiedModelBuilder(staff, reqs, {}).build()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def _model_size(n: int) -> tuple[int, int]:
+    """n名×3シフト×31日のモデルの (変数数, 制約数)"""
+    proto = UnifiedModelBuilder(
+        _make_staff_n(n), _make_reqs(total_staff=max(2, n // 10)), {},
+    ).build().Proto()
+    return len(proto.variables), len(proto.constraints)
+
+
+class TestBuildSize:
+    """モデル構築の規模（100/300/500名×3シフト×31日）"""
+
+    @pytest.mark.slow
+    def test_model_size_scales_linearly(self):
+        sizes = {n: _model_size(n) for n in (100, 300, 500)}
+        for n, (num_vars, num_constraints) in sizes.items():
+            print(f"\n{n}名: 変数{num_vars}, 制約{num_constraints}")
+        # 1名あたりの変数数・制約数が規模によらずほぼ一定
+        for i in range(2):
+            per_staff_100 = sizes[100][i] / 100
+            assert sizes[500][i] / 500 < 1.05 * per_staff_100
+            assert sizes[500][i] / 500 > 0.95 * per_staff_100
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(not os.environ.get("SOLVER_BENCHMARK"), reason="SOLVER_BENCHMARK=1 で実行")
+class TestBuildTimeBenchmark:
+    """モデル構築時間のマイクロベンチマーク（opt-in）"""
+
+    def test_build_time_scales_linearly(self):
+        times = {}
+        for n in (100, 300, 500):
+            times[n] = _build_time(_make_staff_n(n), _make_reqs(total_staff=max(2, n // 10)))
+            print(f"\n構築 {n}名: {times[n] * 1000:.0f}ms ({times[n] / n * 1000:.2f}ms/名)")
+
+        # 1名あたりの構築時間が規模によらずほぼ一定（線形スケール）
+        assert times[500] / 500 < 1.5 * times[100] / 100
+
+    def test_role_and_qualification_requirements_build_time(self):
+        """資格・役職要件（日×シフトごとに4件）を加えても構築時間はほぼ変わらない（300名）"""
+        staff = _make_staff_n(300)
+        plain = _make_reqs(total_staff=30)
+        daily_req = DailyRequirementDict(
+            totalStaff=30,
+            requiredQualifications=[
+                {"qualification": "看護師", "count": 1},
+                {"qualification": "介護福祉士", "count": 2},
+            ],
+            requiredRoles=[
+                {"role": "看護職員", "count": 1},
+                {"role": "介護職員", "count": 5},
+            ],
+        )
+        with_groups = ShiftRequirementDict(
+            plain, requirements={key: daily_req for key in plain["requirements"]},
+        )
+        base = _build_time(staff, plain)
+        grouped = _build_time(staff, with_groups)
+        print(f"\n構築 300名: 要件なし {base * 1000:.0f}ms, 資格・役職要件あり {grouped * 1000:.0f}ms")
+        assert grouped < base * 1.10 + 0.02
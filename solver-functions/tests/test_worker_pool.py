@@ -0,0 +1,158 @@
+"""求解ワーカープール（solver.worker_pool）のテスト"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from solver.worker_pool import PoolDeadlineError, PoolSaturatedError, SolverPool
+
+
+def _sleep_job(seconds: float) -> dict:
+    """ワーカーで実行するダミーの求解（spawn先から import できるモジュールレベル関数）"""
+    time.sleep(seconds)
+    return {"success": True, "solverStats": {"status": "OPTIMAL"}}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """1ワーカー・待機1件のプール（spawnの起動コストをモジュール内で共有）"""
+    p = SolverPool(workers=1, queue_size=1, deadline_sec=10.0)
+    yield p
+    p.shutdown()
+
+
+def _wait_idle(pool: SolverPool) -> None:
+    while pool.stats()["inFlight"]:
+        time.sleep(0.01)
+
+
+class TestSolverPool:
+
+    def test_run_reports_queue_stats(self, pool):
+        result = pool.run(_sleep_job, {"seconds": 0.0})
+        assert result["success"] is True
+        assert result["solverStats"]["queueDepth"] == 0
+        assert result["solverStats"]["queueWaitMs"] >= 0
+        _wait_idle(pool)
+        assert pool.stats()["completed"] >= 1
+
+    def test_saturated_pool_rejects(self, pool):
+        """実行中1件＋待機1件で満杯 → 3件目は即座に拒否"""
+        threads = [
+            threading.Thread(target=pool.run, args=(_sleep_job, {"seconds": 0.5}))
+            for _ in range(2)
+        ]
+        for t in threads:
+            t.start()
+        while pool.stats()["inFlight"] < 2:
+            time.sleep(0.01)
+
+        rejected = pool.stats()["rejected"]
+        start = time.time()
+        with pytest.raises(PoolSaturatedError):
+            pool.run(_sleep_job, {"seconds": 0.0})
+        assert time.time() - start < 0.1
+        assert pool.stats()["rejected"] == rejected + 1
+        assert pool.stats()["queueDepth"] == 1
+
+        for t in threads:
+            t.join()
+        _wait_idle(pool)
+
+    def test_deadline_exceeded(self, pool):
+        exceeded = pool.stats()["deadlineExceeded"]
+        with pytest.raises(PoolDeadlineError):
+            pool.run(_sleep_job, {"seconds": 0.5}, deadline_sec=0.1)
+        assert pool.stats()["deadlineExceeded"] == exceeded + 1
+        _wait_idle(pool)
+
+    def test_expired_queued_job_is_skipped(self, pool):
+        """期限切れ後にワーカーへ渡ったジョブは求解せず、完了件数にも数えない"""
+        blocker = threading.Thread(target=pool.run, args=(_sleep_job, {"seconds": 0.5}))
+        blocker.start()
+        while pool.stats()["inFlight"] < 1:
+            time.sleep(0.01)
+        with pytest.raises(PoolDeadlineError):
+            pool.run(_sleep_job, {"seconds": 5.0}, deadline_sec=0.1)
+        blocker.join()
+        completed = pool.stats()["completed"]
+
+        start = time.time()
+        _wait_idle(pool)
+        assert time.time() - start < 2.0  # 5秒のジョブは実行されない
+        assert pool.stats()["completed"] == completed
+
+
+class _StubPool:
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+    def run(self, fn, kwargs, deadline_sec=None):
+        raise self.error
+
+    def stats(self) -> dict:
+        return {"workers": 1, "queueDepth": 1}
+
+
+class TestEndpointBackpressure:
+
+    def _post(self, client, staff_list_5, requirements_30):
+        return client.post("/solverUnifiedGenerate", json={
+            "staffList": staff_list_5,
+            "requirements": requirements_30,
+        })
+
+    def test_saturated_returns_429(self, staff_list_5, requirements_30, client, monkeypatch):
+        import solver.main as main
+
+        monkeypatch.setattr(main, "_pool", _StubPool(PoolSaturatedError("満杯")))
+        response = self._post(client, staff_list_5, requirements_30)
+        assert response.status_code == 429
+        data = response.get_json()
+        assert data["errorType"] == "OVERLOADED"
+        assert data["details"]["queueDepth"] == 1
+
+    def test_deadline_returns_503(self, staff_list_5, requirements_30, client, monkeypatch):
+        import solver.main as main
+
+        monkeypatch.setattr(main, "_pool", _StubPool(PoolDeadlineError("期限切れ")))
+        response = self._post(client, staff_list_5, requirements_30)
+        assert response.status_code == 503
+        assert response.get_json()["errorType"] == "UNAVAILABLE"
+
+    def test_pool_stats_endpoint(self, client, monkeypatch):
+        import solver.main as main
+
+        monkeypatch.setattr(main, "_pool", None)
+        assert client.get("/solverPoolStats").get_json() == {"enabled": False}
+        monkeypatch.setattr(main, "_pool", _StubPool(RuntimeError()))
+        data = client.get("/solverPoolStats").get_json()
+        assert data["enabled"] is True
+        assert data["workers"] == 1
+
+
+class TestLazyPool:
+
+    def test_created_on_first_solve_only(self, staff_list_5, requirements_30, client, monkeypatch):
+        """import時・/metrics・統計ではプールを作らず、最初の求解で1回だけ作る"""
+        import solver.main as main
+
+        created = []
+        monkeypatch.setattr(main, "_pool", main._UNSET)
+        monkeypatch.setattr(
+            SolverPool, "from_env", classmethod(lambda cls: created.append(1)),
+        )
+        client.get("/metrics")
+        assert client.get("/solverPoolStats").get_json()["started"] is False
+        assert created == []
+
+        for _ in range(2):
+            response = client.post("/solverUnifiedGenerate", json={
+                "staffList": staff_list_5, "requirements": requirements_30,
+            })
+            assert response.status_code == 200
+        assert created == [1]
+        assert main._pool is None